@@ -0,0 +1,75 @@
+"""
+Runs the benchmarks.
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks import runner
+
+
+def main(args=None):
+    """
+    Runs the benchmarks, optionally saving the results and comparing them against a baseline.
+    Returns 1 if any benchmark has regressed.
+    """
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--output", help="JSON file to save the results to")
+    parser.add_argument("--baseline", help="JSON file of earlier results to compare against")
+    parser.add_argument("--threshold",
+                        type=float,
+                        default=0.2,
+                        help="fraction slower than the baseline that counts as a regression "
+                             "(defaults to 0.2)")
+    parser.add_argument("--repeat",
+                        type=int,
+                        default=5,
+                        help="number of times to time each benchmark (defaults to 5)")
+    parser.add_argument("--min-time",
+                        type=float,
+                        default=0.1,
+                        help="minimum seconds each timing should take (defaults to 0.1)")
+    parser.add_argument("--filter", help="only run benchmarks with names containing this")
+    parser.add_argument("--mongodb-uri",
+                        help="MongoDB server to benchmark storage against (a scratch database, as "
+                             "it's written to)")
+    args = parser.parse_args(args)
+
+    runner.configure_environment()
+
+    # Benchmarks import the app so they can only be loaded once the environment is configured
+    # pylint: disable=import-outside-toplevel
+    from benchmarks import matching, parsers, playlists, storage
+
+    benchmarks = [
+        *parsers.get_benchmarks(),
+        *matching.get_benchmarks(),
+        *playlists.get_benchmarks(),
+        *storage.get_benchmarks(args.mongodb_uri),
+    ]
+
+    results = runner.run_benchmarks(benchmarks, args.repeat, args.min_time, args.filter)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+
+    regressions = runner.compare(results, baseline, args.threshold)
+
+    if regressions:
+        print(f"{len(regressions)} benchmarks regressed: {', '.join(regressions)}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+# pylint: disable=import-outside-toplevel
+
+"""
+Fuzzy matching benchmarks.
+"""
+
+import random
+
+__WORDS = [
+    "the", "of", "black", "love", "night", "city", "dream", "fire", "blue", "light", "ghost",
+    "river", "gold", "young", "wild", "heart", "machine", "echo", "summer", "sound", "lost",
+    "house", "moon", "silver", "electric", "paradise", "run", "jewels", "apple", "gibbs",
+]
+
+SIZES = (1000, 10000)
+
+
+def get_benchmarks(sizes=SIZES):
+    """
+    Returns benchmarks of matching an artist and title against synthetic sets of candidates, like
+    the results of a Spotify search but larger.
+    """
+
+    from best_new_music_digest import playlist
+
+    similar_enough = getattr(playlist, "__similar_enough")
+    generator = random.Random(0)
+
+    benchmarks = []
+
+    for size in sizes:
+        candidates = [__random_name(generator) for _ in range(size)]
+        benchmarks.append((
+            f"similar_enough/{size}",
+            __match(similar_enough, "Run the Jewels", "RTJ4 Deluxe Edition", candidates),
+        ))
+
+    return benchmarks
+
+
+def __random_name(generator):
+    return " ".join(generator.choice(__WORDS) for _ in range(generator.randint(1, 5))).title()
+
+
+def __match(similar_enough, artist, title, candidates):
+    def match():
+        return [c for c in candidates if similar_enough(artist, c) or similar_enough(title, c)]
+
+    return match
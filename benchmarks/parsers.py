@@ -0,0 +1,74 @@
+# pylint: disable=import-outside-toplevel, protected-access, too-few-public-methods
+
+"""
+Scraper parsing benchmarks.
+"""
+
+import json
+
+from benchmarks.runner import load_test_data
+
+__SCRAPERS = [
+    ("pitchfork", "AlbumScraper", "pitchfork_albums_input.html"),
+    ("pitchfork", "TrackScraper", "pitchfork_tracks_input.html"),
+    ("sputnikmusic", "AlbumScraper", "sputnikmusic_albums_input.html"),
+    ("the_needle_drop", "AlbumScraper", "the_needle_drop_albums_input.json"),
+    ("the_needle_drop", "TrackScraper", "the_needle_drop_tracks_input.json"),
+]
+
+
+class FakeResponse:
+    """
+    Response to a request for a page that has already been fetched.
+    """
+
+    def __init__(self, text):
+        self.status_code = 200
+        self.headers = {}
+        self.text = text
+        self.content = text.encode("utf-8")
+
+    def json(self):
+        """
+        Returns the page parsed as JSON.
+        """
+
+        return json.loads(self.text)
+
+
+class FakeSession:
+    """
+    Session that returns the same response to every request.
+    """
+
+    def __init__(self, response):
+        self.__response = response
+
+    def get(self, *_, **__):
+        """
+        Returns the response.
+        """
+
+        return self.__response
+
+
+def get_benchmarks():
+    """
+    Returns benchmarks of each scraper parsing its test data, without a checkpoint so that every
+    item is parsed.
+    """
+
+    from importlib import import_module
+
+    from best_new_music_digest.checkpoint import NullCheckpointer
+
+    benchmarks = []
+
+    for module, class_name, file_name in __SCRAPERS:
+        session = FakeSession(FakeResponse(load_test_data(file_name)))
+        scraper = getattr(import_module(f"best_new_music_digest.scrapers.{module}"),
+                          class_name)(NullCheckpointer(), session)
+
+        benchmarks.append((f"parse/{module}/{class_name}", scraper._get_items))
+
+    return benchmarks
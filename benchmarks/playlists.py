@@ -0,0 +1,160 @@
+# pylint: disable=import-outside-toplevel
+
+"""
+Playlist creation benchmarks.
+"""
+
+import re
+
+from benchmarks.runner import load_json_test_data
+
+SIZES = (10, 100, 1000)
+
+__ALBUM_DIGEST_ITEMS = [
+    "pitchfork_albums_output_without_checkpoint.json",
+    "sputnikmusic_albums_output_without_checkpoint.json",
+    "the_needle_drop_albums_output_without_checkpoint.json",
+]
+
+__TRACK_DIGEST_ITEMS = [
+    "pitchfork_tracks_output_without_checkpoint.json",
+    "the_needle_drop_tracks_output_without_checkpoint.json",
+]
+
+
+class FakeSpotify:
+    """
+    Spotify client that answers searches for artists with test data responses, finding nothing
+    for any other artist, and does nothing when playlists are changed.
+    """
+
+    __ALBUM_SEARCH_RESPONSES = {
+        "run the jewels": "spotify_albums_rtj_response.json",
+        "fiona apple": "spotify_albums_fiona_apple_response.json",
+        "freddie gibbs": "spotify_albums_freddie_gibbs_response.json",
+    }
+
+    __TRACK_SEARCH_RESPONSES = {
+        "blake mills": "spotify_track_blake_mills_response.json",
+        "slowthai": "spotify_track_slowthai_response.json",
+        "freddie gibbs": "spotify_track_freddie_gibbs_response.json",
+    }
+
+    __ALBUM_TRACKS_RESPONSES = {
+        "6cx4GVNs03Pu4ZczRnWiLd": "spotify_tracks_rtj_response.json",
+        "0fO1KemWL2uCCQmM22iKlj": "spotify_tracks_fiona_apple_response.json",
+        "3znl1qe13kyjQv7KcR685N": "spotify_tracks_freddie_gibbs_response.json",
+    }
+
+    __ARTIST_PATTERN = re.compile(r"artist:(.*?)(?: (?:album|tag|track):|$)")
+
+    def __init__(self):
+        self.__album_searches = self.__load_responses(self.__ALBUM_SEARCH_RESPONSES)
+        self.__track_searches = self.__load_responses(self.__TRACK_SEARCH_RESPONSES)
+        self.__album_tracks = self.__load_responses(self.__ALBUM_TRACKS_RESPONSES)
+        self.__empty_albums = load_json_test_data("spotify_albums_empty_response.json")
+        self.__empty_tracks = load_json_test_data("spotify_track_empty_response.json")
+
+    @staticmethod
+    def me():  # pylint: disable=invalid-name
+        """
+        Returns the current user.
+        """
+
+        return {"id": "benchmark-user"}
+
+    def search(self, q, type, **_):  # pylint: disable=invalid-name, redefined-builtin
+        """
+        Returns the search results for the artist in a query.
+        """
+
+        match = self.__ARTIST_PATTERN.search(q)
+        artist = match.group(1).lower() if match else None
+
+        if type == "album":
+            return self.__album_searches.get(artist, self.__empty_albums)
+
+        return self.__track_searches.get(artist, self.__empty_tracks)
+
+    def album_tracks(self, album_id):
+        """
+        Returns an album's tracks.
+        """
+
+        return self.__album_tracks.get(album_id, {"items": []})
+
+    @staticmethod
+    def user_playlist_create(*_, **__):
+        """
+        Returns a new playlist.
+        """
+
+        return {"id": "benchmark-playlist", "external_urls": {"spotify": "benchmark-playlist-url"}}
+
+    @staticmethod
+    def user_playlist_add_tracks(*_, **__):
+        """
+        Does nothing.
+        """
+
+    @staticmethod
+    def __load_responses(file_names):
+        return {key: load_json_test_data(file_name) for key, file_name in file_names.items()}
+
+
+def get_benchmarks(sizes=SIZES):
+    """
+    Returns benchmarks of creating playlists for digests of different sizes, half albums and half
+    tracks. Items are repeated from the test data with numbered titles so that each one is searched
+    for separately.
+    """
+
+    from best_new_music_digest.playlist import create_playlists
+
+    spotify = FakeSpotify()
+
+    album_items = [i for f in __ALBUM_DIGEST_ITEMS for i in load_json_test_data(f)["items"]]
+    track_items = [i for f in __TRACK_DIGEST_ITEMS for i in load_json_test_data(f)["items"]]
+
+    benchmarks = []
+
+    for size in sizes:
+        digest = [
+            __digest_item("albums", album_items, size // 2),
+            __digest_item("tracks", track_items, size - size // 2),
+        ]
+
+        benchmarks.append((
+            f"create_playlists/{size}",
+            __create_playlists(create_playlists, digest, spotify),
+        ))
+
+    return benchmarks
+
+
+def __digest_item(digest_item_type, items, size):
+    repeated_items = []
+
+    for index in range(size):
+        item = dict(items[index % len(items)])
+        repeat = index // len(items)
+
+        if repeat:
+            item["title"] = f"{item['title']} ({repeat})"
+
+        repeated_items.append(item)
+
+    return {
+        "title": f"Benchmark {digest_item_type.title()}",
+        "link": "https://www.example.com",
+        "items": repeated_items,
+        "errors": False,
+        "type": digest_item_type,
+    }
+
+
+def __create_playlists(create_playlists, digest, spotify):
+    def create():
+        return create_playlists(digest, spotify)
+
+    return create
@@ -0,0 +1,148 @@
+"""
+Times benchmarks and compares results against a baseline.
+"""
+
+import json
+import os
+import platform
+import statistics
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "tests",
+                             "test_data")
+
+
+def configure_environment():
+    """
+    Sets the properties the app needs so that benchmarks can run without a .env file. Nothing
+    connects to the services these are for.
+    """
+
+    for prop in ("RECIPIENT_EMAIL", "SENDER_EMAIL", "SENDGRID_API_KEY", "SENDGRID_TEMPLATE_ID",
+                 "SPOTIFY_CLIENT_ID", "SPOTIFY_CLIENT_SECRET", "SPOTIFY_USERNAME",
+                 "YOUTUBE_API_KEY"):
+        os.environ.setdefault(prop, f"benchmark-{prop.lower().replace('_', '-')}")
+
+    os.environ.setdefault("STORAGE_URI", "memory://")
+
+    os.environ["CREATE_SPOTIFY_PLAYLISTS"] = "true"
+
+
+def load_test_data(file_name):
+    """
+    Returns the contents of a test data file.
+    """
+
+    with open(os.path.join(TEST_DATA_DIR, file_name), encoding="utf-8") as test_data:
+        return test_data.read()
+
+
+def load_json_test_data(file_name):
+    """
+    Returns the contents of a JSON test data file.
+    """
+
+    return json.loads(load_test_data(file_name))
+
+
+def time_benchmark(function, repeat=5, min_time=0.1):
+    """
+    Times a function, calling it enough times in each of the repeats to take at least min_time
+    seconds. Returns statistics for the time of a single call in seconds.
+    """
+
+    # Warm up, then work out how many calls make a long enough sample to time accurately
+    loops = 1
+    while True:
+        elapsed = __time_loops(function, loops)
+
+        if elapsed >= min_time:
+            break
+
+        loops *= 10 if elapsed < min_time / 10 else 2
+
+    samples = [__time_loops(function, loops) / loops for _ in range(repeat)]
+
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.mean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0,
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+
+def run_benchmarks(benchmarks, repeat=5, min_time=0.1, name_filter=None):
+    """
+    Runs benchmarks (pairs of names and functions) and returns the results.
+    """
+
+    results = {
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": {},
+    }
+
+    for name, function in benchmarks:
+        if name_filter and name_filter not in name:
+            continue
+
+        # Keep the app's logging out of the results
+        with open(os.devnull, "w", encoding="utf-8") as devnull, redirect_stdout(devnull):
+            results["benchmarks"][name] = time_benchmark(function, repeat, min_time)
+
+        print(f"{name:<50} {__format_time(results['benchmarks'][name]['median'])}")
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares results against a baseline, returning the names of benchmarks whose median is more
+    than threshold (a fraction) slower than the baseline's.
+    """
+
+    regressions = []
+
+    for name, result in results["benchmarks"].items():
+        baseline_result = baseline["benchmarks"].get(name)
+
+        if not baseline_result:
+            print(f"{name:<50} no baseline")
+            continue
+
+        ratio = result["median"] / baseline_result["median"]
+        regressed = ratio > 1 + threshold
+
+        print(f"{name:<50} {__format_time(baseline_result['median'])} -> "
+              f"{__format_time(result['median'])} ({ratio:.2f}x)"
+              f"{' REGRESSION' if regressed else ''}")
+
+        if regressed:
+            regressions.append(name)
+
+    return regressions
+
+
+def __time_loops(function, loops):
+    start = time.perf_counter()
+
+    for _ in range(loops):
+        function()
+
+    return time.perf_counter() - start
+
+
+def __format_time(seconds):
+    if seconds >= 1:
+        return f"{seconds:.3f}s"
+
+    if seconds >= 0.001:
+        return f"{seconds * 1000:.3f}ms"
+
+    return f"{seconds * 1000000:.3f}us"
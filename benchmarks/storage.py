@@ -0,0 +1,71 @@
+# pylint: disable=import-outside-toplevel
+
+"""
+Storage backend benchmarks.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+from urllib.parse import urlparse
+
+# Sizes of the stored data, going by a run with a few profiles that has been going for a while
+__CHECKPOINTS = 50
+__SEEN_ITEMS = 1000
+__STAGED_ITEMS = 100
+
+
+def get_benchmarks(mongodb_uri=None):
+    """
+    Returns benchmarks of the storage a run does against each backend: loading the checkpoints,
+    checking whether items have been seen and committing a scrape's checkpoint, validators and
+    seen items. MongoDB is only benchmarked if there's a server to use.
+    """
+
+    directory = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+
+    uris = ["memory://", f"sqlite:///{os.path.join(directory, 'benchmark.db')}"]
+
+    if mongodb_uri:
+        uris.append(mongodb_uri)
+
+    benchmarks = []
+
+    for uri in uris:
+        benchmarks.extend(__get_store_benchmarks(uri))
+
+    return benchmarks
+
+
+def __get_store_benchmarks(uri):
+    from best_new_music_digest.checkpoint import Checkpointer
+    from best_new_music_digest.storage import open_store
+
+    store = open_store(uri)
+    backend = urlparse(uri).scheme.split("+")[0]
+
+    store.save_checkpoints({f"source-{i}": f"link-{i}" for i in range(__CHECKPOINTS)})
+    store.save_seen({"source-0": {f"key-{i}": f"link-{i}" for i in range(__SEEN_ITEMS)}})
+
+    checkpointer = Checkpointer(store)
+
+    def load_checkpoints():
+        return store.get_checkpoints()
+
+    def is_seen():
+        return (store.is_seen("source-0", "key-500", "link-500"),
+                store.is_seen("source-0", "new-key", "new-link"))
+
+    def commit():
+        checkpointer.save_checkpoint("source-0", "link-0")
+        checkpointer.save_validators("https://some-source/", {"etag": "some-etag"})
+        checkpointer.save_seen("source-0", {f"key-{i}": f"link-{i}" for i in range(__STAGED_ITEMS)})
+        checkpointer.commit()
+
+    return [
+        (f"storage/{backend}/load_checkpoints", load_checkpoints),
+        (f"storage/{backend}/is_seen", is_seen),
+        (f"storage/{backend}/commit", commit),
+    ]
@@ -2,8 +2,28 @@
 Main.
 """
 
+import argparse
+
 from best_new_music_digest import app
 
 
+def main(args=None):
+    """
+    Runs the app once, or on a schedule with --daemon.
+    """
+
+    parser = argparse.ArgumentParser(prog="best_new_music_digest")
+    parser.add_argument("--daemon",
+                        action="store_true",
+                        help="stay running and run on the DAEMON_SCHEDULE cron schedule")
+    args = parser.parse_args(args)
+
+    if args.daemon:
+        from best_new_music_digest.daemon import Daemon  # pylint: disable=import-outside-toplevel
+        Daemon().start()
+    else:
+        app.run()
+
+
 if __name__ == "__main__":
-    app.run()
+    main()
@@ -0,0 +1,62 @@
+"""
+HTTP transport adapters.
+"""
+
+import time
+from urllib.parse import urlparse
+
+from requests.adapters import HTTPAdapter
+
+from best_new_music_digest import metrics, ratelimit
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    Transport adapter with a default timeout for requests that aren't given one.
+    """
+
+    def __init__(self, timeout=None, **kwargs):
+        self.__timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, *args, **kwargs):  # pylint: disable=arguments-differ
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.__timeout
+
+        return super().send(request, *args, **kwargs)
+
+
+class RateLimitedHTTPAdapter(TimeoutHTTPAdapter):
+    """
+    Transport adapter that keeps requests to each host within its rate and concurrency limits,
+    shared with every other adapter. Streamed responses free up their slot once their headers
+    have arrived.
+    """
+
+    def send(self, request, *args, **kwargs):  # pylint: disable=arguments-differ
+        host = urlparse(request.url).hostname
+        limiter = ratelimit.get_limiter(host)
+
+        if limiter is None:
+            return super().send(request, *args, **kwargs)
+
+        limiter.acquire()
+        start = time.monotonic()
+        response = None
+
+        try:
+            response = super().send(request, *args, **kwargs)
+        finally:
+            if response is None:
+                limiter.release()
+            else:
+                throttled = ratelimit.is_throttled(response)
+
+                if throttled:
+                    metrics.inc("bnmd_http_throttled_total", host=host)
+
+                limiter.release(time.monotonic() - start,
+                                throttled,
+                                ratelimit.get_retry_after(response) if throttled else None)
+
+        return response
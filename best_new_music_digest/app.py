@@ -1,20 +1,334 @@
+# pylint: disable=broad-except, import-outside-toplevel, too-many-arguments, too-many-locals
+
 """
 Best New Music Digest App.
+
+Everything is imported when it's needed rather than up front so that importing the app is quick
+and doesn't load (and validate) settings.
 """
 
-from best_new_music_digest.dad_joke import get_dad_joke
-from best_new_music_digest.email import send_email
-from best_new_music_digest.playlist import create_playlists
-from best_new_music_digest.scrapers import factory
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+# Seconds of the run's deadline held back for sending the email, so that it always goes out
+__EMAIL_TIME = 30
 
+# Share of the rest of the run's deadline that scraping can take, leaving the rest for Spotify
+__SCRAPE_SHARE = 0.5
 
-def run():
+
+def run(checkpointer=None, spotify=None, since=None):
     """
-    Run the app.
+    Run the app. An existing checkpointer and Spotify client can be given so that their
+    connections are reused between runs, along with the time of the previous run so that
+    scrapers with their own schedule only run when it has come round. A report of how long each
+    stage took is saved at the end of the run.
+
+    With a RUN_DEADLINE, each stage gets a share of the time: scrapers that are still running
+    when scraping's share is up are reported as failed, Spotify searches stop when its share is
+    up and the email is sent with whatever was found.
+
+    Spotify search results are cached in storage (see SearchCache), so albums and tracks that
+    come up again, from another source or in a later run, aren't searched for again.
+
+    The output of each stage is saved in a run journal as it completes. If a run fails or is
+    killed before its email has been sent, the next run within RUN_JOURNAL_MAX_AGE seconds picks
+    up from the last stage that completed rather than scraping and searching Spotify again.
     """
 
-    scrapers = factory.get_scrapers()
-    digest = [scraper.scrape() for scraper in scrapers]
-    dad_joke = get_dad_joke()
-    albums_playlist_url, tracks_playlist_url = create_playlists(digest)
-    send_email(digest, dad_joke, albums_playlist_url, tracks_playlist_url)
+    from best_new_music_digest import report, settings
+    from best_new_music_digest.checkpoint import Checkpointer
+    from best_new_music_digest.deadline import Deadline
+    from best_new_music_digest.journal import open_journal
+    from best_new_music_digest.search_cache import SearchCache
+
+    run_report = report.start_report()
+    checkpointer = checkpointer or Checkpointer()
+    deadline = Deadline(settings.RUN_DEADLINE or None)
+    succeeded = False
+
+    try:
+        __load_checkpoints(checkpointer)
+        journal = open_journal(checkpointer, settings.RUN_JOURNAL_MAX_AGE)
+
+        if journal.is_resumed():
+            print(f"Resuming run {journal.get_run_id()}")
+
+        search_cache = SearchCache(checkpointer,
+                                   settings.SPOTIFY_CACHE_TTL,
+                                   settings.SPOTIFY_NOT_FOUND_TTL,
+                                   settings.SPOTIFY_CACHE_SIZE)
+
+        if settings.PROFILES_FILE:
+            sent = __run_profiles(checkpointer, since, deadline, journal, search_cache)
+        else:
+            sent = __run_digest(checkpointer, spotify, since, deadline, journal, search_cache)
+
+        # Runs that didn't send everything are picked up again by the next one
+        if sent:
+            journal.finish()
+
+        succeeded = True
+    finally:
+        # Anything staged but not committed is found again next run
+        checkpointer.discard()
+        run_report.finish()
+        __save_report(run_report, checkpointer)
+        __export_metrics(run_report, succeeded)
+
+
+def __run_digest(checkpointer, spotify, since, deadline, journal, search_cache):
+    from best_new_music_digest import report, settings
+    from best_new_music_digest.scrapers import factory
+
+    if journal.completed("scrape"):
+        digest = __resume_scrape(checkpointer, journal)
+    elif settings.STREAMING_PIPELINE:
+        from best_new_music_digest import pipeline
+
+        # Track IDs are journalled as soon as they've been found so that playlists that fail to
+        # be created are tried again below without searching again
+        with report.span("pipeline"):
+            digest, dad_joke, albums_playlist_url, tracks_playlist_url = pipeline.run(
+                factory.get_scrapers(checkpointer, since=since),
+                spotify,
+                deadline.share(1, __EMAIL_TIME),
+                search_cache,
+                on_track_ids=lambda track_ids: journal.complete("track_ids", track_ids),
+            )
+
+        __complete_scrape(checkpointer, journal, digest)
+        journal.complete("dad_joke", dad_joke)
+
+        if albums_playlist_url or tracks_playlist_url:
+            journal.complete("playlists", [albums_playlist_url, tracks_playlist_url])
+        elif not journal.completed("track_ids") and deadline.share(1, __EMAIL_TIME).expired():
+            # Searching Spotify again would eat into the time held back for the email
+            print("Out of time to create playlists")
+            return __send_email(checkpointer, journal, "", digest, dad_joke, None, None)
+    else:
+        digest = __scrape(factory.get_scrapers(checkpointer, since=since),
+                          deadline.share(__SCRAPE_SHARE, __EMAIL_TIME))
+        __complete_scrape(checkpointer, journal, digest)
+
+    dad_joke = __get_dad_joke(journal, deadline)
+    albums_playlist_url, tracks_playlist_url = __create_playlists(journal, "", digest, spotify,
+                                                                  search_cache, deadline)
+
+    return __send_email(checkpointer, journal, "", digest, dad_joke, albums_playlist_url,
+                        tracks_playlist_url)
+
+
+def __run_profiles(checkpointer, since, deadline, journal, search_cache):
+    from best_new_music_digest import settings
+    from best_new_music_digest.checkpoint import NullCheckpointer
+    from best_new_music_digest.playlist import get_spotify
+    from best_new_music_digest.profiles import load_profiles
+    from best_new_music_digest.scrapers import factory
+
+    profiles = load_profiles(settings.PROFILES_FILE)
+
+    # Scrape every source that any profile needs once, without checkpoints, then let each profile
+    # pick out what is new to it
+    if journal.completed("scrape"):
+        digest = __resume_scrape(checkpointer, journal)
+    else:
+        titles = {title for profile in profiles for title in profile.sources}
+        digest = __scrape(factory.get_scrapers(NullCheckpointer(), titles, since=since),
+                          deadline.share(__SCRAPE_SHARE, __EMAIL_TIME))
+        __complete_scrape(checkpointer, journal, digest)
+
+    dad_joke = __get_dad_joke(journal, deadline)
+
+    # Searches are the same whichever account does them so the search cache is shared between
+    # profiles
+    sent = True
+
+    for profile in profiles:
+        print(f"Creating digest for {profile.name} profile")
+
+        # Profiles' checkpoints only move on once their email has been sent, so a resumed run
+        # picks out the same items for them
+        profile_digest = profile.get_digest(digest, checkpointer)
+        prefix = f"profiles/{profile.name}/"
+
+        if profile.spotify_username:
+            albums_playlist_url, tracks_playlist_url = __create_playlists(
+                journal,
+                prefix,
+                profile_digest,
+                get_spotify(profile.spotify_username),
+                search_cache,
+                deadline,
+            )
+        else:
+            albums_playlist_url, tracks_playlist_url = None, None
+
+        sent = __send_email(checkpointer,
+                            journal,
+                            prefix,
+                            profile_digest,
+                            dad_joke,
+                            albums_playlist_url,
+                            tracks_playlist_url,
+                            profile.recipient_emails) and sent
+
+    return sent
+
+
+def __complete_scrape(checkpointer, journal, digest):
+    # The checkpoints the scrapers staged go in the journal too, so that they can be saved once a
+    # resumed run has sent the digest
+    journal.complete("scrape", {"digest": digest, "staged": checkpointer.get_staged()})
+
+
+def __resume_scrape(checkpointer, journal):
+    scrape = journal.get("scrape")
+    checkpointer.stage(scrape["staged"])
+
+    return scrape["digest"]
+
+
+def __get_dad_joke(journal, deadline):
+    from best_new_music_digest.dad_joke import get_dad_joke
+
+    if not journal.completed("dad_joke"):
+        journal.complete("dad_joke", get_dad_joke(deadline=deadline.share(1, __EMAIL_TIME)))
+
+    return journal.get("dad_joke")
+
+
+def __create_playlists(journal, prefix, digest, spotify, search_cache, deadline):
+    from best_new_music_digest.playlist import create_playlists
+
+    if journal.completed(f"{prefix}playlists"):
+        return tuple(journal.get(f"{prefix}playlists"))
+
+    playlist_urls = create_playlists(
+        digest,
+        spotify,
+        track_ids=journal.get(f"{prefix}track_ids"),
+        search_cache=search_cache,
+        deadline=deadline.share(1, __EMAIL_TIME),
+        on_track_ids=lambda track_ids: journal.complete(f"{prefix}track_ids", track_ids),
+    )
+
+    # Playlists that failed to be created are tried again (without searching) by a resumed run
+    if any(playlist_urls):
+        journal.complete(f"{prefix}playlists", list(playlist_urls))
+
+    return playlist_urls
+
+
+def __send_email(checkpointer, journal, prefix, *args):
+    from best_new_music_digest.email import send_email
+
+    # A resumed run doesn't send an email again if it was sent before its checkpoints were saved
+    if journal.completed(f"{prefix}email"):
+        sent = True
+    else:
+        sent = send_email(*args)
+
+        if sent:
+            journal.complete(f"{prefix}email", True)
+
+    __commit(checkpointer, sent)
+
+    return sent
+
+
+def __load_checkpoints(checkpointer):
+    from best_new_music_digest import report
+
+    # Scrapers try again when they need their checkpoints, and report it if it fails then too
+    try:
+        with report.span("checkpoint"):
+            checkpointer.load_checkpoints()
+    except Exception as exception:
+        print("Failed to load checkpoints")
+        print(exception)
+
+
+def __commit(checkpointer, sent):
+    from best_new_music_digest import report
+
+    # Checkpoints only move on once the items found since them have been sent
+    if not sent:
+        print("Email wasn't sent so checkpoints haven't been saved")
+        checkpointer.discard()
+        return
+
+    with report.span("checkpoint"):
+        checkpointer.commit()
+
+
+def __scrape(scrapers, deadline):
+    from best_new_music_digest import report
+
+    with report.span("scrape"):
+        return __scrape_concurrently(scrapers, deadline)
+
+
+def __scrape_concurrently(scrapers, deadline):
+    from best_new_music_digest import settings
+
+    max_workers = settings.SCRAPER_MAX_WORKERS
+    timeout = settings.SCRAPER_TIMEOUT
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = [executor.submit(scraper.scrape, deadline) for scraper in scrapers]
+    start = time.monotonic()
+
+    digest = []
+
+    for index, (scraper, future) in enumerate(zip(scrapers, futures)):
+        # Scrapers queued behind a full pool only start once an earlier batch has finished
+        scraper_deadline = start + timeout * (index // max_workers + 1)
+
+        try:
+            digest.append(future.result(
+                timeout=deadline.timeout(max(scraper_deadline - time.monotonic(), 0)),
+            ))
+        except FutureTimeoutError:
+            if scraper.cancel():
+                print(f"{scraper.get_title()} scraper timed out after {timeout} seconds")
+                future.cancel()
+                digest.append(scraper.get_error_digest_item())
+            else:
+                # It's already saving its checkpoint so it's about to finish
+                digest.append(future.result())
+
+    # Don't block on scrapers that have timed out. They can't be interrupted so they keep going
+    # until their current request finishes (without making any more or saving anything), and the
+    # interpreter waits for them before exiting.
+    executor.shutdown(wait=False)
+
+    return digest
+
+
+def __save_report(run_report, checkpointer):
+    from best_new_music_digest import settings
+
+    try:
+        if settings.RUN_REPORT_FILE:
+            run_report.save(settings.RUN_REPORT_FILE)
+
+        if settings.RUN_REPORT_MONGODB:
+            checkpointer.save_run_report(run_report.to_dict())
+    except Exception as exception:
+        print("Failed to save run report")
+        print(exception)
+
+
+def __export_metrics(run_report, succeeded):
+    from best_new_music_digest import metrics, settings
+
+    metrics.observe_run(run_report.to_dict(), succeeded)
+
+    try:
+        if settings.METRICS_TEXTFILE:
+            metrics.write_textfile(settings.METRICS_TEXTFILE)
+    except Exception as exception:
+        print("Failed to write metrics")
+        print(exception)
@@ -0,0 +1,319 @@
+# pylint: disable=import-outside-toplevel, invalid-name, too-few-public-methods, too-many-arguments
+
+"""
+Recording HTTP exchanges to a cassette and replaying them, so that runs can be repeated offline.
+"""
+
+import base64
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from best_new_music_digest import urls
+from best_new_music_digest.adapters import RateLimitedHTTPAdapter, TimeoutHTTPAdapter
+
+__lock = threading.Lock()
+__cassette = None
+
+
+class Cassette:
+    """
+    A directory of recorded HTTP exchanges, one JSON file per exchange.
+    """
+
+    SENDGRID_URL = "https://api.sendgrid.com/v3/mail/send"
+
+    # Response headers that no longer describe the recorded body (which has already been decoded)
+    __DROPPED_HEADERS = {"content-encoding", "content-length", "set-cookie", "transfer-encoding"}
+
+    # Fields of JSON response bodies holding credentials (e.g. from Spotify's token endpoint)
+    __SECRET_FIELDS = {"access_token", "client_secret", "id_token", "refresh_token"}
+
+    def __init__(self, directory, mode, latency=0):
+        if mode not in ("record", "replay"):
+            raise Exception(f"Invalid HTTP cassette mode: {mode}.")
+
+        self.__directory = directory
+        self.__mode = mode
+        self.__latency = latency / 1000
+        self.__lock = threading.Lock()
+        self.__exchanges = {}
+        self.__count = 0
+
+        if mode == "record":
+            os.makedirs(directory, exist_ok=True)
+
+            for path in glob.glob(os.path.join(directory, "exchange-*.json")):
+                os.remove(path)
+        else:
+            self.__load()
+
+    def get_mode(self):
+        """
+        Returns whether the cassette is recording or replaying.
+        """
+
+        return self.__mode
+
+    def create_adapter(self, max_retries=None, timeout=None):
+        """
+        Returns a transport adapter for a requests session that records to or replays from the
+        cassette.
+        """
+
+        if self.__mode == "record":
+            return RecordingAdapter(self, timeout=timeout, max_retries=max_retries or 0)
+
+        return ReplayAdapter(self)
+
+    def record(self, method, url, body, status, headers, content, elapsed):
+        """
+        Records an exchange.
+        """
+
+        with self.__lock:
+            self.__count += 1
+            count = self.__count
+
+        exchange = {
+            "request": {
+                "method": method,
+                "url": urls.scrub_url(url),
+                "body_sha256": self.__hash_body(body),
+            },
+            "response": {
+                "status": status,
+                "headers": {
+                    name: value for name, value in headers.items()
+                    if name.lower() not in self.__DROPPED_HEADERS
+                },
+                **self.__encode_content(self.__redact_content(content)),
+            },
+            "elapsed": round(elapsed, 6),
+        }
+
+        host = urlparse(url).hostname
+        path = os.path.join(self.__directory, f"exchange-{count:05d}-{method.lower()}-{host}.json")
+
+        with open(path, "w", encoding="utf-8") as exchange_file:
+            json.dump(exchange, exchange_file, indent=2)
+
+    def replay(self, method, url, body):
+        """
+        Returns the recorded status, headers and content of the response to a request after
+        waiting for the injected latency. Requests are matched on method, URL and body, falling
+        back to method and URL (request bodies can contain dates). Repeated requests get the
+        recorded responses in order, with the last one repeated once they run out.
+        """
+
+        key = (method, urls.scrub_url(url))
+
+        with self.__lock:
+            exchanges = self.__exchanges.get(key)
+
+            if not exchanges:
+                raise Exception(f"No recorded response for {method} {key[1]}.")
+
+            body_sha256 = self.__hash_body(body)
+            index = next(
+                (i for i, exchange in enumerate(exchanges)
+                 if exchange["request"]["body_sha256"] == body_sha256),
+                0,
+            )
+
+            exchange = exchanges[index]
+
+            if len(exchanges) > 1:
+                del exchanges[index]
+
+        if self.__latency:
+            time.sleep(self.__latency)
+
+        response = exchange["response"]
+
+        return response["status"], response["headers"], self.__decode_content(response)
+
+    def send_sendgrid(self, client, message):
+        """
+        Sends an email with a SendGrid client while recording, or returns the recorded response
+        while replaying (SendGrid doesn't use requests so it can't be given an adapter).
+        """
+
+        body = json.dumps(message.get(), sort_keys=True)
+
+        if self.__mode == "replay":
+            return SendGridResponse(*self.replay("POST", self.SENDGRID_URL, body))
+
+        start = time.monotonic()
+        response = client.send(message)
+
+        self.record("POST",
+                    self.SENDGRID_URL,
+                    body,
+                    response.status_code,
+                    dict(response.headers or {}),
+                    response.body or b"",
+                    time.monotonic() - start)
+
+        return response
+
+    def __load(self):
+        paths = sorted(glob.glob(os.path.join(self.__directory, "exchange-*.json")))
+
+        if not paths:
+            raise Exception(f"No recorded HTTP exchanges in {self.__directory}.")
+
+        for path in paths:
+            with open(path, encoding="utf-8") as exchange_file:
+                exchange = json.load(exchange_file)
+
+            request = exchange["request"]
+            self.__exchanges.setdefault((request["method"], request["url"]), []).append(exchange)
+
+    @staticmethod
+    def __hash_body(body):
+        if body is None:
+            body = b""
+        elif isinstance(body, str):
+            body = body.encode("utf-8")
+
+        return hashlib.sha256(body).hexdigest()
+
+    @classmethod
+    def __redact_content(cls, content):
+        def redact(value):
+            if isinstance(value, dict):
+                return {
+                    key: "redacted" if key in cls.__SECRET_FIELDS else redact(field)
+                    for key, field in value.items()
+                }
+
+            if isinstance(value, list):
+                return [redact(field) for field in value]
+
+            return value
+
+        try:
+            body = json.loads(content)
+        except ValueError:
+            return content
+
+        redacted = redact(body)
+
+        return content if redacted == body else json.dumps(redacted).encode("utf-8")
+
+    @staticmethod
+    def __encode_content(content):
+        try:
+            return {"body": content.decode("utf-8"), "encoding": "utf-8"}
+        except UnicodeDecodeError:
+            return {"body": base64.b64encode(content).decode("ascii"), "encoding": "base64"}
+
+    @staticmethod
+    def __decode_content(response):
+        if response["encoding"] == "base64":
+            return base64.b64decode(response["body"])
+
+        return response["body"].encode("utf-8")
+
+
+class RecordingAdapter(RateLimitedHTTPAdapter):
+    """
+    Transport adapter that makes requests as usual and records them to a cassette.
+    """
+
+    def __init__(self, cassette, **kwargs):
+        self.__cassette = cassette
+        super().__init__(**kwargs)
+
+    def send(self, request, *args, **kwargs):  # pylint: disable=arguments-differ
+        start = time.monotonic()
+        response = super().send(request, *args, **kwargs)
+
+        self.__cassette.record(request.method,
+                               request.url,
+                               request.body,
+                               response.status_code,
+                               dict(response.headers),
+                               response.content or b"",
+                               time.monotonic() - start)
+
+        return response
+
+
+class ReplayAdapter(TimeoutHTTPAdapter):
+    """
+    Transport adapter that serves responses from a cassette without touching the network.
+    """
+
+    def __init__(self, cassette, **kwargs):
+        self.__cassette = cassette
+        super().__init__(**kwargs)
+
+    def send(self, request, *_, **__):  # pylint: disable=arguments-differ
+        from io import BytesIO
+
+        from requests.exceptions import ConnectionError as RequestsConnectionError
+        from urllib3 import HTTPResponse
+
+        try:
+            status, headers, content = self.__cassette.replay(request.method,
+                                                              request.url,
+                                                              request.body)
+        except Exception as exception:
+            raise RequestsConnectionError(str(exception), request=request) from exception
+
+        raw = HTTPResponse(body=BytesIO(content),
+                           headers={**headers, "Content-Length": str(len(content))},
+                           status=status,
+                           preload_content=False)
+
+        return self.build_response(request, raw)
+
+
+class SendGridResponse:
+    """
+    Replayed SendGrid response, with the same properties as the client's own responses.
+    """
+
+    def __init__(self, status_code, headers, body):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+
+def get_cassette():
+    """
+    Returns the cassette configured by HTTP_CASSETTE_MODE and HTTP_CASSETTE_DIR (None if HTTP
+    exchanges aren't being recorded or replayed).
+    """
+
+    global __cassette  # pylint: disable=global-statement
+
+    from best_new_music_digest import settings
+
+    if not settings.HTTP_CASSETTE_MODE:
+        return None
+
+    with __lock:
+        if __cassette is None:
+            __cassette = Cassette(settings.HTTP_CASSETTE_DIR,
+                                  settings.HTTP_CASSETTE_MODE,
+                                  settings.HTTP_CASSETTE_LATENCY)
+
+        return __cassette
+
+
+def reset():
+    """
+    Forgets the configured cassette so that it is loaded again from the settings.
+    """
+
+    global __cassette  # pylint: disable=global-statement
+
+    with __lock:
+        __cassette = None
@@ -1,35 +1,395 @@
+# pylint: disable=import-outside-toplevel, too-many-public-methods
+
 """
 Checkpointing.
 """
 
-from pymongo import MongoClient
+import threading
 
 from best_new_music_digest import settings
 
 
 class Checkpointer:
     """
-    Saves and loads checkpoints.
+    Saves and loads checkpoints, along with sources' health, HTTP validators, seen items, run
+    reports, run journals and Spotify search results, in the store for STORAGE_URI unless another
+    store is given (see storage).
+
+    Checkpoints, HTTP validators and seen items are staged rather than saved straight away, and
+    are only written (with one bulk write each) when commit is called, once the digest has been
+    sent. Staged changes are returned when they're looked up, so they count for the rest of the
+    run. Everything else is saved straight away.
     """
 
-    def __init__(self):
-        self.__checkpoints = MongoClient(settings.MONGODB_URI)["best-new-music-digest"].checkpoints
+    def __init__(self, store=None):
+        from best_new_music_digest import storage
+
+        self.__store = store or storage.open_store(settings.STORAGE_URI)
+        self.__lock = threading.Lock()
+        self.__loaded_checkpoints = None
+        self.__staged_checkpoints = {}
+        self.__staged_validators = {}
+        self.__staged_seen = {}
+
+    def load_checkpoints(self):
+        """
+        Loads every checkpoint with one query, so that looking them up doesn't go to the store.
+        They're loaded the first time one is looked up if this isn't called first.
+        """
+
+        loaded_checkpoints = self.__store.get_checkpoints()
+
+        with self.__lock:
+            self.__loaded_checkpoints = loaded_checkpoints
 
     def get_checkpoint(self, name):
         """
         Returns the checkpoint for a given name (None if it doesn't already exist).
         """
 
-        checkpoint = self.__checkpoints.find_one({"name": name})
-        return checkpoint["link"] if checkpoint else None
+        if self.__loaded_checkpoints is None:
+            self.load_checkpoints()
+
+        with self.__lock:
+            if name in self.__staged_checkpoints:
+                return self.__staged_checkpoints[name]
+
+            return self.__loaded_checkpoints.get(name)
 
     def save_checkpoint(self, name, link):
         """
-        Saves the checkpoint.
+        Stages the checkpoint.
+        """
+
+        with self.__lock:
+            self.__staged_checkpoints[name] = link
+
+    def get_health(self, name):
+        """
+        Returns the health of the source with a given name (None if it hasn't been recorded).
+        """
+
+        return self.__store.get_health(name)
+
+    def save_health(self, name, health):
+        """
+        Saves the health of the source with a given name.
+        """
+
+        self.__store.save_health(name, health)
+
+    def get_validators(self, url):
+        """
+        Returns the HTTP validators saved for a URL (None if there aren't any).
+        """
+
+        with self.__lock:
+            if url in self.__staged_validators:
+                return dict(self.__staged_validators[url])
+
+        return self.__store.get_validators(url)
+
+    def save_validators(self, url, validators):
+        """
+        Stages the HTTP validators for a URL.
+        """
+
+        with self.__lock:
+            self.__staged_validators[url] = dict(validators)
+
+    def get_seen(self, name):
+        """
+        Returns the key and link of every item seen for a given name.
+        """
+
+        seen = self.__store.get_seen(name)
+
+        with self.__lock:
+            staged = dict(self.__staged_seen.get(name, {}))
+
+        return [item for item in seen if item["key"] not in staged] + [
+            {"key": key, "link": link} for key, link in staged.items()
+        ]
+
+    def is_seen(self, name, key, link=None):
+        """
+        Returns whether an item with the given key (or link, if given) has been seen for a given
+        name.
+        """
+
+        with self.__lock:
+            staged = self.__staged_seen.get(name, {})
+
+            if key in staged or (link and link in staged.values()):
+                return True
+
+        return self.__store.is_seen(name, key, link)
+
+    def save_seen(self, name, seen):
+        """
+        Stages items as seen for a given name, from a dictionary of their keys to their links.
         """
 
-        self.__checkpoints.find_one_and_update(
-            {"name": name},
-            {"$set": {"link": link}},
-            upsert=True,
-        )
+        if not seen:
+            return
+
+        with self.__lock:
+            self.__staged_seen.setdefault(name, {}).update(seen)
+
+    def commit(self):
+        """
+        Saves the staged checkpoints, validators and seen items.
+        """
+
+        with self.__lock:
+            checkpoints, self.__staged_checkpoints = self.__staged_checkpoints, {}
+            validators, self.__staged_validators = self.__staged_validators, {}
+            seen, self.__staged_seen = self.__staged_seen, {}
+
+        if checkpoints:
+            self.__store.save_checkpoints(checkpoints)
+
+            with self.__lock:
+                if self.__loaded_checkpoints is not None:
+                    self.__loaded_checkpoints.update(checkpoints)
+
+        if validators:
+            self.__store.save_validators(validators)
+
+        if seen:
+            self.__store.save_seen(seen)
+
+    def discard(self):
+        """
+        Throws away the staged checkpoints, validators and seen items.
+        """
+
+        with self.__lock:
+            self.__staged_checkpoints = {}
+            self.__staged_validators = {}
+            self.__staged_seen = {}
+
+    def get_staged(self):
+        """
+        Returns the staged checkpoints, validators and seen items, so that they can be saved in a
+        run journal.
+        """
+
+        with self.__lock:
+            return {
+                "checkpoints": dict(self.__staged_checkpoints),
+                "validators": {url: dict(v) for url, v in self.__staged_validators.items()},
+                "seen": {name: dict(seen) for name, seen in self.__staged_seen.items()},
+            }
+
+    def stage(self, staged):
+        """
+        Stages checkpoints, validators and seen items returned by get_staged, such as those from a
+        run being resumed.
+        """
+
+        for name, link in staged.get("checkpoints", {}).items():
+            self.save_checkpoint(name, link)
+
+        for url, validators in staged.get("validators", {}).items():
+            self.save_validators(url, validators)
+
+        for name, seen in staged.get("seen", {}).items():
+            self.save_seen(name, seen)
+
+    def save_run_report(self, run_report):
+        """
+        Saves a run report.
+        """
+
+        self.__store.save_run_report(run_report)
+
+    def get_latest_journal(self):
+        """
+        Returns the run journal that was started last (None if there aren't any).
+        """
+
+        return self.__store.get_latest_journal()
+
+    def save_journal(self, journal):
+        """
+        Saves a run journal.
+        """
+
+        self.__store.save_journal(journal)
+
+    def delete_journal(self, run_id):
+        """
+        Deletes the run journal for a given run.
+        """
+
+        self.__store.delete_journal(run_id)
+
+    def get_search_result(self, key):
+        """
+        Returns a Spotify search result and when it expires (None if it hasn't been saved).
+        """
+
+        return self.__store.get_search_result(key)
+
+    def save_search_result(self, key, result, expires):
+        """
+        Saves a Spotify search result until it expires (as a timestamp).
+        """
+
+        self.__store.save_search_result(key, result, expires)
+
+    def close(self):
+        """
+        Closes the connection to the store.
+        """
+
+        self.__store.close()
+
+
+class NullCheckpointer:
+    """
+    Checkpointer that never has any checkpoints, so scrapers return every item they find.
+    """
+
+    @staticmethod
+    def load_checkpoints():
+        """
+        Does nothing as there are no checkpoints to load.
+        """
+
+    @staticmethod
+    def get_checkpoint(_):
+        """
+        Returns None as there are never any checkpoints.
+        """
+
+        return None
+
+    @staticmethod
+    def save_checkpoint(*_):
+        """
+        Does nothing as checkpoints are never saved.
+        """
+
+    @staticmethod
+    def get_health(_):
+        """
+        Returns None as health is never recorded.
+        """
+
+        return None
+
+    @staticmethod
+    def save_health(*_):
+        """
+        Does nothing as health is never saved.
+        """
+
+    @staticmethod
+    def get_validators(_):
+        """
+        Returns None as there are never any validators.
+        """
+
+        return None
+
+    @staticmethod
+    def save_validators(*_):
+        """
+        Does nothing as validators are never saved.
+        """
+
+    @staticmethod
+    def get_seen(_):
+        """
+        Returns nothing as items are never seen.
+        """
+
+        return []
+
+    @staticmethod
+    def is_seen(*_):
+        """
+        Returns False as items are never seen.
+        """
+
+        return False
+
+    @staticmethod
+    def save_seen(*_):
+        """
+        Does nothing as seen items are never saved.
+        """
+
+    @staticmethod
+    def commit():
+        """
+        Does nothing as nothing is ever staged.
+        """
+
+    @staticmethod
+    def discard():
+        """
+        Does nothing as nothing is ever staged.
+        """
+
+    @staticmethod
+    def get_staged():
+        """
+        Returns nothing as nothing is ever staged.
+        """
+
+        return {"checkpoints": {}, "validators": {}, "seen": {}}
+
+    @staticmethod
+    def stage(_):
+        """
+        Does nothing as nothing is ever staged.
+        """
+
+    @staticmethod
+    def save_run_report(_):
+        """
+        Does nothing as there is nowhere to save run reports.
+        """
+
+    @staticmethod
+    def get_latest_journal():
+        """
+        Returns None as there are never any run journals.
+        """
+
+        return None
+
+    @staticmethod
+    def save_journal(_):
+        """
+        Does nothing as run journals are never saved.
+        """
+
+    @staticmethod
+    def delete_journal(_):
+        """
+        Does nothing as there are never any run journals.
+        """
+
+    @staticmethod
+    def get_search_result(_):
+        """
+        Returns None as search results are never saved.
+        """
+
+        return None
+
+    @staticmethod
+    def save_search_result(*_):
+        """
+        Does nothing as search results are never saved.
+        """
+
+    @staticmethod
+    def close():
+        """
+        Does nothing as there is no connection to close.
+        """
@@ -4,14 +4,14 @@
 Dad jokes.
 """
 
-import requests
+from best_new_music_digest import http, report, settings
 
-from best_new_music_digest import settings
 
-
-def get_dad_joke():
+@report.timed("dad_joke")
+def get_dad_joke(session=None, deadline=None):
     """
-    Returns a dad joke.
+    Returns a dad joke (using the shared HTTP session unless another is given), giving up if it
+    can't be fetched before the deadline.
     """
 
     if not settings.DAD_JOKE:
@@ -19,8 +19,19 @@ def get_dad_joke():
         return None
 
     try:
-        return requests.get("https://icanhazdadjoke.com/",
-                            headers={"Accept": "application/json"}).json()["joke"]
+        kwargs = {}
+
+        if deadline is not None:
+            if deadline.expired():
+                raise Exception("Ran out of time to get a dad joke.")
+
+            kwargs["timeout"] = deadline.timeout((settings.HTTP_CONNECT_TIMEOUT,
+                                                  settings.HTTP_READ_TIMEOUT))
+
+        session = session or http.get_session()
+        return session.get("https://icanhazdadjoke.com/",
+                           headers={"Accept": "application/json"},
+                           **kwargs).json()["joke"]
     except Exception as exception:
         print("Failed to get dad joke")
         print(exception)
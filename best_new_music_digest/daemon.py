@@ -0,0 +1,80 @@
+# pylint: disable=broad-except
+
+"""
+Long-running daemon that runs the app on a schedule.
+"""
+
+import signal
+import threading
+from datetime import datetime
+
+from best_new_music_digest import app, http, metrics, settings
+from best_new_music_digest.checkpoint import Checkpointer
+from best_new_music_digest.playlist import get_spotify
+from best_new_music_digest.scheduler import CronSchedule
+
+
+class Daemon:
+    """
+    Runs the app on a cron-like schedule, keeping the database connection, Spotify client and HTTP
+    connections warm between runs.
+    """
+
+    def __init__(self, schedule=None):
+        self.__schedule = CronSchedule(schedule or settings.DAEMON_SCHEDULE)
+        self.__stopping = threading.Event()
+
+    def start(self):
+        """
+        Runs the app on schedule until stopped (blocks until then).
+        """
+
+        previous_handlers = {
+            signum: signal.signal(signum, self.__handle_signal)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+
+        checkpointer = Checkpointer()
+        spotify = get_spotify() if settings.CREATE_SPOTIFY_PLAYLISTS else None
+        metrics_server = metrics.serve(settings.METRICS_PORT) if settings.METRICS_PORT else None
+
+        previous_run = None
+
+        try:
+            while not self.__stopping.is_set():
+                next_run = self.__schedule.next_after(datetime.utcnow())
+                print(f"Next run at {next_run:%d/%m/%Y %H:%M} UTC")
+
+                wait = (next_run - datetime.utcnow()).total_seconds()
+                if self.__stopping.wait(max(wait, 0)):
+                    break
+
+                try:
+                    app.run(checkpointer, spotify, previous_run)
+                except Exception as exception:
+                    print("Failed to run successfully")
+                    print(exception)
+
+                previous_run = next_run
+        finally:
+            print("Shutting down")
+
+            if metrics_server:
+                metrics_server.shutdown()
+                metrics_server.server_close()
+
+            checkpointer.close()
+            http.close_session()
+
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+    def stop(self):
+        """
+        Stops the daemon once any run in progress has finished.
+        """
+
+        self.__stopping.set()
+
+    def __handle_signal(self, *_):
+        self.stop()
@@ -0,0 +1,66 @@
+"""
+Run deadlines.
+"""
+
+import time
+
+
+class Deadline:
+    """
+    A time by which something has to be finished, or no time limit at all. Stages of a run are
+    given a share of the run's deadline and check it as they go, so that they can stop early and
+    leave time for the stages after them.
+    """
+
+    def __init__(self, seconds=None, clock=time.monotonic):
+        self.__clock = clock
+        self.__end = None if seconds is None else clock() + seconds
+
+    def remaining(self):
+        """
+        Returns the number of seconds left (None if there's no time limit).
+        """
+
+        if self.__end is None:
+            return None
+
+        return max(self.__end - self.__clock(), 0)
+
+    def expired(self):
+        """
+        Returns whether the deadline has passed.
+        """
+
+        return self.remaining() == 0
+
+    def share(self, fraction, reserve=0):
+        """
+        Returns a deadline for a stage that can use a fraction of the time left, after holding back
+        the reserved number of seconds for later stages.
+        """
+
+        remaining = self.remaining()
+
+        if remaining is None:
+            return Deadline(clock=self.__clock)
+
+        return Deadline(max(remaining - reserve, 0) * fraction, self.__clock)
+
+    def timeout(self, timeout=None):
+        """
+        Returns a requests timeout (seconds or a (connect, read) tuple) cut down to the time left,
+        or the time left if no timeout is given.
+        """
+
+        remaining = self.remaining()
+
+        if remaining is None:
+            return timeout
+
+        if timeout is None:
+            return remaining
+
+        if isinstance(timeout, tuple):
+            return tuple(min(part, remaining) for part in timeout)
+
+        return min(timeout, remaining)
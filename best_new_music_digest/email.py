@@ -1,4 +1,4 @@
-# pylint: disable=broad-except
+# pylint: disable=broad-except, import-outside-toplevel
 
 """
 Emails.
@@ -6,15 +6,15 @@ Emails.
 
 from datetime import datetime
 
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+from best_new_music_digest import report, settings
 
-from best_new_music_digest import settings
 
-
-def send_email(digest, dad_joke=None, albums_playlist_url=None, tracks_playlist_url=None):
+@report.timed("email")
+def send_email(digest, dad_joke=None, albums_playlist_url=None, tracks_playlist_url=None,
+               recipient_emails=None):
     """
-    Sends out digest email.
+    Sends out digest email (to RECIPIENT_EMAIL unless other recipients are given). Returns False
+    if it failed to send, or True if it was sent or there was nothing to send.
     """
 
     if settings.ALWAYS_EMAIL:
@@ -24,11 +24,16 @@ def send_email(digest, dad_joke=None, albums_playlist_url=None, tracks_playlist_
 
     if not should_send:
         print("No items or errors to email about")
-        return
+        return True
+
+    from sendgrid import SendGridAPIClient
+    from sendgrid.helpers.mail import Mail
+
+    from best_new_music_digest import cassette
 
     message = Mail(
         from_email=(settings.SENDER_EMAIL, settings.SENDER_NAME),
-        to_emails=settings.RECIPIENT_EMAIL,
+        to_emails=recipient_emails or settings.RECIPIENT_EMAIL,
     )
 
     message.template_id = settings.SENDGRID_TEMPLATE_ID
@@ -42,7 +47,21 @@ def send_email(digest, dad_joke=None, albums_playlist_url=None, tracks_playlist_
     }
 
     try:
-        SendGridAPIClient(settings.SENDGRID_API_KEY).send(message)
+        # SendGrid doesn't use requests so its traffic has to be recorded here, and its requests
+        # don't time out unless it's told to
+        client = SendGridAPIClient(settings.SENDGRID_API_KEY)
+        client.client.timeout = settings.HTTP_READ_TIMEOUT
+        http_cassette = cassette.get_cassette()
+
+        with report.span("email/send"):
+            if http_cassette is not None:
+                response = http_cassette.send_sendgrid(client, message)
+            else:
+                response = client.send(message)
+        report.record_http("api.sendgrid.com", len(response.body or b""))
     except Exception as exception:
         print("Failed to send email")
         print(exception)
+        return False
+
+    return True
@@ -0,0 +1,118 @@
+"""
+Source health and circuit breaking.
+"""
+
+import math
+
+
+class SourceHealth:
+    """
+    How a source has been doing: its consecutive failures, last error and recent scrape times.
+
+    Once a source has failed CIRCUIT_BREAKER_THRESHOLD times in a row its circuit is opened and
+    it's skipped, apart from a probe run now and then to see if it has recovered. The number of
+    runs skipped between probes doubles each time a probe fails, up to MAX_SKIPPED_RUNS.
+    """
+
+    # Most runs to skip a broken source for before trying it again
+    MAX_SKIPPED_RUNS = 32
+
+    # Scrape times to keep for the latency percentiles
+    __DURATIONS = 20
+
+    def __init__(self, state=None):
+        state = state or {}
+
+        self.__consecutive_failures = state.get("consecutive_failures", 0)
+        self.__last_error = state.get("last_error")
+        self.__skips_left = state.get("skips_left", 0)
+        self.__durations = list(state.get("durations", []))
+
+    def get_consecutive_failures(self):
+        """
+        Returns how many times in a row the source has failed.
+        """
+
+        return self.__consecutive_failures
+
+    def get_last_error(self):
+        """
+        Returns the error from the last time the source failed (None if it never has).
+        """
+
+        return self.__last_error
+
+    def is_open(self, threshold):
+        """
+        Returns whether the source has failed enough times in a row to stop running it (never if
+        the threshold is 0).
+        """
+
+        return 0 < threshold <= self.__consecutive_failures
+
+    def skip(self, threshold):
+        """
+        Returns whether the source should be skipped this run, counting the run towards its next
+        probe if so.
+        """
+
+        if not self.is_open(threshold) or self.__skips_left <= 0:
+            return False
+
+        self.__skips_left -= 1
+
+        return True
+
+    def record_success(self, duration):
+        """
+        Records a successful scrape, closing the circuit.
+        """
+
+        self.__consecutive_failures = 0
+        self.__skips_left = 0
+        self.__record_duration(duration)
+
+    def record_failure(self, error, duration, threshold):
+        """
+        Records a failed scrape, working out how many runs to skip before the next probe if this
+        opens the circuit (or was a probe that failed).
+        """
+
+        self.__consecutive_failures += 1
+        self.__last_error = error
+        self.__record_duration(duration)
+
+        if self.is_open(threshold):
+            probes = self.__consecutive_failures - threshold
+            self.__skips_left = min(2 ** probes, self.MAX_SKIPPED_RUNS)
+
+    def get_latency_percentile(self, percentile):
+        """
+        Returns a percentile (0 to 100) of the recent scrape times in seconds (None if there
+        aren't any), by the nearest rank method.
+        """
+
+        if not self.__durations:
+            return None
+
+        durations = sorted(self.__durations)
+        rank = max(math.ceil(percentile / 100 * len(durations)), 1)
+
+        return durations[rank - 1]
+
+    def to_dict(self):
+        """
+        Returns the health as a dictionary, for saving.
+        """
+
+        return {
+            "consecutive_failures": self.__consecutive_failures,
+            "last_error": self.__last_error,
+            "skips_left": self.__skips_left,
+            "durations": self.__durations,
+            "latency_p50": self.get_latency_percentile(50),
+            "latency_p95": self.get_latency_percentile(95),
+        }
+
+    def __record_duration(self, duration):
+        self.__durations = (self.__durations + [round(duration, 3)])[-self.__DURATIONS:]
@@ -0,0 +1,101 @@
+# pylint: disable=import-outside-toplevel, invalid-name
+
+"""
+HTTP helpers.
+"""
+
+import threading
+from urllib.parse import urlparse
+
+from best_new_music_digest import report
+
+__lock = threading.Lock()
+__session = None
+
+
+def get_session():
+    """
+    Returns the HTTP session shared by everything that makes requests, so that connections to each
+    host are pooled, kept alive and reused.
+    """
+
+    global __session  # pylint: disable=global-statement
+
+    with __lock:
+        if __session is None:
+            __session = create_session()
+
+        return __session
+
+
+def close_session():
+    """
+    Closes the shared HTTP session and its connections.
+    """
+
+    global __session  # pylint: disable=global-statement
+
+    with __lock:
+        if __session is not None:
+            __session.close()
+            __session = None
+
+
+def create_session(max_retries=None):
+    """
+    Returns a new HTTP session that records its requests in the run report. Requests to each host
+    are kept within its rate limits (see ratelimit), shared between sessions. Requests time out
+    after HTTP_CONNECT_TIMEOUT/HTTP_READ_TIMEOUT seconds unless given their own timeout and are
+    retried with backoff on connection errors and 5xx responses, unless other retries are given
+    (anything requests' HTTPAdapter accepts for max_retries). Requests are recorded to or replayed
+    from the HTTP cassette if one is configured.
+    """
+
+    import requests
+
+    from best_new_music_digest import cassette, settings
+    from best_new_music_digest.adapters import RateLimitedHTTPAdapter
+
+    session = requests.Session()
+    session.hooks["response"].append(__record_response)
+
+    if max_retries is None:
+        max_retries = get_retry()
+
+    timeout = (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT)
+    http_cassette = cassette.get_cassette()
+
+    if http_cassette is not None:
+        adapter = http_cassette.create_adapter(max_retries, timeout)
+    else:
+        adapter = RateLimitedHTTPAdapter(timeout=timeout, max_retries=max_retries)
+
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def get_retry(status_forcelist=(500, 502, 503, 504)):
+    """
+    Returns the retry policy for requests: HTTP_RETRIES retries with exponential backoff on
+    connection errors, read errors (for idempotent requests) and responses with the given statuses.
+    """
+
+    from best_new_music_digest import settings
+    from urllib3.util.retry import Retry
+
+    return Retry(total=settings.HTTP_RETRIES,
+                 backoff_factor=0.5,
+                 status_forcelist=status_forcelist,
+                 raise_on_status=False)
+
+
+def __record_response(response, *_, **kwargs):
+    if kwargs.get("stream"):
+        # Reading the content here would download a streamed body up front
+        size = int(response.headers.get("Content-Length", 0))
+    else:
+        size = len(response.content or b"")
+
+    report.record_http(urlparse(response.url).hostname, size)
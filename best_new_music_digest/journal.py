@@ -0,0 +1,120 @@
+# pylint: disable=broad-except, import-outside-toplevel
+
+"""
+Run journals.
+"""
+
+import copy
+import time
+import uuid
+
+
+class Journal:
+    """
+    The output of each stage of a run (the scraped digest, dad joke, Spotify track IDs, playlist
+    URLs and whether the email was sent), saved as each stage completes so that a run that fails
+    or is killed before the email has gone out can be resumed by the next one without redoing the
+    stages that had already completed. Its journal is deleted once a run has finished.
+    """
+
+    def __init__(self, checkpointer, state=None):
+        state = state or {}
+
+        self.__checkpointer = checkpointer
+        self.__run_id = state.get("run_id") or uuid.uuid4().hex
+        self.__started = state.get("started", time.time())
+        self.__stages = copy.deepcopy(state.get("stages", {}))
+        self.__resumed = bool(self.__stages)
+
+    def get_run_id(self):
+        """
+        Returns the ID of the run.
+        """
+
+        return self.__run_id
+
+    def is_resumed(self):
+        """
+        Returns whether any stages had completed before this run.
+        """
+
+        return self.__resumed
+
+    def completed(self, stage):
+        """
+        Returns whether a stage has completed.
+        """
+
+        return stage in self.__stages
+
+    def get(self, stage):
+        """
+        Returns the output of a stage (None if it hasn't completed).
+        """
+
+        return copy.deepcopy(self.__stages.get(stage))
+
+    def complete(self, stage, output=None):
+        """
+        Records the output of a stage and saves the journal. A journal that fails to save doesn't
+        stop the run, it just can't be resumed from this stage.
+        """
+
+        self.__stages[stage] = copy.deepcopy(output)
+
+        try:
+            self.__checkpointer.save_journal(self.to_dict())
+        except Exception as exception:
+            print(f"Failed to save run journal after {stage} stage")
+            print(exception)
+
+    def finish(self):
+        """
+        Deletes the journal as there's nothing left to resume.
+        """
+
+        try:
+            self.__checkpointer.delete_journal(self.__run_id)
+        except Exception as exception:
+            print("Failed to delete run journal")
+            print(exception)
+
+    def to_dict(self):
+        """
+        Returns the journal as a dictionary.
+        """
+
+        return {
+            "run_id": self.__run_id,
+            "started": self.__started,
+            "stages": copy.deepcopy(self.__stages),
+        }
+
+
+def open_journal(checkpointer, max_age):
+    """
+    Returns the journal of the latest run that didn't finish if it started less than max_age
+    seconds ago, or a new journal if not. Journals aren't saved at all if max_age is 0.
+    """
+
+    from best_new_music_digest.checkpoint import NullCheckpointer
+
+    if not max_age:
+        return Journal(NullCheckpointer())
+
+    try:
+        state = checkpointer.get_latest_journal()
+    except Exception as exception:
+        print("Failed to load run journal")
+        print(exception)
+        state = None
+
+    if state and time.time() - state["started"] < max_age:
+        return Journal(checkpointer, state)
+
+    # Too old to be worth sending, and the items in it will be scraped again as their checkpoints
+    # were never saved
+    if state:
+        Journal(checkpointer, state).finish()
+
+    return Journal(checkpointer)
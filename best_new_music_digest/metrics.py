@@ -0,0 +1,210 @@
+# pylint: disable=import-outside-toplevel, invalid-name
+
+"""
+Prometheus metrics.
+"""
+
+import os
+import threading
+import time
+
+# Latency buckets in seconds, from a single Spotify search up to a whole run
+__BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+__METRICS = {
+    "bnmd_runs_total": ("counter", "Runs of the app by whether they succeeded."),
+    "bnmd_last_run_timestamp_seconds": ("gauge", "When the last run finished."),
+    "bnmd_run_duration_seconds": ("histogram", "How long runs take."),
+    "bnmd_stage_duration_seconds": ("histogram", "How long each stage of a run takes."),
+    "bnmd_http_requests_total": ("counter", "HTTP requests made by host."),
+    "bnmd_http_response_bytes_total": ("counter", "HTTP response bytes received by host."),
+    "bnmd_http_throttled_total": ("counter", "HTTP requests throttled (429) by host."),
+    "bnmd_api_quota_units_total": ("counter", "API quota units used by API."),
+    "bnmd_source_items_total": ("counter", "New items found by each source."),
+    "bnmd_source_errors_total": ("counter", "Scrapes of each source that failed."),
+    "bnmd_source_skips_total": ("counter", "Runs each source was skipped by its circuit breaker."),
+    "bnmd_source_circuit_open": ("gauge", "Whether each source's circuit breaker is open."),
+    "bnmd_spotify_searches_total": ("counter", "Spotify searches by type and cascade step."),
+    "bnmd_spotify_lookups_total": ("counter", "Albums and tracks looked up on Spotify by result."),
+    "bnmd_spotify_cache_total": ("counter", "Spotify search cache lookups by result."),
+    "bnmd_playlist_tracks_added_total": ("counter", "Tracks added to playlists by playlist type."),
+}
+
+__lock = threading.Lock()
+__values = {}
+
+
+def inc(name, amount=1, **labels):
+    """
+    Increments a counter.
+    """
+
+    with __lock:
+        key = __key(name, labels)
+        __values[key] = __values.get(key, 0) + amount
+
+
+def set_gauge(name, value, **labels):
+    """
+    Sets a gauge.
+    """
+
+    with __lock:
+        __values[__key(name, labels)] = value
+
+
+def observe(name, value, **labels):
+    """
+    Records a value in a histogram.
+    """
+
+    with __lock:
+        key = __key(name, labels)
+        histogram = __values.setdefault(key, {
+            "buckets": [0] * len(__BUCKETS),
+            "sum": 0,
+            "count": 0,
+        })
+
+        for index, bucket in enumerate(__BUCKETS):
+            if value <= bucket:
+                histogram["buckets"][index] += 1
+
+        histogram["sum"] += value
+        histogram["count"] += 1
+
+
+def observe_run(run_report, succeeded):
+    """
+    Records a finished run from its run report (as a dictionary).
+    """
+
+    inc("bnmd_runs_total", result="success" if succeeded else "failure")
+    set_gauge("bnmd_last_run_timestamp_seconds", time.time())
+    observe("bnmd_run_duration_seconds", run_report["duration"])
+
+    for stage_span in run_report["spans"]:
+        observe("bnmd_stage_duration_seconds", stage_span["duration"], stage=stage_span["name"])
+
+    for host_http in run_report["http"]["hosts"]:
+        inc("bnmd_http_requests_total", host_http["requests"], host=host_http["host"])
+        inc("bnmd_http_response_bytes_total", host_http["bytes"], host=host_http["host"])
+
+    for api, units in run_report["quota"].items():
+        inc("bnmd_api_quota_units_total", units, api=api)
+
+
+def render():
+    """
+    Returns the metrics in the Prometheus text exposition format.
+    """
+
+    with __lock:
+        values = sorted(__values.items())
+
+    lines = []
+
+    for name, (metric_type, description) in __METRICS.items():
+        metric_values = [(labels, value) for (key, labels), value in values if key == name]
+
+        if not metric_values:
+            continue
+
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+        for labels, value in metric_values:
+            if metric_type == "histogram":
+                for bucket, count in zip(__BUCKETS, value["buckets"]):
+                    bucket_labels = labels + (("le", str(bucket)),)
+                    lines.append(f"{name}_bucket{__format_labels(bucket_labels)} {count}")
+
+                bucket_labels = labels + (("le", "+Inf"),)
+                lines.append(f"{name}_bucket{__format_labels(bucket_labels)} {value['count']}")
+                lines.append(f"{name}_sum{__format_labels(labels)} {value['sum']}")
+                lines.append(f"{name}_count{__format_labels(labels)} {value['count']}")
+            else:
+                lines.append(f"{name}{__format_labels(labels)} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path):
+    """
+    Writes the metrics to a file for the node exporter's textfile collector. The file is replaced
+    in one go so that the collector never reads it half written.
+    """
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+
+    with open(temp_path, "w", encoding="utf-8") as metrics_file:
+        metrics_file.write(render())
+
+    os.replace(temp_path, path)
+
+
+def serve(port):
+    """
+    Serves the metrics on /metrics at the given port from a background thread. Returns the server
+    so that it can be shut down.
+    """
+
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """
+        Handles requests for metrics.
+        """
+
+        def do_GET(self):
+            """
+            Responds with the metrics.
+            """
+
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+
+            body = render().encode("utf-8")
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_):
+            """
+            Doesn't log every scrape of the metrics.
+            """
+
+    server = ThreadingHTTPServer(("", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+def reset():
+    """
+    Clears every metric.
+    """
+
+    with __lock:
+        __values.clear()
+
+
+def __key(name, labels):
+    if name not in __METRICS:
+        raise Exception(f"Unknown metric: {name}.")
+
+    return name, tuple(sorted(labels.items()))
+
+
+def __format_labels(labels):
+    if not labels:
+        return ""
+
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    return "{" + ",".join(f'{label}="{escape(value)}"' for label, value in labels) + "}"
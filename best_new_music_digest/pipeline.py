@@ -0,0 +1,127 @@
+# pylint: disable=broad-except, too-many-arguments, too-many-locals
+
+"""
+Streaming pipeline.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from best_new_music_digest import settings
+from best_new_music_digest.dad_joke import get_dad_joke
+from best_new_music_digest.deadline import Deadline
+from best_new_music_digest.playlist import create_playlists, get_spotify, get_track_ids
+
+
+# Share of the pipeline's deadline that scrapers can take, leaving the rest for searching Spotify
+# for the last ones' items and creating the playlists
+__SCRAPE_SHARE = 0.75
+
+
+def run(scrapers, spotify=None, deadline=None, search_cache=None, on_track_ids=None):
+    """
+    Runs the scrapers, searching Spotify for each digest item as soon as its scraper has finished
+    and fetching the dad joke alongside. Returns the digest, dad joke and playlist URLs. Scrapers
+    still running when their share of the deadline is up are reported as failed, and items left
+    to search for when the deadline passes are skipped. Search results are shared between digest
+    items through the search cache. If on_track_ids is given, it's called with the track IDs found
+    for each digest item once they've all been searched for, before the playlists are created.
+    """
+
+    return asyncio.run(__run(scrapers,
+                             spotify,
+                             deadline or Deadline(),
+                             {} if search_cache is None else search_cache,
+                             on_track_ids))
+
+
+async def __run(scrapers, spotify, deadline, search_cache, on_track_ids):
+    scrape_deadline = deadline.share(__SCRAPE_SHARE)
+    loop = asyncio.get_running_loop()
+    scraper_executor = ThreadPoolExecutor(max_workers=settings.SCRAPER_MAX_WORKERS)
+    executor = ThreadPoolExecutor(max_workers=2)
+    queue = asyncio.Queue()
+
+    try:
+        dad_joke = loop.run_in_executor(executor, get_dad_joke, None, deadline)
+
+        producers = [
+            __produce(loop, scraper_executor, queue, index, scraper, scrape_deadline)
+            for index, scraper in enumerate(scrapers)
+        ]
+
+        _, (digest, spotify, track_ids) = await asyncio.gather(
+            asyncio.gather(*producers),
+            __consume(loop, executor, queue, len(scrapers), spotify, search_cache, deadline),
+        )
+
+        if track_ids is not None and on_track_ids:
+            on_track_ids(track_ids)
+
+        if track_ids is not None:
+            albums_playlist_url, tracks_playlist_url = await loop.run_in_executor(
+                executor,
+                create_playlists,
+                digest,
+                spotify,
+                track_ids,
+            )
+        else:
+            albums_playlist_url, tracks_playlist_url = None, None
+
+        return digest, await dad_joke, albums_playlist_url, tracks_playlist_url
+    finally:
+        # Don't block on scrapers that have timed out
+        scraper_executor.shutdown(wait=False)
+        executor.shutdown(wait=False)
+
+
+async def __produce(loop, executor, queue, index, scraper, deadline):
+    # Scrapers queued behind a full pool only start once an earlier batch has finished
+    batch = index // settings.SCRAPER_MAX_WORKERS + 1
+    timeout = deadline.timeout(settings.SCRAPER_TIMEOUT * batch)
+
+    future = loop.run_in_executor(executor, scraper.scrape, deadline)
+
+    try:
+        # Shielded so that the scrape's result can still be waited for if it can't be cancelled
+        digest_item = await asyncio.wait_for(asyncio.shield(future), timeout)
+    except asyncio.TimeoutError:
+        if scraper.cancel():
+            print(f"{scraper.get_title()} scraper timed out after "
+                  f"{settings.SCRAPER_TIMEOUT} seconds")
+            digest_item = scraper.get_error_digest_item()
+        else:
+            # It's already saving its checkpoint so it's about to finish
+            digest_item = await future
+
+    await queue.put((index, digest_item))
+
+
+async def __consume(loop, executor, queue, size, spotify, search_cache, deadline):
+    digest = [None] * size
+    track_ids = [[] for _ in range(size)]
+
+    for _ in range(size):
+        index, digest_item = await queue.get()
+        digest[index] = digest_item
+
+        if track_ids is None or not settings.CREATE_SPOTIFY_PLAYLISTS or not digest_item["items"]:
+            continue
+
+        try:
+            if not spotify:
+                spotify = await loop.run_in_executor(executor, get_spotify)
+            track_ids[index] = await loop.run_in_executor(executor,
+                                                          get_track_ids,
+                                                          digest_item,
+                                                          spotify,
+                                                          search_cache,
+                                                          deadline)
+        except Exception as exception:
+            print("Failed to create playlists")
+            print(exception)
+            spotify = None
+            track_ids = None
+
+    return digest, spotify, track_ids
@@ -1,21 +1,25 @@
-# pylint: disable=broad-except
+# pylint: disable=broad-except, import-outside-toplevel, too-many-arguments
 
 """
 Playlist helpers.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from difflib import SequenceMatcher
 
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
+from best_new_music_digest import http, metrics, report, settings
 
-from best_new_music_digest import settings
 
-
-def create_playlists(digest):
+@report.timed("playlists")
+def create_playlists(digest, spotify=None, track_ids=None, search_cache=None, deadline=None,
+                     on_track_ids=None):
     """
-    Creates a Spotify playlist.
+    Creates Spotify playlists. Track IDs that have already been found for each digest item can be
+    passed in so that they aren't searched for again, as can a search cache shared between calls.
+    Items still to be searched for when the deadline passes are left out of the playlists. If
+    on_track_ids is given, it's called with the track IDs found for each digest item once they've
+    all been searched for, before the playlists are created.
     """
 
     if not settings.CREATE_SPOTIFY_PLAYLISTS:
@@ -27,25 +31,30 @@ def create_playlists(digest):
         return None, None
 
     try:
-        auth_manager = SpotifyOAuth(scope="playlist-modify-private",
-                                    client_id=settings.SPOTIFY_CLIENT_ID,
-                                    client_secret=settings.SPOTIFY_CLIENT_SECRET,
-                                    username=settings.SPOTIFY_USERNAME,
-                                    redirect_uri="http://localhost:8888/callback")
-        spotify = spotipy.Spotify(auth_manager=auth_manager)
+        spotify = spotify or get_spotify()
         user_id = spotify.me()["id"]
 
+        if track_ids is None:
+            search_cache = {} if search_cache is None else search_cache
+            track_ids = [
+                get_track_ids(digest_item, spotify, search_cache, deadline)
+                for digest_item in digest
+            ]
+
+            if on_track_ids:
+                on_track_ids(track_ids)
+
         album_track_ids = []
-        track_ids = []
+        tracks_track_ids = []
 
-        for digest_item in digest:
+        for digest_item, digest_item_track_ids in zip(digest, track_ids):
             if digest_item["type"] == "albums":
-                album_track_ids.extend(__get_album_track_ids(digest_item, spotify))
+                album_track_ids.extend(digest_item_track_ids)
             elif digest_item["type"] == "tracks":
-                track_ids.extend(__get_track_ids(digest_item, spotify))
+                tracks_track_ids.extend(digest_item_track_ids)
 
         albums_playlist_url = __add_tracks_to_playlist(album_track_ids, spotify, user_id, "albs")
-        tracks_playlist_url = __add_tracks_to_playlist(track_ids, spotify, user_id, "trks")
+        tracks_playlist_url = __add_tracks_to_playlist(tracks_track_ids, spotify, user_id, "trks")
 
         return albums_playlist_url, tracks_playlist_url
     except Exception as exception:
@@ -54,55 +63,79 @@ def create_playlists(digest):
         return None, None
 
 
-def __get_album_track_ids(digest_item, spotify):
+def get_spotify(username=None):
+    """
+    Returns a Spotify client authorised to modify playlists (for SPOTIFY_USERNAME unless another
+    user is given).
+    """
+
+    import spotipy
+    from spotipy.oauth2 import SpotifyOAuth
+
+    # Retry rate limited requests too, like spotipy does with its own session
+    session = http.create_session(
+        max_retries=http.get_retry(status_forcelist=(429, 500, 502, 503, 504)),
+    )
+
+    auth_manager = SpotifyOAuth(scope="playlist-modify-private",
+                                client_id=settings.SPOTIFY_CLIENT_ID,
+                                client_secret=settings.SPOTIFY_CLIENT_SECRET,
+                                username=username or settings.SPOTIFY_USERNAME,
+                                redirect_uri="http://localhost:8888/callback",
+                                requests_session=session)
+    return spotipy.Spotify(auth_manager=auth_manager, requests_session=session)
+
+
+def get_track_ids(digest_item, spotify, search_cache=None, deadline=None):
+    """
+    Returns the Spotify track IDs for the items in a digest item. Search results are stored in the
+    given search cache (keyed by type, artist and title, such as a SearchCache) and reused from it.
+    Once the deadline has passed, items that aren't in the search cache are skipped rather than
+    searched for.
+    """
+
+    if search_cache is None:
+        search_cache = {}
+
+    if not digest_item["items"]:
+        return []
+
+    if digest_item["type"] == "albums":
+        return __get_album_track_ids(digest_item, spotify, search_cache, deadline)
+
+    if digest_item["type"] == "tracks":
+        return __get_track_ids(digest_item, spotify, search_cache, deadline)
+
+    return []
+
+
+def __get_album_track_ids(digest_item, spotify, search_cache, deadline):
     print(f"Searching for {len(digest_item['items'])} albums from {digest_item['title']} scraper")
 
     album_track_ids = []
     found_albums = []
     not_found_albums = []
+    skipped_albums = []
 
-    for item in digest_item["items"]:
-        artist = item["artist"]
-        title = item["title"]
-
-        # Try to find album using the artist and album title
-        album_id = __get_album_id(
-            artist,
-            title,
-            f"artist:{artist} album:{title}",
-            spotify,
-            single_match=True,
-        )
-
-        # Try to find album using the artist's name under latest releases
-        if not album_id:
-            album_id = __get_album_id(artist, title, f"artist:{artist} tag:new", spotify)
-
-        # Try to find album using the album title under latest releases
-        if not album_id:
-            album_id = __get_album_id(artist, title, f"album:{title} tag:new", spotify)
-
-        # Try splitting the artist into multiple artists and searching under latest releases
-        if not album_id:
-            for art in artist.split(" & "):
-                album_id = __get_album_id(art, title, f"artist:{art} tag:new", spotify)
-                if album_id:
-                    break
-
-        # Give up
-        if not album_id:
-            not_found_albums.append((artist, title))
-            continue
+    results = __resolve(digest_item["items"], "albums", __find_album_track_ids, spotify,
+                        search_cache, deadline)
 
-        found_albums.append((artist, title))
+    for (artist, title), (result, track_ids) in results:
+        metrics.inc("bnmd_spotify_lookups_total", type="album", result=result)
 
-        tracks_result = spotify.album_tracks(album_id)
-
-        for track in tracks_result["items"]:
-            album_track_ids.append(track["id"])
+        if result == "skipped":
+            skipped_albums.append((artist, title))
+        elif result == "not_found":
+            not_found_albums.append((artist, title))
+        else:
+            found_albums.append((artist, title))
+            album_track_ids.extend(track_ids)
 
     print(f"Found {len(found_albums)} albums out of {len(digest_item['items'])}")
 
+    if skipped_albums:
+        print(f"Ran out of time to search for {len(skipped_albums)} albums")
+
     if not_found_albums:
         print("Could not find:")
         for album in not_found_albums:
@@ -111,9 +144,47 @@ def __get_album_track_ids(digest_item, spotify):
     return album_track_ids
 
 
-def __get_album_id(artist, title, query, spotify, single_match=False):
+def __find_album_track_ids(artist, title, spotify):
+    # Try to find album using the artist and album title
+    album_id = __get_album_id(
+        artist,
+        title,
+        f"artist:{artist} album:{title}",
+        "artist_album",
+        spotify,
+        single_match=True,
+    )
+
+    # Try to find album using the artist's name under latest releases
+    if not album_id:
+        album_id = __get_album_id(artist, title, f"artist:{artist} tag:new", "new_artist", spotify)
+
+    # Try to find album using the album title under latest releases
+    if not album_id:
+        album_id = __get_album_id(artist, title, f"album:{title} tag:new", "new_album", spotify)
+
+    # Try splitting the artist into multiple artists and searching under latest releases
+    if not album_id:
+        for art in artist.split(" & "):
+            album_id = __get_album_id(art, title, f"artist:{art} tag:new", "new_split_artist",
+                                      spotify)
+            if album_id:
+                break
+
+    if not album_id:
+        return None
+
+    with report.span("spotify/album_tracks"):
+        tracks_result = spotify.album_tracks(album_id)
+
+    return [track["id"] for track in tracks_result["items"]]
+
+
+def __get_album_id(artist, title, query, step, spotify, single_match=False):
     limit = 1 if single_match else 10
-    album_result = spotify.search(q=query, type="album", limit=limit)
+    metrics.inc("bnmd_spotify_searches_total", type="album", step=step)
+    with report.span("spotify/search", type="album", step=step, query=query):
+        album_result = spotify.search(q=query, type="album", limit=limit)
 
     album_items = album_result["albums"]["items"]
 
@@ -129,6 +200,47 @@ def __get_album_id(artist, title, query, spotify, single_match=False):
     return None
 
 
+def __resolve(items, item_type, find, spotify, search_cache, deadline):
+    # Each artist and title is searched for once, with up to SPOTIFY_MAX_WORKERS searches at a
+    # time (kept within Spotify's rate limits by the session). Results come back in the order of
+    # the items so that what's reported and the order of the tracks don't depend on which search
+    # finished first.
+    pairs = [(item["artist"], item["title"]) for item in items]
+
+    def resolve(pair):
+        key = (item_type, *pair)
+
+        if key in search_cache:
+            try:
+                result = search_cache[key]
+                return ("not_found" if result is None else "found"), result
+            except KeyError:
+                # Pushed out of the cache by another search in the meantime
+                pass
+
+        if __out_of_time(deadline):
+            return "skipped", None
+
+        result = find(*pair, spotify)
+        search_cache[key] = result
+
+        return ("not_found" if result is None else "found"), result
+
+    unique_pairs = list(dict.fromkeys(pairs))
+
+    if settings.SPOTIFY_MAX_WORKERS > 1 and len(unique_pairs) > 1:
+        with ThreadPoolExecutor(max_workers=settings.SPOTIFY_MAX_WORKERS) as executor:
+            results = dict(zip(unique_pairs, executor.map(resolve, unique_pairs)))
+    else:
+        results = {pair: resolve(pair) for pair in unique_pairs}
+
+    return [(pair, results[pair]) for pair in pairs]
+
+
+def __out_of_time(deadline):
+    return deadline is not None and deadline.expired()
+
+
 def __similar_enough(str1, str2):
     str1_lower = str1.lower()
     str2_lower = str2.lower()
@@ -138,52 +250,33 @@ def __similar_enough(str1, str2):
            SequenceMatcher(None, str1_lower, str2_lower).ratio() >= 0.75
 
 
-def __get_track_ids(digest_item, spotify):
+def __get_track_ids(digest_item, spotify, search_cache, deadline):
     print(f"Searching for {len(digest_item['items'])} tracks from {digest_item['title']} scraper")
 
     track_ids = []
     found_tracks = []
     not_found_tracks = []
+    skipped_tracks = []
 
-    for item in digest_item["items"]:
-        artist = item["artist"]
-        title = item["title"]
-
-        # Try to find track using the artist and track title
-        track_id = __get_track_id(
-            artist,
-            title,
-            f"artist:{artist} track:{title}",
-            spotify,
-            single_match=True,
-        )
-
-        # Try to find track using the artist's name
-        if not track_id:
-            track_id = __get_track_id(artist, title, f"artist:{artist}", spotify)
-
-        # Try to find track using the track title
-        if not track_id:
-            track_id = __get_track_id(artist, title, f"track:{title}", spotify)
-
-        # Try splitting the artist into multiple artists
-        if not track_id:
-            for art in artist.split(" & "):
-                track_id = __get_track_id(art, title, f"artist:{art}", spotify)
-                if track_id:
-                    break
-
-        # Give up
-        if not track_id:
-            not_found_tracks.append((artist, title))
-            continue
+    results = __resolve(digest_item["items"], "tracks", __find_track_id, spotify, search_cache,
+                        deadline)
 
-        found_tracks.append((artist, title))
+    for (artist, title), (result, track_id) in results:
+        metrics.inc("bnmd_spotify_lookups_total", type="track", result=result)
 
-        track_ids.append(track_id)
+        if result == "skipped":
+            skipped_tracks.append((artist, title))
+        elif result == "not_found":
+            not_found_tracks.append((artist, title))
+        else:
+            found_tracks.append((artist, title))
+            track_ids.append(track_id)
 
     print(f"Found {len(found_tracks)} tracks out of {len(digest_item['items'])}")
 
+    if skipped_tracks:
+        print(f"Ran out of time to search for {len(skipped_tracks)} tracks")
+
     if not_found_tracks:
         print("Could not find:")
         for track in not_found_tracks:
@@ -192,9 +285,40 @@ def __get_track_ids(digest_item, spotify):
     return track_ids
 
 
-def __get_track_id(artist, title, query, spotify, single_match=False):
+def __find_track_id(artist, title, spotify):
+    # Try to find track using the artist and track title
+    track_id = __get_track_id(
+        artist,
+        title,
+        f"artist:{artist} track:{title}",
+        "artist_track",
+        spotify,
+        single_match=True,
+    )
+
+    # Try to find track using the artist's name
+    if not track_id:
+        track_id = __get_track_id(artist, title, f"artist:{artist}", "artist", spotify)
+
+    # Try to find track using the track title
+    if not track_id:
+        track_id = __get_track_id(artist, title, f"track:{title}", "track", spotify)
+
+    # Try splitting the artist into multiple artists
+    if not track_id:
+        for art in artist.split(" & "):
+            track_id = __get_track_id(art, title, f"artist:{art}", "split_artist", spotify)
+            if track_id:
+                break
+
+    return track_id
+
+
+def __get_track_id(artist, title, query, step, spotify, single_match=False):
     limit = 1 if single_match else 10
-    tracks_result = spotify.search(q=query, type="track", limit=limit)
+    metrics.inc("bnmd_spotify_searches_total", type="track", step=step)
+    with report.span("spotify/search", type="track", step=step, query=query):
+        tracks_result = spotify.search(q=query, type="track", limit=limit)
 
     tracks_items = tracks_result["tracks"]["items"]
 
@@ -216,7 +340,8 @@ def __add_tracks_to_playlist(track_ids, spotify, user_id, playlist_type):
 
     date = datetime.utcnow().strftime("%d/%m/%Y")
     playlist_name = f"bnmd ({playlist_type}) - {date}"
-    playlist_response = spotify.user_playlist_create(user_id, playlist_name, public=False)
+    with report.span("spotify/playlist_create"):
+        playlist_response = spotify.user_playlist_create(user_id, playlist_name, public=False)
     playlist_id = playlist_response["id"]
     playlist_url = playlist_response["external_urls"]["spotify"]
 
@@ -232,6 +357,10 @@ def __add_tracks_to_playlist(track_ids, spotify, user_id, playlist_type):
         chunked_track_ids.append(deduplicate_track_ids[i:i + 100])
 
     for track_ids_chunk in chunked_track_ids:
-        spotify.user_playlist_add_tracks(user_id, playlist_id, track_ids_chunk)
+        with report.span("spotify/playlist_add", tracks=len(track_ids_chunk)):
+            spotify.user_playlist_add_tracks(user_id, playlist_id, track_ids_chunk)
+
+        metrics.inc("bnmd_playlist_tracks_added_total", len(track_ids_chunk),
+                    playlist=playlist_type)
 
     return playlist_url
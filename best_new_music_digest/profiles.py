@@ -0,0 +1,85 @@
+# pylint: disable=too-few-public-methods
+
+"""
+Profiles for sending personalised digests to many recipients.
+"""
+
+import json
+
+
+class Profile:
+    """
+    Someone to send a digest to, with their own sources, Spotify account and checkpoints.
+    """
+
+    def __init__(self, name, recipient_emails, sources, spotify_username=None,
+                 checkpoint_namespace=None):
+        self.name = name
+        self.recipient_emails = recipient_emails
+        self.sources = sources
+        self.spotify_username = spotify_username
+        self.checkpoint_namespace = checkpoint_namespace or name
+
+    def get_digest(self, digest, checkpointer):
+        """
+        Returns the profile's digest from a digest scraped without checkpoints, keeping only the
+        sources the profile subscribes to and the items that are newer than its checkpoints. The
+        profile's checkpoints are moved on to the newest items.
+        """
+
+        profile_digest = []
+
+        for digest_item in digest:
+            if digest_item["title"] not in self.sources:
+                continue
+
+            checkpoint_name = f"{self.checkpoint_namespace}/{digest_item['title']}"
+            checkpoint = checkpointer.get_checkpoint(checkpoint_name)
+
+            items = []
+
+            for item in digest_item["items"]:
+                if item["link"] == checkpoint:
+                    break
+
+                items.append(item)
+
+            if items:
+                checkpointer.save_checkpoint(checkpoint_name, items[0]["link"])
+
+            profile_digest.append({**digest_item, "items": items})
+
+        return profile_digest
+
+
+def load_profiles(path):
+    """
+    Loads profiles from a JSON file containing a list of objects with 'name', 'recipient_emails'
+    and 'sources' (scraper titles) and optionally 'spotify_username' and 'checkpoint_namespace'.
+    """
+
+    with open(path, encoding="utf-8") as profiles_file:
+        profiles_json = json.load(profiles_file)
+
+    profiles = []
+
+    for profile_json in profiles_json:
+        missing_properties = [
+            prop for prop in ("name", "recipient_emails", "sources") if prop not in profile_json
+        ]
+
+        if missing_properties:
+            raise Exception(f"Profile missing mandatory properties: {missing_properties}.")
+
+        profiles.append(Profile(
+            profile_json["name"],
+            profile_json["recipient_emails"],
+            profile_json["sources"],
+            profile_json.get("spotify_username"),
+            profile_json.get("checkpoint_namespace"),
+        ))
+
+    if not profiles:
+        raise Exception(f"No profiles found in {path}.")
+
+    return profiles
@@ -0,0 +1,257 @@
+# pylint: disable=import-outside-toplevel, invalid-name, too-many-instance-attributes
+
+"""
+Per-host rate limiting.
+
+Every request to a host waits for a token from the host's token bucket and for a free slot under
+its concurrency limit. The concurrency limit adapts to how the host responds: it goes up by one
+after a full round of quick responses, down by one when responses slow down, and is halved when
+the host throttles requests (with a 429, even one that was retried). A Retry-After header pauses
+every request to the host until then.
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Requests per second and most concurrent requests for each host (and its subdomains), going
+# by each API's documented limits, with '*' for everything else
+__DEFAULT_LIMITS = {
+    "spotify.com": (10, 8),
+    "googleapis.com": (10, 4),
+    "pitchfork.com": (2, 2),
+    "sputnikmusic.com": (2, 2),
+    "*": (5, 4),
+}
+
+__lock = threading.Lock()
+__limiters = {}
+
+
+class TokenBucket:
+    """
+    Token bucket that lets through a steady number of requests per second, with bursts of up to
+    its capacity.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.__rate = rate
+        self.__capacity = capacity or max(rate, 1)
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__lock = threading.Lock()
+        self.__tokens = self.__capacity
+        self.__updated = clock()
+        self.__paused_until = 0
+
+    def acquire(self):
+        """
+        Takes a token, waiting until there is one.
+        """
+
+        while True:
+            with self.__lock:
+                now = self.__clock()
+                self.__tokens = min(self.__capacity,
+                                    self.__tokens + (now - self.__updated) * self.__rate)
+                self.__updated = now
+
+                if now < self.__paused_until:
+                    wait = self.__paused_until - now
+                elif self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.__tokens) / self.__rate
+
+            self.__sleep(wait)
+
+    def pause(self, seconds):
+        """
+        Stops tokens being taken for the given number of seconds.
+        """
+
+        with self.__lock:
+            self.__paused_until = max(self.__paused_until, self.__clock() + seconds)
+            self.__tokens = 0
+
+
+class HostLimiter:
+    """
+    Rate and adaptive concurrency limits for requests to a host.
+    """
+
+    # Longest a Retry-After header can pause the host for, as a run has to finish at some point
+    __MAX_RETRY_AFTER = 60
+
+    # How much slower than the quickest response the average can get before backing off
+    __LATENCY_TOLERANCE = 2
+
+    # Weight of each new response in the average latency
+    __LATENCY_WEIGHT = 0.2
+
+    def __init__(self, rate, max_concurrency, clock=time.monotonic, sleep=time.sleep):
+        self.__bucket = TokenBucket(rate, clock=clock, sleep=sleep)
+        self.__max_concurrency = max_concurrency
+        self.__condition = threading.Condition()
+        self.__limit = max(max_concurrency // 2, 1)
+        self.__active = 0
+        self.__quick_responses = 0
+        self.__min_latency = None
+        self.__latency = None
+
+    def get_limit(self):
+        """
+        Returns how many requests can currently be made to the host at the same time.
+        """
+
+        with self.__condition:
+            return self.__limit
+
+    def acquire(self):
+        """
+        Waits until a request can be made to the host.
+        """
+
+        with self.__condition:
+            while self.__active >= self.__limit:
+                self.__condition.wait()
+
+            self.__active += 1
+
+        try:
+            self.__bucket.acquire()
+        except BaseException:
+            self.release()
+            raise
+
+    def release(self, latency=None, throttled=False, retry_after=None):
+        """
+        Frees up the slot taken by a request once it has finished, adapting the limits to how
+        long it took and whether it was throttled.
+        """
+
+        if retry_after:
+            self.__bucket.pause(min(retry_after, self.__MAX_RETRY_AFTER))
+
+        with self.__condition:
+            self.__active -= 1
+
+            if throttled:
+                self.__decrease(self.__limit // 2)
+            elif latency is not None:
+                self.__observe_latency(latency)
+
+            self.__condition.notify_all()
+
+    def __observe_latency(self, latency):
+        self.__min_latency = min(self.__min_latency or latency, latency)
+        self.__latency = latency if self.__latency is None else (
+            self.__LATENCY_WEIGHT * latency + (1 - self.__LATENCY_WEIGHT) * self.__latency)
+
+        if self.__latency > self.__min_latency * self.__LATENCY_TOLERANCE:
+            self.__decrease(1)
+
+            # Back off from the slowdown once, rather than on every slow response
+            self.__latency = self.__min_latency * self.__LATENCY_TOLERANCE
+            return
+
+        self.__quick_responses += 1
+
+        if self.__quick_responses >= self.__limit:
+            self.__limit = min(self.__limit + 1, self.__max_concurrency)
+            self.__quick_responses = 0
+
+    def __decrease(self, amount):
+        self.__limit = max(self.__limit - max(amount, 1), 1)
+        self.__quick_responses = 0
+
+
+def get_limiter(host):
+    """
+    Returns the limiter shared by every request to a host (None if it isn't rate limited).
+    """
+
+    limits = get_limits()
+    group = get_group(host)
+
+    with __lock:
+        if group not in __limiters:
+            rate, max_concurrency = limits.get(group, limits["*"])
+            __limiters[group] = HostLimiter(rate, max_concurrency) if rate > 0 else None
+
+        return __limiters[group]
+
+
+def get_group(host):
+    """
+    Returns the host that a host's requests are limited under: the configured domain it is part
+    of, or itself.
+    """
+
+    host = (host or "").lower()
+
+    for domain in get_limits():
+        if host == domain or host.endswith(f".{domain}"):
+            return domain
+
+    return host
+
+
+def get_limits():
+    """
+    Returns the requests per second and most concurrent requests for each host, with the
+    RATE_LIMITS setting applied to the defaults.
+    """
+
+    from best_new_music_digest import settings
+
+    limits = dict(__DEFAULT_LIMITS)
+
+    for host, rate in settings.RATE_LIMITS.items():
+        limits[host] = (rate, limits.get(host, limits["*"])[1])
+
+    return limits
+
+
+def reset():
+    """
+    Forgets every host's limiter, so that they start again from their configured limits.
+    """
+
+    with __lock:
+        __limiters.clear()
+
+
+def get_retry_after(response):
+    """
+    Returns the number of seconds a response's Retry-After header asks to wait (None if it doesn't
+    have a valid one).
+    """
+
+    retry_after = response.headers.get("Retry-After")
+
+    if not retry_after:
+        return None
+
+    try:
+        return max(float(retry_after), 0)
+    except ValueError:
+        pass
+
+    try:
+        return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_throttled(response):
+    """
+    Returns whether a host throttled a request, either in its response or in a response that was
+    retried.
+    """
+
+    history = getattr(getattr(getattr(response, "raw", None), "retries", None), "history", ())
+
+    return response.status_code == 429 or any(
+        getattr(attempt, "status", None) == 429 for attempt in history or ())
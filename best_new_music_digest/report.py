@@ -0,0 +1,184 @@
+# pylint: disable=invalid-name
+
+"""
+Run reports.
+"""
+
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+__report = None
+
+
+class RunReport:
+    """
+    Records how long each stage of a run takes, how much HTTP traffic it makes and how much API
+    quota it uses.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__started_at = datetime.utcnow()
+        self.__start = time.monotonic()
+        self.__end = None
+        self.__spans = []
+        self.__http = {}
+        self.__quota = {}
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Times the code run within it, recording it under the given name and attributes.
+        """
+
+        start = time.monotonic()
+
+        try:
+            yield
+        finally:
+            end = time.monotonic()
+
+            with self.__lock:
+                self.__spans.append({
+                    "name": name,
+                    **attributes,
+                    "start": round(start - self.__start, 6),
+                    "duration": round(end - start, 6),
+                })
+
+    def record_http(self, host, size):
+        """
+        Records an HTTP request made to a host and the size of its response body in bytes.
+        """
+
+        with self.__lock:
+            host_http = self.__http.setdefault(host, {"requests": 0, "bytes": 0})
+            host_http["requests"] += 1
+            host_http["bytes"] += size
+
+    def record_quota(self, api, units):
+        """
+        Records units of an API's quota being used.
+        """
+
+        with self.__lock:
+            self.__quota[api] = self.__quota.get(api, 0) + units
+
+    def finish(self):
+        """
+        Marks the run as finished.
+        """
+
+        self.__end = time.monotonic()
+
+    def to_dict(self):
+        """
+        Returns the report as a dictionary that can be serialised as JSON. Hosts are listed rather
+        than used as keys, as MongoDB doesn't allow the dots in them in field names.
+        """
+
+        with self.__lock:
+            spans = sorted(self.__spans, key=lambda s: s["start"])
+            hosts = [{"host": host, **host_http} for host, host_http in sorted(self.__http.items())]
+            quota = dict(self.__quota)
+
+        stages = {}
+        for stage_span in spans:
+            stage = stages.setdefault(stage_span["name"], {"count": 0, "duration": 0})
+            stage["count"] += 1
+            stage["duration"] = round(stage["duration"] + stage_span["duration"], 6)
+
+        end = self.__end if self.__end is not None else time.monotonic()
+
+        return {
+            "started_at": self.__started_at.isoformat(),
+            "duration": round(end - self.__start, 6),
+            "stages": stages,
+            "spans": spans,
+            "http": {
+                "requests": sum(h["requests"] for h in hosts),
+                "bytes": sum(h["bytes"] for h in hosts),
+                "hosts": hosts,
+            },
+            "quota": quota,
+        }
+
+    def save(self, path):
+        """
+        Writes the report to a JSON file.
+        """
+
+        with open(path, "w", encoding="utf-8") as report_file:
+            json.dump(self.to_dict(), report_file, indent=2)
+
+
+def start_report():
+    """
+    Starts a new report for the current run and returns it.
+    """
+
+    global __report  # pylint: disable=global-statement
+
+    __report = RunReport()
+
+    return __report
+
+
+def get_report():
+    """
+    Returns the report for the current run (None if one hasn't been started).
+    """
+
+    return __report
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Times the code run within it in the current run's report (if there is one).
+    """
+
+    if __report is None:
+        yield
+        return
+
+    with __report.span(name, **attributes):
+        yield
+
+
+def timed(name):
+    """
+    Decorator that times every call to a function in the current run's report.
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_http(host, size):
+    """
+    Records an HTTP request in the current run's report (if there is one).
+    """
+
+    if __report is not None:
+        __report.record_http(host, size)
+
+
+def record_quota(api, units):
+    """
+    Records API quota used in the current run's report (if there is one).
+    """
+
+    if __report is not None:
+        __report.record_quota(api, units)
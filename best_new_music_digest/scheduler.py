@@ -0,0 +1,101 @@
+# pylint: disable=too-few-public-methods
+
+"""
+Cron-like scheduling.
+"""
+
+from datetime import datetime, timedelta
+
+
+class CronSchedule:
+    """
+    A schedule described by a five field cron expression (minute, hour, day of month, month and
+    day of week). Fields can be '*', numbers, ranges and lists, each optionally with a step (e.g.
+    '*/15', '1-5', '0,30' or '9-17/2'). Days of the week run from 0 (Sunday) to 6 (Saturday).
+    """
+
+    __FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+    def __init__(self, expression):
+        fields = expression.split()
+
+        if len(fields) != len(self.__FIELD_RANGES):
+            raise Exception(f"Invalid cron expression: {expression}.")
+
+        parsed = []
+
+        for field, (minimum, maximum) in zip(fields, self.__FIELD_RANGES):
+            try:
+                parsed.append(self.__parse_field(field, minimum, maximum))
+            except ValueError as error:
+                raise Exception(f"Invalid cron expression: {expression}.") from error
+
+        self.__minutes = parsed[0]
+        self.__hours = parsed[1]
+        self.__days = parsed[2]
+        self.__months = parsed[3]
+        self.__weekdays = parsed[4]
+
+        # Like cron, when both day fields are restricted a day matches if either of them does
+        self.__any_day = fields[2] == "*"
+        self.__any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def __parse_field(field, minimum, maximum):
+        values = set()
+
+        for part in field.split(","):
+            value_range, _, step = part.partition("/")
+            step = int(step) if step else 1
+
+            if value_range == "*":
+                start, end = minimum, maximum
+            elif "-" in value_range:
+                start, end = (int(value) for value in value_range.split("-"))
+            else:
+                start = int(value_range)
+                end = maximum if step > 1 else start
+
+            if start < minimum or end > maximum or start > end or step < 1:
+                raise ValueError(part)
+
+            values.update(range(start, end + 1, step))
+
+        return values
+
+    def next_after(self, after):
+        """
+        Returns the first time after the given datetime that matches the schedule.
+        """
+
+        time = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+
+        # Every valid schedule matches at least once within a leap year cycle
+        limit = time + timedelta(days=366 * 4)
+
+        while time < limit:
+            if time.month not in self.__months:
+                time = datetime(time.year + time.month // 12, time.month % 12 + 1, 1,
+                                tzinfo=time.tzinfo)
+            elif not self.__day_matches(time):
+                time = time.replace(hour=0, minute=0) + timedelta(days=1)
+            elif time.hour not in self.__hours:
+                time = time.replace(minute=0) + timedelta(hours=1)
+            elif time.minute not in self.__minutes:
+                time += timedelta(minutes=1)
+            else:
+                return time
+
+        raise Exception("Cron expression never matches.")
+
+    def __day_matches(self, time):
+        day_matches = time.day in self.__days
+        weekday_matches = (time.weekday() + 1) % 7 in self.__weekdays
+
+        if self.__any_day:
+            return weekday_matches
+
+        if self.__any_weekday:
+            return day_matches
+
+        return day_matches or weekday_matches
@@ -1,43 +1,205 @@
-# pylint: disable=broad-except, no-self-use, too-few-public-methods
+# pylint: disable=broad-except, import-outside-toplevel, no-self-use, too-few-public-methods, too-many-instance-attributes
 
 """
 Base scrapers.
 """
 
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from best_new_music_digest import http, metrics, report, urls
+from best_new_music_digest.health import SourceHealth
+from best_new_music_digest.seen import SeenItems
+
 
 class Scraper:
     """
     Base scraper.
     """
 
-    def __init__(self, checkpointer, title, link, scraper_type):
+    # Later pages to fetch at the same time when backfilling
+    __BACKFILL_BATCH_SIZE = 4
+
+    # Whether every item has its own link, so that items can be recognised by their links
+    _unique_links = True
+
+    def __init__(self, checkpointer, title, link, scraper_type, session=None):
         self.__checkpointer = checkpointer
+        self.__session = session
         self.__title = title
         self.__link = link
         self.__type = scraper_type
-        self.__saved_checkpoint = False
+        self.__lock = threading.Lock()
+        self.__cancelled = False
+        self.__committing = False
+        self.__deadline = None
+        self.__pending_checkpoint = None
+        self.__validators = {}
+        self.__checkpoint = {}
+        self.__responses = []
 
-    def scrape(self):
+    def scrape(self, deadline=None):
         """
-        Scrapes music information.
+        Scrapes music information, giving up if the deadline passes before it's finished.
         """
 
+        from best_new_music_digest import settings
+
+        threshold = settings.CIRCUIT_BREAKER_THRESHOLD
+
+        health = self.__load_health()
+
+        if health.skip(threshold):
+            print(f"Skipping {self.__title} scraper as it has failed "
+                  f"{health.get_consecutive_failures()} times in a row")
+            self.__save_health(health, threshold)
+            metrics.inc("bnmd_source_skips_total", source=self.__title)
+            return self.__to_digest_item([], True, health)
+
         print(f"Running {self.__title} scraper")
 
         errors = False
+        error = None
+        start = time.monotonic()
+
+        with self.__lock:
+            self.__committing = False
+
+        self.__deadline = deadline
 
         try:
-            items = self._get_items()
-            self.__sanitise_items(items)
+            with self._span():
+                with self._span("checkpoint"):
+                    seen_items = SeenItems(self.__checkpointer, self.__title, self._unique_links)
+
+                items = self._get_items()
+                self.__sanitise_items(items)
+                items = self.__remove_seen_items(items, seen_items)
+
+            if not self.__commit(seen_items):
+                print(f"{self.__title} scraper was cancelled so nothing was saved")
+                items = []
+                errors = True
+                error = "Timed out"
         except Exception as exception:
             print("Failed to run successfully")
             print(exception)
             items = []
             errors = True
+            error = str(exception) or type(exception).__name__
+        finally:
+            # Streamed responses are left open if the scraper stopped reading them early
+            for response in self.__responses:
+                response.close()
+
+            self.__deadline = None
+            self.__pending_checkpoint = None
+            self.__validators = {}
+            self.__checkpoint = {}
+            self.__responses = []
+
+        if errors:
+            health.record_failure(error, time.monotonic() - start, threshold)
+        else:
+            health.record_success(time.monotonic() - start)
+
+        self.__save_health(health, threshold)
 
         print(f"Found {len(items)} new {self.__type}")
 
-        return {
+        metrics.inc("bnmd_source_items_total", len(items), source=self.__title)
+        if errors:
+            metrics.inc("bnmd_source_errors_total", source=self.__title)
+
+        return self.__to_digest_item(items, errors)
+
+    def __load_health(self):
+        # A source whose health can't be loaded is run as if it were healthy, so that it's still
+        # reported on (and fails with the rest of the scrape if storage is down)
+        try:
+            with self._span("checkpoint"):
+                return SourceHealth(self.__checkpointer.get_health(self.__title))
+        except Exception as exception:
+            print(f"Failed to load {self.__title} health")
+            print(exception)
+            return SourceHealth()
+
+    def __save_health(self, health, threshold):
+        metrics.set_gauge("bnmd_source_circuit_open", int(health.is_open(threshold)),
+                          source=self.__title)
+
+        # A scrape's result doesn't depend on its health being saved
+        try:
+            with self._span("checkpoint"):
+                self.__checkpointer.save_health(self.__title, health.to_dict())
+        except Exception as exception:
+            print(f"Failed to save {self.__title} health")
+            print(exception)
+
+    def cancel(self):
+        """
+        Stops a scrape that has timed out from making any more requests or saving its checkpoint
+        and validators, as its items won't be used. Returns False if it's too late because the
+        scrape has already finished or is saving them (and so is about to finish).
+        """
+
+        with self.__lock:
+            if self.__committing:
+                return False
+
+            self.__cancelled = True
+
+            return True
+
+    def __remove_seen_items(self, items, seen_items):
+        # Without a checkpoint (on the first run, or after it has been reset to send everything
+        # again) nothing is filtered out, but the items are still recorded as seen
+        filter_seen = self._get_checkpoint() is not None
+        new_items = []
+
+        for item in items:
+            if filter_seen and seen_items.is_seen(item):
+                continue
+
+            seen_items.add(item)
+            new_items.append(item)
+
+        return new_items
+
+    def __commit(self, seen_items):
+        # Nothing is staged until every page has been fetched and parsed, so a scrape that fails
+        # or is cancelled part way through leaves the checkpoint where it was. Staged changes are
+        # only saved once the digest has been sent.
+        with self.__lock:
+            if self.__cancelled:
+                return False
+
+            self.__committing = True
+
+        with self._span("checkpoint"):
+            if self.__pending_checkpoint is not None:
+                self.__checkpointer.save_checkpoint(self.__title, self.__pending_checkpoint)
+
+            for key, validators in self.__validators.items():
+                self.__checkpointer.save_validators(key, validators)
+
+            seen_items.save()
+
+        return True
+
+    def get_error_digest_item(self):
+        """
+        Returns a digest item reporting that this scraper failed to run.
+        """
+
+        metrics.inc("bnmd_source_errors_total", source=self.__title)
+
+        return self.__to_digest_item([], True)
+
+    def __to_digest_item(self, items, errors, skipped_health=None):
+        digest_item = {
             "title": self.__title,
             "link": self.__link,
             "items": items,
@@ -45,6 +207,14 @@ class Scraper:
             "type": self.__type,
         }
 
+        # Sources skipped by their circuit breaker say why
+        if skipped_health is not None:
+            digest_item["circuit_open"] = True
+            digest_item["consecutive_failures"] = skipped_health.get_consecutive_failures()
+            digest_item["last_error"] = skipped_health.get_last_error()
+
+        return digest_item
+
     @staticmethod
     def __sanitise_items(items):
         def remove_extra_whitespace(string):
@@ -58,13 +228,186 @@ class Scraper:
     def _get_items(self):
         return []
 
+    def _get_session(self):
+        return self.__session or http.get_session()
+
+    def _get_page_url(self, page):  # pylint: disable=unused-argument
+        """
+        Returns the URL of a later page of the source, for backfilling (None if it only has one).
+        """
+
+        return None
+
+    def _fetch(self, url, conditional=True, **kwargs):
+        """
+        Fetches a page, returning None if it hasn't changed since it was last scraped successfully
+        (going by its ETag/Last-Modified headers or a hash of its content) as there can't be
+        anything new on it, unless conditional is False. Validators are only saved once the whole
+        scrape has succeeded. Streamed responses are closed when the scrape finishes.
+
+        Requests time out by the scrape's deadline at the latest, and none are made once the scrape
+        has been cancelled or its deadline has passed.
+        """
+
+        # Settings are loaded when they're needed so that scrapers can be imported without them
+        from best_new_music_digest import settings
+
+        with self.__lock:
+            cancelled = self.__cancelled
+
+        if cancelled or (self.__deadline is not None and self.__deadline.expired()):
+            raise Exception("Timed out")
+
+        if self.__deadline is not None and "timeout" not in kwargs:
+            kwargs["timeout"] = self.__deadline.timeout((settings.HTTP_CONNECT_TIMEOUT,
+                                                         settings.HTTP_READ_TIMEOUT))
+
+        # Without a checkpoint everything on the page is new, whether it has changed or not
+        use_validators = (conditional and settings.CONDITIONAL_REQUESTS
+                          and self._get_checkpoint() is not None)
+        key = urls.scrub_url(url)
+        headers = dict(kwargs.pop("headers", {}))
+        validators = {}
+
+        if use_validators:
+            with self._span("checkpoint"):
+                validators = self.__checkpointer.get_validators(key) or {}
+
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        with self._span("fetch"):
+            response = self._get_session().get(url, headers=headers, **kwargs)
+
+        if kwargs.get("stream"):
+            self.__responses.append(response)
+
+        if response.status_code == 304:
+            print(f"{self.__title} hasn't changed since it was last scraped")
+            return None
+
+        content_sha256 = None
+
+        # Hashing a streamed body would mean downloading all of it up front
+        if not kwargs.get("stream"):
+            content_sha256 = hashlib.sha256(response.content).hexdigest()
+
+        if content_sha256 and validators.get("content_sha256") == content_sha256:
+            print(f"{self.__title} hasn't changed since it was last scraped")
+            return None
+
+        if conditional and settings.CONDITIONAL_REQUESTS and response.status_code == 200:
+            self.__validators[key] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "content_sha256": content_sha256,
+            }
+
+        return response
+
+    def _get_elements(self, url, *targets):
+        """
+        Yields the elements of an HTML page matching any of the (tag name, class) targets, in
+        order. With STREAMING_SCRAPERS the page is downloaded and parsed bit by bit as the elements
+        are iterated over, so a scraper that stops at its checkpoint doesn't download the rest of
+        it. Nothing is yielded if the page hasn't changed since it was last scraped.
+
+        If the scraper carries on past the end of the page without finding its checkpoint (after
+        downtime), up to BACKFILL_MAX_PAGES pages are fetched in batches from _get_page_url, each
+        batch at the same time. A batch is only fetched once the scraper is done with the one
+        before, so backfilling stops at the first batch with the checkpoint in it.
+        """
+
+        # Imported here so that scrapers that don't parse HTML don't load BeautifulSoup
+        from best_new_music_digest import settings
+        from best_new_music_digest.scrapers import parsing
+
+        response = self._fetch(url, stream=settings.STREAMING_SCRAPERS)
+
+        if response is None:
+            return
+
+        if settings.STREAMING_SCRAPERS:
+            elements = parsing.iter_targets(response, targets)
+        else:
+            with self._span("parse"):
+                elements = parsing.find_targets(response, targets)
+
+        first_elements = []
+
+        for element in elements:
+            if not first_elements:
+                first_elements.append(str(element))
+
+            yield element
+
+        # Without a checkpoint everything on the first page is new and nothing before it is needed
+        if first_elements and self._get_checkpoint() is not None:
+            yield from self.__backfill(targets, first_elements)
+
+    def __backfill(self, targets, first_elements):
+        from best_new_music_digest import settings
+
+        pages = [page for page in range(2, settings.BACKFILL_MAX_PAGES + 1)
+                 if self._get_page_url(page)]
+        batch_size = self.__BACKFILL_BATCH_SIZE
+
+        if not pages:
+            return
+
+        print(f"Backfilling {self.__title}")
+
+        with ThreadPoolExecutor(max_workers=batch_size) as executor:
+            for start in range(0, len(pages), batch_size):
+                with self._span("backfill"):
+                    batch = list(executor.map(lambda page: self.__get_page_elements(page, targets),
+                                              pages[start:start + batch_size]))
+
+                for elements in batch:
+                    # Stop past the last page, or if the source ignores the page number
+                    if not elements or str(elements[0]) in first_elements:
+                        return
+
+                    first_elements.append(str(elements[0]))
+
+                    yield from elements
+
+    def __get_page_elements(self, page, targets):
+        from best_new_music_digest.scrapers import parsing
+
+        # A later page can be unchanged even though the first one has moved on
+        response = self._fetch(self._get_page_url(page), conditional=False)
+
+        with self._span("parse"):
+            return parsing.find_targets(response, targets)
+
     def _get_checkpoint(self):
-        return self.__checkpointer.get_checkpoint(self.__title)
+        # Loaded once per scrape
+        if "link" not in self.__checkpoint:
+            with self._span("checkpoint"):
+                self.__checkpoint["link"] = self.__checkpointer.get_checkpoint(self.__title)
+
+        return self.__checkpoint["link"]
 
     def _save_checkpoint(self, link):
-        if not self.__saved_checkpoint:
-            self.__checkpointer.save_checkpoint(self.__title, link)
-            self.__saved_checkpoint = True
+        """
+        Sets the checkpoint to the newest item found (the first one given). It's only staged once
+        the whole scrape has succeeded, and saved once the digest has been sent.
+        """
+
+        if self.__pending_checkpoint is None:
+            self.__pending_checkpoint = link
+
+    def _span(self, stage=None):
+        """
+        Times a stage of the scrape (or the whole scrape) in the run report.
+        """
+
+        name = f"scrapers/{self.__title}"
+        return report.span(f"{name}/{stage}" if stage else name)
 
     def get_title(self):
         """
@@ -2,34 +2,41 @@
 Factory methods to get scrapers.
 """
 
-from best_new_music_digest import settings
+from datetime import datetime
+
+from best_new_music_digest import http
 from best_new_music_digest.checkpoint import Checkpointer
-from best_new_music_digest.scrapers import (pitchfork, sputnikmusic,
-                                            the_needle_drop)
+from best_new_music_digest.scrapers import registry
 
 
-def get_scrapers():
+def get_scrapers(checkpointer=None, titles=None, session=None, since=None):
     """
-    Returns scrapers configured to run.
+    Returns scrapers configured to run, or the scrapers with the given titles if there are any. A
+    new checkpointer is created if one isn't given. The scrapers make their requests with the
+    given HTTP session, or the shared one, so that connections to each host are reused between
+    them. If the time of the previous run is given, scrapers with a schedule are left out unless
+    it has come round since then. Only the modules of the scrapers returned are imported.
     """
 
-    scrapers = []
+    scraper_infos = registry.get_scraper_infos()
 
-    checkpointer = Checkpointer()
+    if titles is None:
+        wanted = [scraper_info for scraper_info in scraper_infos if scraper_info.is_enabled()]
+    else:
+        unknown_titles = set(titles) - {scraper_info.name for scraper_info in scraper_infos}
 
-    if settings.PITCHFORK_ALBUMS:
-        scrapers.append(pitchfork.AlbumScraper(checkpointer))
+        if unknown_titles:
+            raise Exception(f"Unknown scrapers: {sorted(unknown_titles)}.")
 
-    if settings.PITCHFORK_TRACKS:
-        scrapers.append(pitchfork.TrackScraper(checkpointer))
+        wanted = [scraper_info for scraper_info in scraper_infos if scraper_info.name in titles]
 
-    if settings.SPUTNIKMUSIC_ALBUMS:
-        scrapers.append(sputnikmusic.AlbumScraper(checkpointer))
+    now = datetime.utcnow()
+    wanted = [scraper_info for scraper_info in wanted if scraper_info.is_due(since, now)]
 
-    if settings.THE_NEEDLE_DROP_ALBUMS:
-        scrapers.append(the_needle_drop.AlbumScraper(checkpointer))
+    for scraper_info in wanted:
+        scraper_info.check_required_settings()
 
-    if settings.THE_NEEDLE_DROP_TRACKS:
-        scrapers.append(the_needle_drop.TrackScraper(checkpointer))
+    checkpointer = checkpointer or Checkpointer()
+    session = session or http.get_session()
 
-    return scrapers
+    return [scraper_info.load()(checkpointer, session) for scraper_info in wanted]
@@ -0,0 +1,212 @@
+# pylint: disable=import-outside-toplevel
+
+"""
+HTML parsing.
+"""
+
+import codecs
+import importlib
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# In order of preference when HTML_PARSER is auto
+__BACKENDS = ("lxml", "html.parser")
+
+
+def get_backend():
+    """
+    Returns the parser backend BeautifulSoup should use: HTML_PARSER, or the fastest one installed
+    if that is auto.
+    """
+
+    from best_new_music_digest import settings
+
+    if settings.HTML_PARSER != "auto":
+        return settings.HTML_PARSER
+
+    for backend in __BACKENDS:
+        if is_available(backend):
+            return backend
+
+    return "html.parser"
+
+
+def is_available(backend):
+    """
+    Returns whether a parser backend is installed.
+    """
+
+    if backend == "html.parser":
+        return True
+
+    try:
+        importlib.import_module(backend)
+    except ImportError:
+        return False
+
+    return True
+
+
+def parse(response, parse_only=None):
+    """
+    Parses an HTML response, building a tree of only the elements matched by parse_only (a
+    SoupStrainer) if it's given.
+    """
+
+    return BeautifulSoup(decode(response), get_backend(), parse_only=parse_only)
+
+
+def find_targets(response, targets):
+    """
+    Parses an HTML response and returns the elements matching any of the (tag name, class)
+    targets, in order. Only those elements are built into the tree.
+    """
+
+    soup = parse(response, SoupStrainer(lambda name, attrs: is_target(name, attrs, targets)))
+
+    return soup.find_all(lambda tag: is_target(tag.name, tag.attrs, targets))
+
+
+def iter_targets(response, targets, chunk_size=16384):
+    """
+    Yields the elements of a streamed HTML response matching any of the (tag name, class) targets,
+    in order, as soon as each one has been downloaded. The rest of the body is only read if the
+    iteration carries on.
+    """
+
+    charset = get_charset(response.headers.get("Content-Type")) or "utf-8"
+
+    try:
+        decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    splitter = ElementSplitter(targets)
+
+    for chunk in response.iter_content(chunk_size):
+        for html in splitter.split(decoder.decode(chunk)):
+            soup = BeautifulSoup(html, get_backend())
+            yield soup.find(lambda tag: is_target(tag.name, tag.attrs, targets))
+
+
+def is_target(name, attrs, targets):
+    """
+    Returns whether an element with the given tag name and attributes matches any of the (tag
+    name, class) targets.
+    """
+
+    classes = attrs.get("class") or []
+
+    # Classes are only split into a list once the element has been built
+    if isinstance(classes, str):
+        classes = classes.split()
+
+    return any(name == target_name and target_class in classes
+               for target_name, target_class in targets)
+
+
+class ElementSplitter(HTMLParser):
+    """
+    Incremental HTML parser that picks out the source of each element matching any of the (tag
+    name, class) targets as the page is fed in. Elements nested in a matching element are left as
+    part of it.
+    """
+
+    def __init__(self, targets):
+        super().__init__(convert_charrefs=False)
+        self.__targets = targets
+        self.__tag = None
+        self.__depth = 0
+        self.__html = []
+        self.__elements = []
+
+    def split(self, data):
+        """
+        Feeds in the next part of the page and returns the source of each matching element that it
+        completes.
+        """
+
+        self.feed(data)
+        elements, self.__elements = self.__elements, []
+
+        return elements
+
+    def handle_starttag(self, tag, attrs):
+        if self.__tag is None:
+            if not is_target(tag, dict(attrs), self.__targets):
+                return
+
+            self.__tag = tag
+
+        if tag == self.__tag:
+            self.__depth += 1
+
+        self.__html.append(self.get_starttag_text())
+
+    def handle_startendtag(self, tag, attrs):
+        if self.__tag is not None:
+            self.__html.append(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        if self.__tag is None:
+            return
+
+        self.__html.append(f"</{tag}>")
+
+        if tag == self.__tag:
+            self.__depth -= 1
+
+            if not self.__depth:
+                self.__elements.append("".join(self.__html))
+                self.__tag = None
+                self.__html = []
+
+    def handle_data(self, data):
+        if self.__tag is not None:
+            self.__html.append(data)
+
+    def handle_entityref(self, name):
+        self.handle_data(f"&{name};")
+
+    def handle_charref(self, name):
+        self.handle_data(f"&#{name};")
+
+    def error(self, message):
+        """
+        Reports markup that can't be parsed (only called before Python 3.10).
+        """
+
+        raise Exception(f"Failed to parse HTML: {message}.")
+
+
+def decode(response):
+    """
+    Decodes the body of a response with the charset from its Content-Type header, or as UTF-8. The
+    raw bytes are returned for BeautifulSoup to work out the encoding itself if neither works,
+    which is much slower as it can mean running character detection over the whole page.
+    """
+
+    charset = get_charset(response.headers.get("Content-Type"))
+
+    for encoding in ([charset] if charset else []) + ["utf-8"]:
+        try:
+            return response.content.decode(encoding)
+        except (LookupError, UnicodeDecodeError):
+            pass
+
+    return response.content
+
+
+def get_charset(content_type):
+    """
+    Returns the charset parameter of a Content-Type header (None if there isn't one).
+    """
+
+    for param in (content_type or "").split(";")[1:]:
+        name, _, value = param.partition("=")
+
+        if name.strip().lower() == "charset" and value.strip(" \"'"):
+            return value.strip(" \"'")
+
+    return None
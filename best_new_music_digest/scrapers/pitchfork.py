@@ -4,9 +4,6 @@
 Pitchfork scrapers.
 """
 
-import requests
-from bs4 import BeautifulSoup
-
 from best_new_music_digest.scrapers.base import Scraper
 
 
@@ -18,18 +15,18 @@ class AlbumScraper(Scraper):
     __BASE_URL = "https://www.pitchfork.com"
     __SCRAPE_URL = f"{__BASE_URL}/reviews/best/albums/"
 
-    def __init__(self, checkpointer):
-        super().__init__(checkpointer, "Pitchfork Albums", self.__SCRAPE_URL, "albums")
+    def __init__(self, checkpointer, session=None):
+        super().__init__(checkpointer, "Pitchfork Albums", self.__SCRAPE_URL, "albums", session)
+
+    def _get_page_url(self, page):
+        return f"{self.__SCRAPE_URL}?page={page}"
 
     def _get_items(self):
         items = []
 
-        response = requests.get(self.__SCRAPE_URL)
-        soup = BeautifulSoup(response.text, "html.parser")
-
         checkpoint = self._get_checkpoint()
 
-        for div in soup.find_all("div", "review"):
+        for div in self._get_elements(self.__SCRAPE_URL, ("div", "review")):
             link = f"{self.__BASE_URL}{div.find('a').get('href')}"
 
             if link == checkpoint:
@@ -55,39 +52,29 @@ class TrackScraper(Scraper):
     __BASE_URL = "https://www.pitchfork.com"
     __SCRAPE_URL = f"{__BASE_URL}/reviews/best/tracks/"
 
-    def __init__(self, checkpointer):
-        super().__init__(checkpointer, "Pitchfork Tracks", self.__SCRAPE_URL, "tracks")
+    def __init__(self, checkpointer, session=None):
+        super().__init__(checkpointer, "Pitchfork Tracks", self.__SCRAPE_URL, "tracks", session)
+
+    def _get_page_url(self, page):
+        return f"{self.__SCRAPE_URL}?page={page}"
 
     def _get_items(self):
         items = []
 
-        response = requests.get(self.__SCRAPE_URL)
-        soup = BeautifulSoup(response.text, "html.parser")
-
         checkpoint = self._get_checkpoint()
 
-        details = soup.find("div", "track-details")
-        link = f"{self.__BASE_URL}{details.find('a').get('href')}"
-
-        if link == checkpoint:
-            return []
-
-        self._save_checkpoint(link)
-
-        item = {
-            "artist": " & ".join([li.contents[0] for li in details.find("ul").find_all("li")]),
-            "title": self.__normalise_title(details.find("h2").contents[0]),
-            "link": link,
-        }
-
-        items.append(item)
-
-        for details in soup.find_all("a", "track-collection-item__track-link"):
-            link = f"{self.__BASE_URL}{details.get('href')}"
+        # The featured track comes first, followed by the rest of the list
+        for details in self._get_elements(self.__SCRAPE_URL,
+                                          ("div", "track-details"),
+                                          ("a", "track-collection-item__track-link")):
+            anchor = details.find("a") if details.name == "div" else details
+            link = f"{self.__BASE_URL}{anchor.get('href')}"
 
             if link == checkpoint:
                 break
 
+            self._save_checkpoint(link)
+
             items.append({
                 "artist": " & ".join([li.contents[0] for li in details.find("ul").find_all("li")]),
                 "title": self.__normalise_title(details.find("h2").contents[0]),
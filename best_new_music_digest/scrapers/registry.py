@@ -0,0 +1,161 @@
+# pylint: disable=import-outside-toplevel, invalid-name
+
+"""
+Registry of the scrapers that can be run.
+
+Scrapers are declared with a ScraperInfo, either in this module for the built-in sources or by
+other packages under the best_new_music_digest.scrapers entry point group. Each entry point
+should refer to a ScraperInfo (or a list of them) in a module that is quick to import, as the
+scraper itself is only imported if its source is enabled.
+"""
+
+import os
+from importlib import import_module
+
+from best_new_music_digest.scheduler import CronSchedule
+
+ENTRY_POINT_GROUP = "best_new_music_digest.scrapers"
+
+
+class ScraperInfo:
+    """
+    Metadata for a scraper.
+    """
+
+    def __init__(self, name, target, setting=None, required_settings=(), schedule=None):
+        """
+        Takes the scraper's name (its title), where its class is as 'module:class', the boolean
+        setting that switches it on (derived from its name by default, e.g. PITCHFORK_ALBUMS), any
+        other settings it needs when it's on, and a cron expression for when it should run in
+        --daemon mode (every run if there isn't one).
+        """
+
+        self.name = name
+        self.target = target
+        self.setting = setting or "_".join(name.upper().split())
+        self.required_settings = tuple(required_settings)
+        self.schedule = schedule
+
+    def is_enabled(self):
+        """
+        Returns whether the scraper's setting is switched on. Settings that aren't built in are
+        read from the environment and are on by default, like the built-in ones.
+        """
+
+        from best_new_music_digest import settings
+
+        if hasattr(settings, self.setting):
+            return getattr(settings, self.setting)
+
+        return os.environ.get(self.setting, "true").lower() == "true"
+
+    def check_required_settings(self):
+        """
+        Raises an exception if any of the settings the scraper needs are missing.
+        """
+
+        missing_settings = [prop for prop in self.required_settings if prop not in os.environ]
+
+        if missing_settings:
+            raise Exception(f"Missing mandatory properties: {missing_settings}.")
+
+    def get_schedule(self):
+        """
+        Returns the scraper's schedule, which can be overridden by a <setting>_SCHEDULE setting
+        (None if it runs every time).
+        """
+
+        return os.environ.get(f"{self.setting}_SCHEDULE", self.schedule)
+
+    def is_due(self, since, now):
+        """
+        Returns whether the scraper's schedule has come round since the given time (always True
+        if it runs every time, or if there's no previous run).
+        """
+
+        schedule = self.get_schedule()
+
+        if not schedule or since is None:
+            return True
+
+        return CronSchedule(schedule).next_after(since) <= now
+
+    def load(self):
+        """
+        Imports and returns the scraper's class.
+        """
+
+        module_name, _, class_name = self.target.partition(":")
+
+        return getattr(import_module(module_name), class_name)
+
+
+__BUILT_IN_SCRAPERS = [
+    ScraperInfo("Pitchfork Albums", "best_new_music_digest.scrapers.pitchfork:AlbumScraper"),
+    ScraperInfo("Pitchfork Tracks", "best_new_music_digest.scrapers.pitchfork:TrackScraper"),
+    ScraperInfo("Sputnikmusic Albums", "best_new_music_digest.scrapers.sputnikmusic:AlbumScraper"),
+    ScraperInfo("The Needle Drop Albums",
+                "best_new_music_digest.scrapers.the_needle_drop:AlbumScraper",
+                required_settings=["YOUTUBE_API_KEY"]),
+    ScraperInfo("The Needle Drop Tracks",
+                "best_new_music_digest.scrapers.the_needle_drop:TrackScraper",
+                required_settings=["YOUTUBE_API_KEY"]),
+]
+
+# Scrapers declared by entry points, discovered the first time they're needed
+__plugin_scrapers = None
+
+
+def get_scraper_infos():
+    """
+    Returns every scraper that has been declared, built-in ones first.
+    """
+
+    global __plugin_scrapers  # pylint: disable=global-statement
+
+    if __plugin_scrapers is None:
+        __plugin_scrapers = __discover()
+
+    scraper_infos = __BUILT_IN_SCRAPERS + __plugin_scrapers
+    names = [scraper_info.name for scraper_info in scraper_infos]
+    duplicate_names = sorted({name for name in names if names.count(name) > 1})
+
+    if duplicate_names:
+        raise Exception(f"Scrapers declared more than once: {duplicate_names}.")
+
+    return scraper_infos
+
+
+def reset():
+    """
+    Forgets the scrapers declared by entry points so that they're discovered again.
+    """
+
+    global __plugin_scrapers  # pylint: disable=global-statement
+    __plugin_scrapers = None
+
+
+def __discover():
+    from importlib import metadata
+
+    entry_points = metadata.entry_points()
+
+    # Entry points are grouped in a dictionary before Python 3.10
+    if hasattr(entry_points, "select"):
+        entry_points = entry_points.select(group=ENTRY_POINT_GROUP)
+    else:
+        entry_points = entry_points.get(ENTRY_POINT_GROUP, [])
+
+    scraper_infos = []
+
+    for entry_point in entry_points:
+        declared = entry_point.load()
+        declared = declared if isinstance(declared, (list, tuple)) else [declared]
+
+        for scraper_info in declared:
+            if not isinstance(scraper_info, ScraperInfo):
+                raise Exception(f"Invalid scraper entry point: {entry_point.name}.")
+
+            scraper_infos.append(scraper_info)
+
+    return scraper_infos
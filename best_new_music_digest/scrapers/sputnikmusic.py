@@ -4,9 +4,6 @@
 sputnikmusic scrapers.
 """
 
-import requests
-from bs4 import BeautifulSoup
-
 from best_new_music_digest.scrapers.base import Scraper
 
 
@@ -18,18 +15,18 @@ class AlbumScraper(Scraper):
     __BASE_URL = "https://www.sputnikmusic.com"
     __SCRAPE_URL = f"{__BASE_URL}/bestnewmusic"
 
-    def __init__(self, checkpointer):
-        super().__init__(checkpointer, "Sputnikmusic Albums", self.__SCRAPE_URL, "albums")
+    def __init__(self, checkpointer, session=None):
+        super().__init__(checkpointer, "Sputnikmusic Albums", self.__SCRAPE_URL, "albums", session)
+
+    def _get_page_url(self, page):
+        return f"{self.__SCRAPE_URL}?page={page}"
 
     def _get_items(self):
         items = []
 
-        response = requests.get(self.__SCRAPE_URL)
-        soup = BeautifulSoup(response.text, "html.parser")
-
         checkpoint = self._get_checkpoint()
 
-        for td in soup.find_all("td", "bestnewmusic"):
+        for td in self._get_elements(self.__SCRAPE_URL, ("td", "bestnewmusic")):
             a = td.find("a")
             link = f"{self.__BASE_URL}{a.get('href')}"
 
@@ -6,10 +6,9 @@ The Needle Drop scrapers.
 
 import re
 
-import requests
-
 from best_new_music_digest import settings
 from best_new_music_digest.scrapers.base import Scraper
+from best_new_music_digest.youtube import YouTube
 
 
 class AlbumScraper(Scraper):
@@ -19,22 +18,26 @@ class AlbumScraper(Scraper):
 
     __BASE_URL = "https://www.youtube.com"
 
-    def __init__(self, checkpointer):
+    def __init__(self, checkpointer, session=None):
         super().__init__(checkpointer,
                          "The Needle Drop Albums",
                          f"{self.__BASE_URL}/user/theneedledrop",
-                         "albums")
+                         "albums",
+                         session)
 
     def _get_items(self):
         items = []
 
-        response = requests.get("https://www.googleapis.com/youtube/v3/playlistItems?" \
-                                "part=snippet&playlistId=PLP4CSgl7K7oo93I49tQa0TLB8qY3u7xuO&" \
-                                f"key={settings.YOUTUBE_API_KEY}")
-
         checkpoint = self._get_checkpoint()
 
-        for response_item in response.json()["items"]:
+        response_items = YouTube(settings.YOUTUBE_API_KEY, self._fetch).iter_playlist_items(
+            "PLP4CSgl7K7oo93I49tQa0TLB8qY3u7xuO",
+            "snippet(title,resourceId/videoId)",
+            # Without a checkpoint everything on the first page is new
+            settings.BACKFILL_MAX_PAGES if checkpoint else 1,
+        )
+
+        for response_item in response_items:
             snippet = response_item["snippet"]
             link = f"{self.__BASE_URL}/watch?v={snippet['resourceId']['videoId']}"
 
@@ -62,23 +65,30 @@ class TrackScraper(Scraper):
 
     __BASE_URL = "https://www.youtube.com"
 
-    def __init__(self, checkpointer):
+    # Every track from a weekly roundup links to the same video
+    _unique_links = False
+
+    def __init__(self, checkpointer, session=None):
         super().__init__(checkpointer,
                          "The Needle Drop Tracks",
                          f"{self.__BASE_URL}/user/theneedledrop",
-                         "tracks")
+                         "tracks",
+                         session)
         self._pattern = re.compile(r"!!!BEST TRACKS THIS WEEK!!!(.*?)\.\.\.meh\.\.\.", re.DOTALL)
 
     def _get_items(self):
         items = []
 
-        response = requests.get("https://www.googleapis.com/youtube/v3/playlistItems?" \
-                                "part=snippet&playlistId=PLP4CSgl7K7or84AAhr7zlLNpghEnKWu2c&" \
-                                f"key={settings.YOUTUBE_API_KEY}")
-
         checkpoint = self._get_checkpoint()
 
-        for response_item in response.json()["items"]:
+        response_items = YouTube(settings.YOUTUBE_API_KEY, self._fetch).iter_playlist_items(
+            "PLP4CSgl7K7or84AAhr7zlLNpghEnKWu2c",
+            "snippet(title,description,resourceId/videoId)",
+            # Without a checkpoint everything on the first page is new
+            settings.BACKFILL_MAX_PAGES if checkpoint else 1,
+        )
+
+        for response_item in response_items:
             snippet = response_item["snippet"]
 
             if not snippet["title"].startswith("Weekly Track Roundup"):
@@ -0,0 +1,122 @@
+# pylint: disable=broad-except
+
+"""
+Spotify search cache.
+"""
+
+import json
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from best_new_music_digest import metrics
+
+
+class SearchCache:
+    """
+    Results of searching Spotify (an album's track IDs, a track's ID or None if it wasn't found)
+    keyed by type, artist and title. Keys are normalised so that the same album or track from
+    different sources, with different case or spacing, shares a result.
+
+    The most recently used results are kept in memory, up to size of them. With a checkpointer,
+    results are saved to its store too so that later runs don't search for them again: results
+    that were found for ttl seconds and ones that weren't for not_found_ttl seconds, as they may
+    turn up on Spotify later. A ttl of 0 keeps results in memory only.
+
+    It can be used like a dictionary, so it goes wherever a search cache is taken.
+    """
+
+    def __init__(self, checkpointer=None, ttl=0, not_found_ttl=0, size=1000, clock=time.time):
+        self.__checkpointer = checkpointer if ttl else None
+        self.__ttl = ttl
+        self.__not_found_ttl = not_found_ttl
+        self.__size = size
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__results = OrderedDict()
+
+    def __contains__(self, key):
+        key = self.__normalise(key)
+
+        with self.__lock:
+            if key in self.__results:
+                self.__results.move_to_end(key)
+                metrics.inc("bnmd_spotify_cache_total", result="hit")
+                return True
+
+        entry = self.__load(key)
+
+        if entry is None or entry["expires"] <= self.__clock():
+            metrics.inc("bnmd_spotify_cache_total", result="miss")
+            return False
+
+        self.__remember(key, entry["result"])
+        metrics.inc("bnmd_spotify_cache_total", result="hit")
+
+        return True
+
+    def __getitem__(self, key):
+        key = self.__normalise(key)
+
+        with self.__lock:
+            if key in self.__results:
+                return self.__results[key]
+
+        entry = self.__load(key)
+
+        if entry is None or entry["expires"] <= self.__clock():
+            raise KeyError(key)
+
+        return self.__remember(key, entry["result"])
+
+    def __setitem__(self, key, result):
+        key = self.__normalise(key)
+
+        self.__remember(key, result)
+
+        if self.__checkpointer is None:
+            return
+
+        ttl = self.__ttl if result is not None else self.__not_found_ttl
+
+        if not ttl:
+            return
+
+        try:
+            self.__checkpointer.save_search_result(json.dumps(key),
+                                                   result,
+                                                   self.__clock() + ttl)
+        except Exception as exception:
+            print("Failed to save Spotify search result")
+            print(exception)
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__results)
+
+    def __remember(self, key, result):
+        with self.__lock:
+            self.__results[key] = result
+            self.__results.move_to_end(key)
+
+            while len(self.__results) > self.__size:
+                self.__results.popitem(last=False)
+
+        return result
+
+    def __load(self, key):
+        if self.__checkpointer is None:
+            return None
+
+        try:
+            return self.__checkpointer.get_search_result(json.dumps(key))
+        except Exception as exception:
+            print("Failed to load Spotify search result")
+            print(exception)
+            return None
+
+    @staticmethod
+    def __normalise(key):
+        return tuple(" ".join(unicodedata.normalize("NFKC", part).casefold().split())
+                     for part in key)
@@ -0,0 +1,123 @@
+"""
+Seen items.
+"""
+
+import hashlib
+import math
+import re
+import unicodedata
+
+
+class BloomFilter:
+    """
+    Set of keys that can say for certain that a key isn't in it, but only probably that it is.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+
+        self.__size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.__hashes = max(round(self.__size / capacity * math.log(2)), 1)
+        self.__bits = bytearray(math.ceil(self.__size / 8))
+
+    def add(self, key):
+        """
+        Adds a key.
+        """
+
+        for index in self.__indexes(key):
+            self.__bits[index // 8] |= 1 << index % 8
+
+    def __contains__(self, key):
+        return all(self.__bits[index // 8] & 1 << index % 8 for index in self.__indexes(key))
+
+    def __indexes(self, key):
+        # Double hashing (Kirsch and Mitzenmacher) from one digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+
+        return [(first + i * second) % self.__size for i in range(self.__hashes)]
+
+
+class SeenItems:
+    """
+    Items that have already been found for a source, by their link and by their artist and title,
+    so that they aren't sent out again if the source reorders or removes items. Everything seen is
+    loaded into a Bloom filter up front so that new items (most of those checked) are spotted
+    without going to the database.
+    """
+
+    def __init__(self, checkpointer, name, unique_links=True):
+        """
+        Items are only matched on their links if every item from the source has its own link
+        (rather than, say, all the tracks from one video sharing it).
+        """
+
+        self.__checkpointer = checkpointer
+        self.__name = name
+        self.__unique_links = unique_links
+        self.__pending = {}
+
+        seen = checkpointer.get_seen(name)
+
+        # Room for a key and a link per item, and to grow during the run
+        self.__filter = BloomFilter(max(len(seen) * 4, 1024))
+
+        for seen_item in seen:
+            self.__add_to_filter(seen_item["key"], seen_item.get("link"))
+
+    def is_seen(self, item):
+        """
+        Returns whether an item has been seen before.
+        """
+
+        key = get_key(item)
+        link = item["link"] if self.__unique_links else None
+
+        if key in self.__pending or (link and link in self.__pending.values()):
+            return True
+
+        if f"key:{key}" not in self.__filter and (not link or f"link:{link}" not in self.__filter):
+            return False
+
+        # Probably seen, but the filter can be wrong
+        return self.__checkpointer.is_seen(self.__name, key, link)
+
+    def add(self, item):
+        """
+        Marks an item as seen. It is only saved once save is called.
+        """
+
+        key = get_key(item)
+
+        self.__pending[key] = item["link"]
+        self.__add_to_filter(key, item["link"])
+
+    def save(self):
+        """
+        Saves the items marked as seen.
+        """
+
+        self.__checkpointer.save_seen(self.__name, self.__pending)
+        self.__pending = {}
+
+    def __add_to_filter(self, key, link):
+        self.__filter.add(f"key:{key}")
+
+        if link:
+            self.__filter.add(f"link:{link}")
+
+
+def get_key(item):
+    """
+    Returns the key for an item: its artist and title, normalised so that differences in case,
+    accents and punctuation don't matter.
+    """
+
+    def normalise(string):
+        string = unicodedata.normalize("NFKD", string)
+        string = "".join(c for c in string if not unicodedata.combining(c)).casefold()
+        return " ".join(re.sub(r"[^\w]+", " ", string).split())
+
+    return f"{normalise(item['artist'])} - {normalise(item['title'])}"
@@ -2,6 +2,7 @@
 Loads application settings.
 """
 
+import importlib.util
 import os
 
 import dotenv
@@ -24,21 +25,79 @@ def __get_env_var(prop, default=None):
 def __get_env_var_bool(prop, default=True):
     return __get_env_var(prop, default).lower() == "true"
 
+def __get_env_var_int(prop, default):
+    value = __get_env_var(prop, default)
+
+    try:
+        return int(value)
+    except ValueError as error:
+        raise Exception(f"Invalid integer property: {prop}={value}.") from error
+
+def __get_env_var_rates(prop):
+    rates = {}
+
+    for rate in filter(None, os.environ.get(prop, "").split(",")):
+        host, _, value = rate.partition("=")
+
+        try:
+            rates[host.strip().lower()] = float(value)
+        except ValueError as error:
+            raise Exception(f"Invalid rate limit property: {prop}={rate}.") from error
+
+    return rates
+
+# Profiles have their own recipients so RECIPIENT_EMAIL is only needed without them, and
+# MONGODB_URI is still accepted in place of STORAGE_URI
 __check_properties_present([
-    "MONGODB_URI",
-    "RECIPIENT_EMAIL",
+    *([] if "MONGODB_URI" in os.environ else ["STORAGE_URI"]),
+    *([] if os.environ.get("PROFILES_FILE") else ["RECIPIENT_EMAIL"]),
     "SENDER_EMAIL",
     "SENDGRID_API_KEY",
     "SENDGRID_TEMPLATE_ID",
 ])
 
 ALWAYS_EMAIL = __get_env_var_bool("ALWAYS_EMAIL", False)
+BACKFILL_MAX_PAGES = __get_env_var_int("BACKFILL_MAX_PAGES", 5)
+CIRCUIT_BREAKER_THRESHOLD = __get_env_var_int("CIRCUIT_BREAKER_THRESHOLD", 3)
+CONDITIONAL_REQUESTS = __get_env_var_bool("CONDITIONAL_REQUESTS")
 CREATE_SPOTIFY_PLAYLISTS = __get_env_var_bool("CREATE_SPOTIFY_PLAYLISTS")
 DAD_JOKE = __get_env_var_bool("DAD_JOKE")
-MONGODB_URI = __get_env_var("MONGODB_URI")
+DAEMON_SCHEDULE = __get_env_var("DAEMON_SCHEDULE", "0 19 * * 1")
+HTML_PARSER = __get_env_var("HTML_PARSER", "auto")
+
+if HTML_PARSER not in ("auto", "html.parser", "lxml"):
+    raise Exception(f"Invalid HTML parser: {HTML_PARSER}.")
+
+if HTML_PARSER == "lxml" and not importlib.util.find_spec("lxml"):
+    raise Exception("HTML parser lxml isn't installed.")
+
+HTTP_CASSETTE_MODE = os.environ.get("HTTP_CASSETTE_MODE")
+
+if HTTP_CASSETTE_MODE:
+    __check_properties_present(["HTTP_CASSETTE_DIR"])
+
+    if HTTP_CASSETTE_MODE not in ("record", "replay"):
+        raise Exception(f"Invalid HTTP cassette mode: {HTTP_CASSETTE_MODE}.")
+
+HTTP_CASSETTE_DIR = os.environ.get("HTTP_CASSETTE_DIR")
+HTTP_CASSETTE_LATENCY = __get_env_var_int("HTTP_CASSETTE_LATENCY", 0)
+HTTP_CONNECT_TIMEOUT = __get_env_var_int("HTTP_CONNECT_TIMEOUT", 5)
+HTTP_READ_TIMEOUT = __get_env_var_int("HTTP_READ_TIMEOUT", 30)
+HTTP_RETRIES = __get_env_var_int("HTTP_RETRIES", 3)
+METRICS_PORT = __get_env_var_int("METRICS_PORT", 0)
+METRICS_TEXTFILE = os.environ.get("METRICS_TEXTFILE")
+MONGODB_URI = os.environ.get("MONGODB_URI")
 PITCHFORK_ALBUMS = __get_env_var_bool("PITCHFORK_ALBUMS")
 PITCHFORK_TRACKS = __get_env_var_bool("PITCHFORK_TRACKS")
+PROFILES_FILE = os.environ.get("PROFILES_FILE")
+RATE_LIMITS = __get_env_var_rates("RATE_LIMITS")
 RECIPIENT_EMAIL = __get_env_var("RECIPIENT_EMAIL")
+RUN_DEADLINE = __get_env_var_int("RUN_DEADLINE", 0)
+RUN_JOURNAL_MAX_AGE = __get_env_var_int("RUN_JOURNAL_MAX_AGE", 86400)
+RUN_REPORT_FILE = os.environ.get("RUN_REPORT_FILE")
+RUN_REPORT_MONGODB = __get_env_var_bool("RUN_REPORT_MONGODB", False)
+SCRAPER_MAX_WORKERS = __get_env_var_int("SCRAPER_MAX_WORKERS", 5)
+SCRAPER_TIMEOUT = __get_env_var_int("SCRAPER_TIMEOUT", 60)
 SENDER_EMAIL = __get_env_var("SENDER_EMAIL")
 SENDER_NAME = __get_env_var("SENDER_NAME", "Best New Music Digest")
 SENDGRID_API_KEY = __get_env_var("SENDGRID_API_KEY")
@@ -51,10 +110,21 @@ if CREATE_SPOTIFY_PLAYLISTS:
         "SPOTIFY_USERNAME",
     ])
 
+SPOTIFY_CACHE_SIZE = __get_env_var_int("SPOTIFY_CACHE_SIZE", 1000)
+
+if SPOTIFY_CACHE_SIZE < 1:
+    raise Exception(f"Invalid Spotify cache size: {SPOTIFY_CACHE_SIZE}.")
+
+SPOTIFY_CACHE_TTL = __get_env_var_int("SPOTIFY_CACHE_TTL", 2592000)
 SPOTIFY_CLIENT_ID = __get_env_var("SPOTIFY_CLIENT_ID")
 SPOTIFY_CLIENT_SECRET = __get_env_var("SPOTIFY_CLIENT_SECRET")
+SPOTIFY_MAX_WORKERS = __get_env_var_int("SPOTIFY_MAX_WORKERS", 4)
+SPOTIFY_NOT_FOUND_TTL = __get_env_var_int("SPOTIFY_NOT_FOUND_TTL", 86400)
 SPOTIFY_USERNAME = __get_env_var("SPOTIFY_USERNAME")
 SPUTNIKMUSIC_ALBUMS = __get_env_var_bool("SPUTNIKMUSIC_ALBUMS")
+STORAGE_URI = os.environ.get("STORAGE_URI") or MONGODB_URI
+STREAMING_PIPELINE = __get_env_var_bool("STREAMING_PIPELINE", False)
+STREAMING_SCRAPERS = __get_env_var_bool("STREAMING_SCRAPERS", False)
 THE_NEEDLE_DROP_ALBUMS = __get_env_var_bool("THE_NEEDLE_DROP_ALBUMS")
 THE_NEEDLE_DROP_TRACKS = __get_env_var_bool("THE_NEEDLE_DROP_TRACKS")
 
@@ -0,0 +1,649 @@
+# pylint: disable=import-outside-toplevel, too-many-instance-attributes
+
+"""
+Storage backends for checkpoints, health, HTTP validators, seen items, run reports, run journals
+and Spotify search results.
+
+Every backend has the same methods, and the one to use is chosen by the scheme of its URI:
+
+- memory:// keeps everything in memory, for tests and benchmarks
+- sqlite:///path/to/file.db keeps everything in an SQLite database (in WAL mode) on disk, for
+  running on a single machine (sqlite:////path for an absolute path)
+- mongodb:// and mongodb+srv:// keep everything in MongoDB, for shared deployments
+"""
+
+import copy
+import json
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+
+class MemoryStore:
+    """
+    Store that keeps everything in memory, so it's lost when the process exits.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__checkpoints = {}
+        self.__health = {}
+        self.__validators = {}
+        self.__seen = {}
+        self.__run_reports = []
+        self.__journals = {}
+        self.__search_results = {}
+
+    def get_checkpoints(self):
+        """
+        Returns every checkpoint, by name.
+        """
+
+        with self.__lock:
+            return dict(self.__checkpoints)
+
+    def save_checkpoints(self, checkpoints):
+        """
+        Saves checkpoints, from a dictionary of their names to their links.
+        """
+
+        with self.__lock:
+            self.__checkpoints.update(checkpoints)
+
+    def get_health(self, name):
+        """
+        Returns the health of the source with a given name (None if it hasn't been saved).
+        """
+
+        with self.__lock:
+            return copy.deepcopy(self.__health.get(name))
+
+    def save_health(self, name, health):
+        """
+        Saves the health of the source with a given name.
+        """
+
+        with self.__lock:
+            self.__health[name] = copy.deepcopy(health)
+
+    def get_validators(self, url):
+        """
+        Returns the HTTP validators saved for a URL (None if there aren't any).
+        """
+
+        with self.__lock:
+            return copy.deepcopy(self.__validators.get(url))
+
+    def save_validators(self, validators):
+        """
+        Saves HTTP validators, from a dictionary of URLs to their validators.
+        """
+
+        with self.__lock:
+            self.__validators.update(copy.deepcopy(validators))
+
+    def get_seen(self, name):
+        """
+        Returns the key and link of every item seen for a given name.
+        """
+
+        with self.__lock:
+            return [{"key": key, "link": link} for key, link in self.__seen.get(name, {}).items()]
+
+    def is_seen(self, name, key, link=None):
+        """
+        Returns whether an item with the given key (or link, if given) has been seen for a given
+        name.
+        """
+
+        with self.__lock:
+            seen = self.__seen.get(name, {})
+            return key in seen or (link is not None and link in seen.values())
+
+    def save_seen(self, seen):
+        """
+        Saves items as seen, from a dictionary of names to dictionaries of the items' keys to their
+        links.
+        """
+
+        with self.__lock:
+            for name, name_seen in seen.items():
+                self.__seen.setdefault(name, {}).update(name_seen)
+
+    def save_run_report(self, run_report):
+        """
+        Saves a run report.
+        """
+
+        with self.__lock:
+            self.__run_reports.append(copy.deepcopy(run_report))
+
+    def get_run_reports(self):
+        """
+        Returns the run reports that have been saved, oldest first.
+        """
+
+        with self.__lock:
+            return copy.deepcopy(self.__run_reports)
+
+    def get_latest_journal(self):
+        """
+        Returns the run journal that was started last (None if there aren't any).
+        """
+
+        with self.__lock:
+            if not self.__journals:
+                return None
+
+            return copy.deepcopy(max(self.__journals.values(), key=lambda j: j["started"]))
+
+    def save_journal(self, journal):
+        """
+        Saves a run journal, replacing any saved before for the same run.
+        """
+
+        with self.__lock:
+            self.__journals[journal["run_id"]] = copy.deepcopy(journal)
+
+    def delete_journal(self, run_id):
+        """
+        Deletes the run journal for a given run, if there is one.
+        """
+
+        with self.__lock:
+            self.__journals.pop(run_id, None)
+
+    def get_search_result(self, key):
+        """
+        Returns a Spotify search result and when it expires (None if it hasn't been saved).
+        """
+
+        with self.__lock:
+            return copy.deepcopy(self.__search_results.get(key))
+
+    def save_search_result(self, key, result, expires):
+        """
+        Saves a Spotify search result until it expires (as a timestamp).
+        """
+
+        with self.__lock:
+            self.__search_results[key] = {"result": copy.deepcopy(result), "expires": expires}
+
+    def close(self):
+        """
+        Does nothing as there is no connection to close.
+        """
+
+
+class SQLiteStore:
+    """
+    Store that keeps everything in an SQLite database. The database is opened in WAL mode the
+    first time it's used, so that reading doesn't block writing, and the connection is shared
+    between threads.
+    """
+
+    __SCHEMA = """
+        CREATE TABLE IF NOT EXISTS checkpoints (name TEXT PRIMARY KEY, link TEXT);
+        CREATE TABLE IF NOT EXISTS health (name TEXT PRIMARY KEY, health TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS validators (url TEXT PRIMARY KEY, validators TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS seen (
+            name TEXT NOT NULL,
+            key TEXT NOT NULL,
+            link TEXT,
+            PRIMARY KEY (name, key)
+        );
+        CREATE INDEX IF NOT EXISTS seen_name_link ON seen (name, link);
+        CREATE TABLE IF NOT EXISTS run_reports (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_report TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS journals (
+            run_id TEXT PRIMARY KEY,
+            started REAL NOT NULL,
+            journal TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS search_results (
+            key TEXT PRIMARY KEY,
+            result TEXT,
+            expires REAL NOT NULL
+        );
+    """
+
+    # Seconds to wait for another process to finish writing
+    __BUSY_TIMEOUT = 5
+
+    def __init__(self, path):
+        self.__path = path
+        self.__lock = threading.Lock()
+        self.__connection = None
+
+    def get_checkpoints(self):
+        """
+        Returns every checkpoint, by name.
+        """
+
+        return dict(self.__execute("SELECT name, link FROM checkpoints"))
+
+    def save_checkpoints(self, checkpoints):
+        """
+        Saves checkpoints, from a dictionary of their names to their links.
+        """
+
+        self.__execute_many("INSERT OR REPLACE INTO checkpoints (name, link) VALUES (?, ?)",
+                            checkpoints.items())
+
+    def get_health(self, name):
+        """
+        Returns the health of the source with a given name (None if it hasn't been saved).
+        """
+
+        rows = self.__execute("SELECT health FROM health WHERE name = ?", (name,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def save_health(self, name, health):
+        """
+        Saves the health of the source with a given name.
+        """
+
+        self.__execute_many("INSERT OR REPLACE INTO health (name, health) VALUES (?, ?)",
+                            [(name, json.dumps(health))])
+
+    def get_validators(self, url):
+        """
+        Returns the HTTP validators saved for a URL (None if there aren't any).
+        """
+
+        rows = self.__execute("SELECT validators FROM validators WHERE url = ?", (url,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def save_validators(self, validators):
+        """
+        Saves HTTP validators, from a dictionary of URLs to their validators.
+        """
+
+        self.__execute_many("INSERT OR REPLACE INTO validators (url, validators) VALUES (?, ?)",
+                            [(url, json.dumps(v)) for url, v in validators.items()])
+
+    def get_seen(self, name):
+        """
+        Returns the key and link of every item seen for a given name.
+        """
+
+        rows = self.__execute("SELECT key, link FROM seen WHERE name = ?", (name,))
+        return [{"key": key, "link": link} for key, link in rows]
+
+    def is_seen(self, name, key, link=None):
+        """
+        Returns whether an item with the given key (or link, if given) has been seen for a given
+        name.
+        """
+
+        # Two lookups so that each uses its own index, rather than scanning every item for the name
+        rows = self.__execute("SELECT EXISTS (SELECT 1 FROM seen WHERE name = ? AND key = ?) "
+                              "OR EXISTS (SELECT 1 FROM seen WHERE name = ? AND link = ?)",
+                              (name, key, name, link))
+        return bool(rows[0][0])
+
+    def save_seen(self, seen):
+        """
+        Saves items as seen, from a dictionary of names to dictionaries of the items' keys to their
+        links.
+        """
+
+        self.__execute_many("INSERT OR REPLACE INTO seen (name, key, link) VALUES (?, ?, ?)",
+                            [(name, key, link)
+                             for name, name_seen in seen.items()
+                             for key, link in name_seen.items()])
+
+    def save_run_report(self, run_report):
+        """
+        Saves a run report.
+        """
+
+        self.__execute_many("INSERT INTO run_reports (run_report) VALUES (?)",
+                            [(json.dumps(run_report),)])
+
+    def get_run_reports(self):
+        """
+        Returns the run reports that have been saved, oldest first.
+        """
+
+        rows = self.__execute("SELECT run_report FROM run_reports ORDER BY id")
+        return [json.loads(run_report) for run_report, in rows]
+
+    def get_latest_journal(self):
+        """
+        Returns the run journal that was started last (None if there aren't any).
+        """
+
+        rows = self.__execute("SELECT journal FROM journals ORDER BY started DESC LIMIT 1")
+        return json.loads(rows[0][0]) if rows else None
+
+    def save_journal(self, journal):
+        """
+        Saves a run journal, replacing any saved before for the same run.
+        """
+
+        self.__execute_many("INSERT OR REPLACE INTO journals (run_id, started, journal) "
+                            "VALUES (?, ?, ?)",
+                            [(journal["run_id"], journal["started"], json.dumps(journal))])
+
+    def delete_journal(self, run_id):
+        """
+        Deletes the run journal for a given run, if there is one.
+        """
+
+        self.__execute_many("DELETE FROM journals WHERE run_id = ?", [(run_id,)])
+
+    def get_search_result(self, key):
+        """
+        Returns a Spotify search result and when it expires (None if it hasn't been saved).
+        """
+
+        rows = self.__execute("SELECT result, expires FROM search_results WHERE key = ?", (key,))
+
+        if not rows:
+            return None
+
+        return {"result": json.loads(rows[0][0]), "expires": rows[0][1]}
+
+    def save_search_result(self, key, result, expires):
+        """
+        Saves a Spotify search result until it expires (as a timestamp).
+        """
+
+        self.__execute_many("INSERT OR REPLACE INTO search_results (key, result, expires) "
+                            "VALUES (?, ?, ?)",
+                            [(key, json.dumps(result), expires)])
+
+    def close(self):
+        """
+        Closes the connection to the database.
+        """
+
+        with self.__lock:
+            if self.__connection is not None:
+                self.__connection.close()
+                self.__connection = None
+
+    def __execute(self, sql, parameters=()):
+        with self.__lock:
+            return self.__connect().execute(sql, parameters).fetchall()
+
+    def __execute_many(self, sql, parameters):
+        # Each call is written in one transaction
+        with self.__lock:
+            connection = self.__connect()
+
+            with connection:
+                connection.executemany(sql, parameters)
+
+    def __connect(self):
+        import sqlite3
+
+        if self.__connection is None:
+            connection = sqlite3.connect(self.__path,
+                                         timeout=self.__BUSY_TIMEOUT,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(self.__SCHEMA)
+            self.__connection = connection
+
+        return self.__connection
+
+
+class MongoStore:
+    """
+    Store that keeps everything in MongoDB. It doesn't connect until it's first used, and keeps a
+    small pool of connections that are closed when they've been idle for a while (such as between
+    runs in --daemon mode).
+    """
+
+    __DATABASE = "best-new-music-digest"
+
+    # Enough connections for every scraper running at once, plus the pipeline
+    __CLIENT_OPTIONS = {
+        "connect": False,
+        "maxPoolSize": 10,
+        "minPoolSize": 0,
+        "maxIdleTimeMS": 60000,
+        "connectTimeoutMS": 5000,
+        "serverSelectionTimeoutMS": 10000,
+        "retryWrites": True,
+        "appname": "best-new-music-digest",
+    }
+
+    def __init__(self, uri):
+        from pymongo import MongoClient
+
+        self.__client = MongoClient(uri, **self.__CLIENT_OPTIONS)
+        database = self.__client[self.__DATABASE]
+        self.__checkpoints = database.checkpoints
+        self.__checkpoints_indexed = False
+        self.__health = database.health
+        self.__journals = database.journals
+        self.__run_reports = database.run_reports
+        self.__search_results = database.search_results
+        self.__search_results_indexed = False
+        self.__seen = database.seen
+        self.__seen_indexed = False
+        self.__validators = database.validators
+
+    def get_checkpoints(self):
+        """
+        Returns every checkpoint, by name.
+        """
+
+        checkpoints = self.__get_checkpoints().find({}, {"_id": False, "name": True, "link": True})
+        return {checkpoint["name"]: checkpoint["link"] for checkpoint in checkpoints}
+
+    def save_checkpoints(self, checkpoints):
+        """
+        Saves checkpoints, from a dictionary of their names to their links.
+        """
+
+        from pymongo import UpdateOne
+
+        if not checkpoints:
+            return
+
+        self.__get_checkpoints().bulk_write([
+            UpdateOne({"name": name}, {"$set": {"link": link}}, upsert=True)
+            for name, link in checkpoints.items()
+        ], ordered=False)
+
+    def get_health(self, name):
+        """
+        Returns the health of the source with a given name (None if it hasn't been saved).
+        """
+
+        return self.__health.find_one({"name": name}, {"_id": False, "name": False})
+
+    def save_health(self, name, health):
+        """
+        Saves the health of the source with a given name.
+        """
+
+        self.__health.find_one_and_update(
+            {"name": name},
+            {"$set": health},
+            upsert=True,
+        )
+
+    def get_validators(self, url):
+        """
+        Returns the HTTP validators saved for a URL (None if there aren't any).
+        """
+
+        validators = self.__validators.find_one({"url": url}, {"_id": False, "url": False})
+        return validators or None
+
+    def save_validators(self, validators):
+        """
+        Saves HTTP validators, from a dictionary of URLs to their validators.
+        """
+
+        from pymongo import UpdateOne
+
+        if not validators:
+            return
+
+        self.__validators.bulk_write([
+            UpdateOne({"url": url}, {"$set": url_validators}, upsert=True)
+            for url, url_validators in validators.items()
+        ], ordered=False)
+
+    def get_seen(self, name):
+        """
+        Returns the key and link of every item seen for a given name.
+        """
+
+        seen = self.__get_seen().find({"name": name}, {"_id": False, "key": True, "link": True})
+        return list(seen)
+
+    def is_seen(self, name, key, link=None):
+        """
+        Returns whether an item with the given key (or link, if given) has been seen for a given
+        name.
+        """
+
+        query = {"name": name, "$or": [{"key": key}, *([{"link": link}] if link else [])]}
+
+        return self.__get_seen().find_one(query, {"_id": True}) is not None
+
+    def save_seen(self, seen):
+        """
+        Saves items as seen, from a dictionary of names to dictionaries of the items' keys to their
+        links.
+        """
+
+        from pymongo import UpdateOne
+
+        if not any(seen.values()):
+            return
+
+        self.__get_seen().bulk_write([
+            UpdateOne({"name": name, "key": key}, {"$set": {"link": link}}, upsert=True)
+            for name, name_seen in seen.items()
+            for key, link in name_seen.items()
+        ], ordered=False)
+
+    def save_run_report(self, run_report):
+        """
+        Saves a run report.
+        """
+
+        self.__run_reports.insert_one(dict(run_report))
+
+    def get_run_reports(self):
+        """
+        Returns the run reports that have been saved, oldest first.
+        """
+
+        return list(self.__run_reports.find({}, {"_id": False}).sort("_id", 1))
+
+    def get_latest_journal(self):
+        """
+        Returns the run journal that was started last (None if there aren't any).
+        """
+
+        journal = self.__journals.find_one({}, {"_id": False, "journal": True},
+                                           sort=[("started", -1)])
+        return json.loads(journal["journal"]) if journal else None
+
+    def save_journal(self, journal):
+        """
+        Saves a run journal, replacing any saved before for the same run.
+        """
+
+        # Saved as JSON as the keys of seen items and validators can have dots in them, which
+        # MongoDB doesn't allow in field names
+        self.__journals.replace_one(
+            {"run_id": journal["run_id"]},
+            {"run_id": journal["run_id"], "started": journal["started"],
+             "journal": json.dumps(journal)},
+            upsert=True,
+        )
+
+    def delete_journal(self, run_id):
+        """
+        Deletes the run journal for a given run, if there is one.
+        """
+
+        self.__journals.delete_one({"run_id": run_id})
+
+    def get_search_result(self, key):
+        """
+        Returns a Spotify search result and when it expires (None if it hasn't been saved).
+        """
+
+        return self.__get_search_results().find_one({"key": key},
+                                                    {"_id": False, "result": True, "expires": True})
+
+    def save_search_result(self, key, result, expires):
+        """
+        Saves a Spotify search result until it expires (as a timestamp).
+        """
+
+        # MongoDB deletes the result itself once it has expired
+        self.__get_search_results().update_one(
+            {"key": key},
+            {"$set": {
+                "result": result,
+                "expires": expires,
+                "expires_at": datetime.fromtimestamp(expires, timezone.utc),
+            }},
+            upsert=True,
+        )
+
+    def close(self):
+        """
+        Closes the connection to the database.
+        """
+
+        self.__client.close()
+
+    def __get_checkpoints(self):
+        # Indexed on first use so that creating a store doesn't connect to the database
+        if not self.__checkpoints_indexed:
+            self.__checkpoints.create_index("name", unique=True)
+            self.__checkpoints_indexed = True
+
+        return self.__checkpoints
+
+    def __get_search_results(self):
+        if not self.__search_results_indexed:
+            self.__search_results.create_index("key", unique=True)
+            self.__search_results.create_index("expires_at", expireAfterSeconds=0)
+            self.__search_results_indexed = True
+
+        return self.__search_results
+
+    def __get_seen(self):
+        if not self.__seen_indexed:
+            self.__seen.create_index([("name", 1), ("key", 1)], unique=True)
+            self.__seen.create_index([("name", 1), ("link", 1)])
+            self.__seen_indexed = True
+
+        return self.__seen
+
+
+def open_store(uri):
+    """
+    Returns the store for a URI, going by its scheme.
+    """
+
+    scheme = urlparse(uri).scheme
+
+    if scheme == "memory":
+        return MemoryStore()
+
+    if scheme == "sqlite":
+        # As with SQLAlchemy, sqlite:///file.db is relative and sqlite:////file.db is absolute
+        return SQLiteStore(urlparse(uri).path[1:] or ":memory:")
+
+    if scheme in ("mongodb", "mongodb+srv"):
+        return MongoStore(uri)
+
+    raise Exception(f"Unsupported storage URI scheme: {scheme or 'none'}.")
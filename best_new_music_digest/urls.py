@@ -0,0 +1,20 @@
+"""
+URL helpers.
+"""
+
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+# Query parameters holding credentials
+__SECRET_PARAMS = {"access_token", "api_key", "key", "token"}
+
+
+def scrub_url(url):
+    """
+    Returns a URL without any credentials in its query, so that it can be stored.
+    """
+
+    parsed = urlparse(url)
+    query = [(name, value) for name, value in parse_qsl(parsed.query, keep_blank_values=True)
+             if name not in __SECRET_PARAMS]
+
+    return urlunparse(parsed._replace(query=urlencode(query)))
@@ -0,0 +1,71 @@
+# pylint: disable=too-few-public-methods
+
+"""
+YouTube Data API client.
+"""
+
+from urllib.parse import urlencode
+
+from best_new_music_digest import report
+
+
+class YouTube:
+    """
+    Client for the parts of the YouTube Data API that the scrapers use.
+    """
+
+    API_URL = "https://www.googleapis.com/youtube/v3"
+
+    # The most playlist items the API returns per page
+    MAX_RESULTS = 50
+
+    # Quota units used by each call (https://developers.google.com/youtube/v3/determine_quota_cost)
+    __QUOTA_COSTS = {"playlistItems": 1}
+
+    def __init__(self, api_key, fetch):
+        """
+        Takes the API key and a function that gets a URL and returns the response, or None if the
+        page hasn't changed since it was last fetched.
+        """
+
+        self.__api_key = api_key
+        self.__fetch = fetch
+
+    def iter_playlist_items(self, playlist_id, fields, max_pages=1):
+        """
+        Yields the items of a playlist, newest first, with only the given fields of each one (in
+        the API's fields syntax, e.g. snippet(title)). Later pages are only fetched once the items
+        before them have been used, up to max_pages pages.
+        """
+
+        page_token = None
+
+        for _ in range(max_pages):
+            params = {
+                "part": "snippet",
+                "playlistId": playlist_id,
+                "maxResults": self.MAX_RESULTS,
+                "fields": f"nextPageToken,items({fields})",
+                "key": self.__api_key,
+            }
+
+            if page_token:
+                params["pageToken"] = page_token
+
+            response = self.__fetch(f"{self.API_URL}/playlistItems?{urlencode(params)}")
+            report.record_quota("youtube", self.__QUOTA_COSTS["playlistItems"])
+
+            if response is None:
+                return
+
+            page = response.json()
+
+            if "error" in page:
+                raise Exception(f"YouTube API error: {page['error'].get('message')}.")
+
+            yield from page.get("items", [])
+
+            page_token = page.get("nextPageToken")
+
+            if not page_token:
+                return
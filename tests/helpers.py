@@ -7,6 +7,8 @@ from importlib import reload
 from unittest.mock import patch
 
 import mongomock
+from mongomock.store import CollectionStore
+from mongomock.store import lock as store_lock
 
 
 class TestBase(unittest.TestCase):
@@ -17,8 +19,14 @@ class TestBase(unittest.TestCase):
         from best_new_music_digest import settings
         self._settings = settings
 
+        # Scrapers save to the database from several threads, but mongomock iterates over
+        # collections without holding the lock it writes to them with
+        documents = patch.object(CollectionStore, "documents", property(self.__get_documents))
+        documents.start()
+        self.addCleanup(documents.stop)
+
         from best_new_music_digest.checkpoint import Checkpointer
-        with patch("best_new_music_digest.checkpoint.MongoClient") as client:
+        with patch("pymongo.MongoClient") as client:
             client.return_value = mongomock.MongoClient()
             self._checkpointer = Checkpointer()
 
@@ -29,6 +37,11 @@ class TestBase(unittest.TestCase):
         except:
             pass
 
+    @staticmethod
+    def __get_documents(store):
+        with store_lock:
+            return iter(list(store._documents.values()))  # pylint: disable=protected-access
+
     @staticmethod
     def _load_test_data(file_name):
         with open(os.path.join(os.path.dirname(__file__), "test_data", file_name)) as test_data:
@@ -45,20 +58,44 @@ class TestBase(unittest.TestCase):
     @staticmethod
     def __set_env_vars():
         os.environ["ALWAYS_EMAIL"] = "false"
+        os.environ.pop("BACKFILL_MAX_PAGES", None)
+        os.environ.pop("CIRCUIT_BREAKER_THRESHOLD", None)
+        os.environ.pop("CONDITIONAL_REQUESTS", None)
         os.environ["CREATE_SPOTIFY_PLAYLISTS"] = "true"
         os.environ["DAD_JOKE"] = "true"
-        os.environ["MONGODB_URI"] = "some-mongodb-uri"
+        os.environ.pop("HTML_PARSER", None)
+        os.environ.pop("HTTP_CASSETTE_DIR", None)
+        os.environ.pop("HTTP_CASSETTE_LATENCY", None)
+        os.environ.pop("HTTP_CASSETTE_MODE", None)
+        os.environ.pop("HTTP_CONNECT_TIMEOUT", None)
+        os.environ.pop("HTTP_READ_TIMEOUT", None)
+        os.environ["HTTP_RETRIES"] = "0"
+        os.environ.pop("METRICS_PORT", None)
+        os.environ.pop("METRICS_TEXTFILE", None)
+        os.environ["MONGODB_URI"] = "mongodb://some-mongodb-host"
         os.environ["PITCHFORK_ALBUMS"] = "true"
         os.environ["PITCHFORK_TRACKS"] = "true"
+        os.environ.pop("PROFILES_FILE", None)
+        os.environ.pop("RATE_LIMITS", None)
         os.environ["RECIPIENT_EMAIL"] = "some-recipient-email"
+        os.environ.pop("RUN_DEADLINE", None)
+        os.environ.pop("RUN_JOURNAL_MAX_AGE", None)
+        os.environ.pop("RUN_REPORT_FILE", None)
+        os.environ.pop("RUN_REPORT_MONGODB", None)
         os.environ["SENDER_EMAIL"] = "some-sender-email"
         os.environ["SENDER_NAME"] = "some-sender-name"
         os.environ["SENDGRID_API_KEY"] = "some-api-key"
         os.environ["SENDGRID_TEMPLATE_ID"] = "some-sendgrid-template-id"
+        os.environ.pop("SPOTIFY_CACHE_SIZE", None)
+        os.environ.pop("SPOTIFY_CACHE_TTL", None)
         os.environ["SPOTIFY_CLIENT_ID"] = "some-spotify-client-id"
         os.environ["SPOTIFY_CLIENT_SECRET"] = "some-spotify-client-secret"
+        os.environ.pop("SPOTIFY_MAX_WORKERS", None)
+        os.environ.pop("SPOTIFY_NOT_FOUND_TTL", None)
         os.environ["SPOTIFY_USERNAME"] = "some-spotify-username"
         os.environ["SPUTNIKMUSIC_ALBUMS"] = "true"
+        os.environ.pop("STORAGE_URI", None)
+        os.environ.pop("STREAMING_SCRAPERS", None)
         os.environ["THE_NEEDLE_DROP_ALBUMS"] = "true"
         os.environ["THE_NEEDLE_DROP_TRACKS"] = "true"
         os.environ["YOUTUBE_API_KEY"] = "some-youtube-api-key"
@@ -1,5 +1,12 @@
-# pylint: disable=missing-class-docstring, missing-function-docstring, missing-module-docstring, too-few-public-methods
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring, too-few-public-methods, too-many-public-methods
 
+import io
+from unittest.mock import MagicMock, patch
+
+import requests
+import requests_mock
+
+from best_new_music_digest.deadline import Deadline
 from best_new_music_digest.scrapers.base import Scraper
 from tests import helpers
 
@@ -17,6 +24,84 @@ class MockErrorScraper(Scraper):
     def _get_items(self):
         raise Exception()
 
+class MockFetchScraper(Scraper):
+
+    def __init__(self, checkpointer):
+        super().__init__(checkpointer, "fetch", "fetch-link", "albums")
+
+    def _get_items(self):
+        response = self._fetch("https://some-source/?key=some-key")
+
+        if response is None:
+            return []
+
+        items = []
+
+        for item in response.json():
+            if item["link"] == self._get_checkpoint():
+                break
+
+            self._save_checkpoint(item["link"])
+            items.append(item)
+
+        return items
+
+class MockElementScraper(Scraper):
+
+    def __init__(self, checkpointer):
+        super().__init__(checkpointer, "elements", "elements-link", "albums")
+
+    def _get_items(self):
+        items = []
+
+        checkpoint = self._get_checkpoint()
+
+        for anchor in self._get_elements("https://some-source/", ("a", "item")):
+            link = anchor.get("href")
+
+            if link == checkpoint:
+                break
+
+            self._save_checkpoint(link)
+            items.append({"artist": anchor.text, "title": anchor.text, "link": link})
+
+        return items
+
+    def _get_page_url(self, page):
+        return f"https://some-source/?page={page}"
+
+class MockCancelledScraper(Scraper):
+
+    def __init__(self, checkpointer):
+        super().__init__(checkpointer, "cancelled", "cancelled-link", "albums")
+
+    def _get_items(self):
+        self._save_checkpoint("some-link")
+
+        # Timed out while scraping
+        self.cancel()
+
+        return [{"artist": "some-artist", "title": "some-title", "link": "some-link"}]
+
+class TrackedBytesIO(io.BytesIO):
+
+    def __init__(self, content):
+        super().__init__(content)
+        self.bytes_read = 0
+
+    def read(self, *args, **kwargs):
+        data = super().read(*args, **kwargs)
+        self.bytes_read += len(data)
+        return data
+
+class BrokenBytesIO(TrackedBytesIO):
+
+    def read(self, *args, **kwargs):
+        if self.bytes_read > 50000:
+            raise requests.exceptions.ChunkedEncodingError()
+
+        return super().read(*args, **kwargs)
+
 class TestScraper(helpers.TestBase):
 
     def test_scrape(self):
@@ -36,3 +121,371 @@ class TestScraper(helpers.TestBase):
             "errors": True,
             "type": "albums",
         }
+
+    def test_scrape_records_health(self):
+        MockScraper(self._checkpointer).scrape()
+
+        health = self._checkpointer.get_health("scraper")
+        assert health["consecutive_failures"] == 0
+        assert len(health["durations"]) == 1
+
+    def test_scrape_with_error_records_health(self):
+        MockErrorScraper(self._checkpointer).scrape()
+        MockCancelledScraper(self._checkpointer).scrape()
+
+        assert self._checkpointer.get_health("error")["consecutive_failures"] == 1
+        assert self._checkpointer.get_health("cancelled")["last_error"] == "Timed out"
+
+    def test_scrape_circuit_breaker(self):
+        self._settings.CIRCUIT_BREAKER_THRESHOLD = 2
+
+        scraper = MockErrorScraper(self._checkpointer)
+
+        with patch.object(MockErrorScraper, "_get_items", side_effect=Exception) as get_items:
+            scraper.scrape()
+            scraper.scrape()
+
+            # Skipped for a run, then probed
+            assert scraper.scrape() == {
+                "title": "error",
+                "link": "error-link",
+                "items": [],
+                "errors": True,
+                "type": "albums",
+                "circuit_open": True,
+                "consecutive_failures": 2,
+                "last_error": "Exception",
+            }
+            assert get_items.call_count == 2
+
+            scraper.scrape()
+            assert get_items.call_count == 3
+
+            # Skipped for twice as long after the probe fails
+            scraper.scrape()
+            scraper.scrape()
+            assert get_items.call_count == 3
+
+    def test_scrape_circuit_breaker_closes(self):
+        self._settings.CIRCUIT_BREAKER_THRESHOLD = 1
+        self._checkpointer.save_health("scraper", {"consecutive_failures": 1, "skips_left": 0})
+
+        assert not MockScraper(self._checkpointer).scrape()["errors"]
+        assert self._checkpointer.get_health("scraper")["consecutive_failures"] == 0
+
+    def test_scrape_health_not_saved(self):
+        checkpointer = MagicMock(wraps=self._checkpointer)
+        checkpointer.get_health.return_value = None
+        checkpointer.save_health.side_effect = self._raise_exception
+
+        assert not MockScraper(checkpointer).scrape()["errors"]
+
+    def test_scrape_health_not_loaded(self):
+        from best_new_music_digest.checkpoint import Checkpointer
+        from best_new_music_digest.storage import MemoryStore
+
+        store = MagicMock(wraps=MemoryStore())
+        store.get_health.side_effect = Exception("db down")
+
+        assert not MockScraper(Checkpointer(store)).scrape()["errors"]
+
+    def test_scrape_storage_down(self):
+        from best_new_music_digest.checkpoint import Checkpointer
+
+        store = MagicMock()
+
+        for method in ("get_checkpoints", "get_health", "save_health", "get_seen", "is_seen"):
+            getattr(store, method).side_effect = Exception("db down")
+
+        # The source is reported as failed rather than the whole run failing
+        assert MockFetchScraper(Checkpointer(store)).scrape() == {
+            "title": "fetch",
+            "link": "fetch-link",
+            "items": [],
+            "errors": True,
+            "type": "albums",
+        }
+
+    def test_scrape_cancelled(self):
+        assert MockCancelledScraper(self._checkpointer).scrape() == {
+            "title": "cancelled",
+            "link": "cancelled-link",
+            "items": [],
+            "errors": True,
+            "type": "albums",
+        }
+
+        assert self._checkpointer.get_checkpoint("cancelled") is None
+        assert self._checkpointer.get_seen("cancelled") == []
+
+    def test_cancel_after_scrape(self):
+        scraper = MockFetchScraper(self._checkpointer)
+
+        with requests_mock.Mocker() as req_mock:
+            req_mock.get("https://some-source/", json=self.__items("some-link"))
+            scraper.scrape()
+
+        assert not scraper.cancel()
+        assert self._checkpointer.get_checkpoint("fetch") == "some-link"
+
+    def test_get_error_digest_item(self):
+        assert MockScraper(self._checkpointer).get_error_digest_item() == {
+            "title": "scraper",
+            "link": "scraper-link",
+            "items": [],
+            "errors": True,
+            "type": "albums",
+        }
+
+    def test_fetch_not_modified(self):
+        scraper = MockFetchScraper(self._checkpointer)
+        self._checkpointer.save_checkpoint("fetch", "some-old-link")
+
+        with requests_mock.Mocker() as req_mock:
+            req_mock.get("https://some-source/", json=self.__items("some-link"),
+                         headers={"ETag": '"some-etag"', "Last-Modified": "some-date"})
+            assert len(scraper.scrape()["items"]) == 1
+
+            assert "If-None-Match" not in req_mock.last_request.headers
+
+            req_mock.get("https://some-source/", status_code=304)
+            assert scraper.scrape()["items"] == []
+
+            assert req_mock.last_request.headers["If-None-Match"] == '"some-etag"'
+            assert req_mock.last_request.headers["If-Modified-Since"] == "some-date"
+
+        # Credentials aren't saved with the validators
+        assert self._checkpointer.get_validators("https://some-source/?key=some-key") is None
+        assert self._checkpointer.get_validators("https://some-source/")["etag"] == '"some-etag"'
+
+    def test_fetch_same_content(self):
+        scraper = MockFetchScraper(self._checkpointer)
+        self._checkpointer.save_checkpoint("fetch", "some-old-link")
+
+        with requests_mock.Mocker() as req_mock:
+            req_mock.get("https://some-source/", json=self.__items("some-link"))
+            assert len(scraper.scrape()["items"]) == 1
+
+            # Moving the checkpoint back shows that the unchanged page isn't scraped again
+            self._checkpointer.save_checkpoint("fetch", "some-old-link")
+            assert scraper.scrape()["items"] == []
+
+            # The item found the first time isn't sent again, even though it's after the checkpoint
+            req_mock.get("https://some-source/", json=self.__items("some-new-link", "some-link"))
+            assert [item["link"] for item in scraper.scrape()["items"]] == ["some-new-link"]
+
+    def test_fetch_checkpoint_removed(self):
+        scraper = MockFetchScraper(self._checkpointer)
+        self._checkpointer.save_checkpoint("fetch", "some-old-link")
+
+        with requests_mock.Mocker() as req_mock:
+            req_mock.get("https://some-source/", json=self.__items("link-2", "link-1"))
+            scraper.scrape()
+
+            # Without the checkpoint on the page only the new item is sent
+            req_mock.get("https://some-source/", json=self.__items("link-3", "link-1"))
+            assert [item["link"] for item in scraper.scrape()["items"]] == ["link-3"]
+
+    def test_fetch_without_checkpoint_saves_seen(self):
+        scraper = MockFetchScraper(self._checkpointer)
+
+        with requests_mock.Mocker() as req_mock:
+            req_mock.get("https://some-source/", json=self.__items("link-2", "link-1"))
+            assert len(scraper.scrape()["items"]) == 2
+
+        seen = sorted(item["link"] for item in self._checkpointer.get_seen("fetch"))
+        assert seen == ["link-1", "link-2"]
+
+    def test_fetch_validators_not_saved_on_error(self):
+        scraper = MockFetchScraper(self._checkpointer)
+        self._checkpointer.save_checkpoint("fetch", "some-old-link")
+
+        with requests_mock.Mocker() as req_mock:
+            req_mock.get("https://some-source/", json=[{"link": "some-link"}])
+            assert scraper.scrape()["errors"]
+
+        assert self._checkpointer.get_validators("https://some-source/") is None
+        assert self._checkpointer.get_checkpoint("fetch") == "some-old-link"
+
+    def test_fetch_without_checkpoint(self):
+        scraper = MockFetchScraper(self._checkpointer)
+
+        with requests_mock.Mocker() as req_mock:
+            req_mock.get("https://some-source/", json=self.__items("some-link"),
+                         headers={"ETag": '"some-etag"'})
+            scraper.scrape()
+
+            self._checkpointer.save_checkpoint("fetch", None)
+            assert len(scraper.scrape()["items"]) == 1
+            assert "If-None-Match" not in req_mock.last_request.headers
+
+    def test_fetch_conditional_requests_disabled(self):
+        self._settings.CONDITIONAL_REQUESTS = False
+
+        scraper = MockFetchScraper(self._checkpointer)
+        self._checkpointer.save_checkpoint("fetch", "some-old-link")
+
+        with requests_mock.Mocker() as req_mock:
+            req_mock.get("https://some-source/", json=self.__items("some-link"),
+                         headers={"ETag": '"some-etag"'})
+            scraper.scrape()
+
+        assert self._checkpointer.get_validators("https://some-source/") is None
+
+    def test_fetch_deadline_timeout(self):
+        self._settings.HTTP_READ_TIMEOUT = 30
+
+        with requests_mock.Mocker() as req_mock:
+            req_mock.get("https://some-source/", json=self.__items("some-link"))
+            MockFetchScraper(self._checkpointer).scrape(Deadline(10))
+
+            connect_timeout, read_timeout = req_mock.last_request.timeout
+
+        assert connect_timeout <= 5
+        assert 9 < read_timeout <= 10
+
+    def test_fetch_deadline_passed(self):
+        with requests_mock.Mocker() as req_mock:
+            digest_item = MockFetchScraper(self._checkpointer).scrape(Deadline(0))
+
+            assert not req_mock.called
+
+        assert digest_item["errors"]
+        assert self._checkpointer.get_health("fetch")["last_error"] == "Timed out"
+
+    def test_fetch_after_cancel(self):
+        scraper = MockFetchScraper(self._checkpointer)
+        scraper.cancel()
+
+        with requests_mock.Mocker() as req_mock:
+            assert scraper.scrape()["errors"]
+            assert not req_mock.called
+
+    def test_get_elements(self):
+        self.__test_get_elements(None, 100)
+
+    def test_get_elements_with_checkpoint(self):
+        self.__test_get_elements("link-2", 2)
+
+    def test_get_elements_streaming(self):
+        self._settings.STREAMING_SCRAPERS = True
+
+        body = self.__test_get_elements(None, 100)
+
+        assert body.bytes_read == len(self.__page())
+        assert body.closed
+
+    def test_get_elements_streaming_with_checkpoint(self):
+        self._settings.STREAMING_SCRAPERS = True
+
+        body = self.__test_get_elements("link-2", 2)
+
+        # The download stops soon after the checkpoint
+        assert body.bytes_read < len(self.__page()) / 2
+        assert body.closed
+
+    def test_get_elements_backfill(self):
+        self._checkpointer.save_checkpoint("elements", "link-250")
+
+        with requests_mock.Mocker() as req_mock:
+            self.__mock_pages(req_mock, 10)
+            items = MockElementScraper(self._checkpointer).scrape()["items"]
+
+            # The first page, then a batch of four pages
+            assert req_mock.call_count == 5
+
+        assert [item["link"] for item in items] == [f"link-{i}" for i in range(250)]
+
+    def test_get_elements_backfill_error(self):
+        self._checkpointer.save_checkpoint("elements", "some-old-link")
+
+        with requests_mock.Mocker() as req_mock:
+            self.__mock_pages(req_mock, 1)
+            req_mock.get("https://some-source/?page=2", exc=requests.exceptions.ConnectionError)
+            digest_item = MockElementScraper(self._checkpointer).scrape()
+
+        assert digest_item["errors"]
+
+        # The first page's items are found again next time
+        assert self._checkpointer.get_checkpoint("elements") == "some-old-link"
+
+    def test_get_elements_backfill_max_pages(self):
+        self._settings.BACKFILL_MAX_PAGES = 2
+        self._checkpointer.save_checkpoint("elements", "some-old-link")
+
+        with requests_mock.Mocker() as req_mock:
+            self.__mock_pages(req_mock, 10)
+            items = MockElementScraper(self._checkpointer).scrape()["items"]
+
+            assert req_mock.call_count == 2
+
+        assert len(items) == 200
+
+    def test_get_elements_backfill_last_page(self):
+        self._checkpointer.save_checkpoint("elements", "some-old-link")
+
+        with requests_mock.Mocker() as req_mock:
+            self.__mock_pages(req_mock, 2)
+            items = MockElementScraper(self._checkpointer).scrape()["items"]
+
+        assert len(items) == 200
+
+    def test_get_elements_backfill_page_ignored(self):
+        self._checkpointer.save_checkpoint("elements", "some-old-link")
+
+        with requests_mock.Mocker() as req_mock:
+            req_mock.get("https://some-source/", body=io.BytesIO(self.__page()))
+            items = MockElementScraper(self._checkpointer).scrape()["items"]
+
+        assert len(items) == 100
+
+    def test_get_elements_backfill_without_checkpoint(self):
+        with requests_mock.Mocker() as req_mock:
+            self.__mock_pages(req_mock, 10)
+            MockElementScraper(self._checkpointer).scrape()
+
+            assert req_mock.call_count == 1
+
+    def __mock_pages(self, req_mock, pages):
+        req_mock.get("https://some-source/", status_code=404, text="")
+        req_mock.get("https://some-source/", complete_qs=True, body=io.BytesIO(self.__page()))
+
+        for page in range(2, pages + 1):
+            req_mock.get(f"https://some-source/?page={page}",
+                         content=self.__page(start=(page - 1) * 100))
+
+    def test_get_elements_streaming_error(self):
+        self._settings.STREAMING_SCRAPERS = True
+        self._checkpointer.save_checkpoint("elements", "some-old-link")
+
+        with requests_mock.Mocker() as req_mock:
+            req_mock.get("https://some-source/", body=BrokenBytesIO(self.__page()))
+            digest_item = MockElementScraper(self._checkpointer).scrape()
+
+        assert digest_item["errors"]
+
+        # The checkpoint isn't moved on by the items read before the download broke
+        assert self._checkpointer.get_checkpoint("elements") == "some-old-link"
+
+    def __test_get_elements(self, checkpoint, expected_items):
+        self._checkpointer.save_checkpoint("elements", checkpoint)
+        body = TrackedBytesIO(self.__page())
+
+        with requests_mock.Mocker() as req_mock:
+            req_mock.get("https://some-source/", body=body)
+            items = MockElementScraper(self._checkpointer).scrape()["items"]
+
+        assert [item["link"] for item in items] == [f"link-{i}" for i in range(expected_items)]
+
+        return body
+
+    @staticmethod
+    def __page(start=0):
+        items = "".join(f'<div><a class="item" href="link-{i}">{i}</a><p>{"x" * 1000}</p></div>'
+                        for i in range(start, start + 100))
+
+        return f"<html><body>{items}</body></html>".encode("utf-8")
+
+    @staticmethod
+    def __items(*links):
+        return [{"artist": "some-artist", "title": f"{link}-title", "link": link} for link in links]
@@ -1,5 +1,11 @@
 # pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
 
+import os
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
 from tests import helpers
 
 
@@ -52,8 +58,75 @@ class TestFactory(helpers.TestBase):
             "The Needle Drop Tracks",
         ])
 
-    def __test_get_scrapers(self, expected_scrapers):
-        actual_scrapers = self.__factory.get_scrapers()
+    def test_get_scrapers_with_checkpointer(self):
+        self._settings.PITCHFORK_ALBUMS = True
+        self.__test_get_scrapers(["Pitchfork Albums"], self._checkpointer)
+
+    def test_get_scrapers_by_title(self):
+        self.__test_get_scrapers(["Pitchfork Albums", "The Needle Drop Tracks"],
+                                 titles={"Pitchfork Albums", "The Needle Drop Tracks"})
+
+    def test_get_scrapers_with_session(self):
+        session = MagicMock()
+        session.get.side_effect = self._raise_exception
+
+        scrapers = self.__factory.get_scrapers(self._checkpointer,
+                                               {"Pitchfork Albums", "The Needle Drop Albums"},
+                                               session)
+
+        for scraper in scrapers:
+            assert scraper.scrape()["errors"]
+
+        assert session.get.call_count == 2
+
+    def test_get_scrapers_share_session(self):
+        self._settings.THE_NEEDLE_DROP_ALBUMS = True
+        self._settings.THE_NEEDLE_DROP_TRACKS = True
+
+        with patch("best_new_music_digest.http.get_session") as get_session:
+            get_session.return_value.get.side_effect = self._raise_exception
+
+            for scraper in self.__factory.get_scrapers(self._checkpointer):
+                scraper.scrape()
+
+        get_session.assert_called_once()
+        assert get_session.return_value.get.call_count == 2
+
+    def test_get_scrapers_imports_enabled_only(self):
+        self._settings.SPUTNIKMUSIC_ALBUMS = True
+
+        with patch("best_new_music_digest.scrapers.registry.import_module") as import_module:
+            self.__factory.get_scrapers(self._checkpointer)
+
+        import_module.assert_called_once_with("best_new_music_digest.scrapers.sputnikmusic")
+
+    def test_get_scrapers_missing_required_setting(self):
+        self._settings.THE_NEEDLE_DROP_ALBUMS = True
+        del os.environ["YOUTUBE_API_KEY"]
+
+        with pytest.raises(Exception) as exception:
+            self.__factory.get_scrapers(self._checkpointer)
+        assert str(exception.value) == "Missing mandatory properties: ['YOUTUBE_API_KEY']."
+
+    def test_get_scrapers_schedule(self):
+        self._settings.PITCHFORK_ALBUMS = True
+        self._settings.PITCHFORK_TRACKS = True
+        os.environ["PITCHFORK_TRACKS_SCHEDULE"] = "0 0 1 1 *"
+
+        try:
+            # Not due again until next year
+            self.__test_get_scrapers(["Pitchfork Albums"], since=datetime.utcnow())
+            self.__test_get_scrapers(["Pitchfork Albums", "Pitchfork Tracks"])
+        finally:
+            del os.environ["PITCHFORK_TRACKS_SCHEDULE"]
+
+    def test_get_scrapers_unknown_title(self):
+        with pytest.raises(Exception) as exception:
+            self.__factory.get_scrapers(titles={"Pitchfork Albums", "Some Scraper"})
+        assert str(exception.value) == "Unknown scrapers: ['Some Scraper']."
+
+    def __test_get_scrapers(self, expected_scrapers, checkpointer=None, titles=None, since=None):
+        actual_scrapers = self.__factory.get_scrapers(checkpointer, titles, since=since)
 
         assert len(actual_scrapers) == len(expected_scrapers)
 
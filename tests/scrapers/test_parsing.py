@@ -0,0 +1,98 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+from unittest.mock import patch
+
+from bs4 import SoupStrainer
+from requests import Response
+
+from tests import helpers
+
+
+class TestParsing(helpers.TestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        from best_new_music_digest.scrapers import parsing
+        self.__parsing = parsing
+
+    def test_get_backend(self):
+        self._settings.HTML_PARSER = "html.parser"
+        assert self.__parsing.get_backend() == "html.parser"
+
+    def test_get_backend_auto(self):
+        self._settings.HTML_PARSER = "auto"
+
+        with patch.object(self.__parsing, "is_available", return_value=True):
+            assert self.__parsing.get_backend() == "lxml"
+
+    def test_get_backend_auto_without_lxml(self):
+        self._settings.HTML_PARSER = "auto"
+
+        with patch.object(self.__parsing, "is_available", side_effect=lambda b: b != "lxml"):
+            assert self.__parsing.get_backend() == "html.parser"
+
+    def test_is_available(self):
+        assert self.__parsing.is_available("html.parser")
+        assert not self.__parsing.is_available("some-missing-parser")
+
+    def test_get_charset(self):
+        assert self.__parsing.get_charset("text/html; charset=UTF-8") == "UTF-8"
+        assert self.__parsing.get_charset('text/html; charset="iso-8859-1"') == "iso-8859-1"
+        assert self.__parsing.get_charset("text/html") is None
+        assert self.__parsing.get_charset(None) is None
+
+    def test_decode_with_charset(self):
+        response = self.__response("café".encode("iso-8859-1"), "text/html; charset=iso-8859-1")
+        assert self.__parsing.decode(response) == "café"
+
+    def test_decode_without_charset(self):
+        response = self.__response("café".encode("utf-8"))
+        assert self.__parsing.decode(response) == "café"
+
+    def test_decode_with_wrong_charset(self):
+        response = self.__response("café".encode("utf-8"), "text/html; charset=some-charset")
+        assert self.__parsing.decode(response) == "café"
+
+    def test_decode_unknown_encoding(self):
+        response = self.__response("café".encode("iso-8859-1"))
+        assert self.__parsing.decode(response) == "café".encode("iso-8859-1")
+
+    def test_parse(self):
+        self._settings.HTML_PARSER = "html.parser"
+        response = self.__response(b"<div class='review'><h2>a</h2></div><div><h2>b</h2></div>")
+
+        soup = self.__parsing.parse(response)
+
+        assert [h2.text for h2 in soup.find_all("h2")] == ["a", "b"]
+
+    def test_parse_only(self):
+        self._settings.HTML_PARSER = "html.parser"
+        response = self.__response(b"<div class='review'><h2>a</h2></div><div><h2>b</h2></div>")
+
+        soup = self.__parsing.parse(response, SoupStrainer("div", "review"))
+
+        assert [h2.text for h2 in soup.find_all("h2")] == ["a"]
+
+    def test_element_splitter(self):
+        html = ("<div class='review new'><div><a href='a'>A &amp; B&#33;</a></div><br/></div>"
+                "<div class='other'>C</div><div class='review'>D</div>")
+        splitter = self.__parsing.ElementSplitter([("div", "review")])
+
+        # Elements can be split across chunks
+        elements = [e for i in range(0, len(html), 3) for e in splitter.split(html[i:i + 3])]
+
+        assert elements == [
+            "<div class='review new'><div><a href='a'>A &amp; B&#33;</a></div><br/></div>",
+            "<div class='review'>D</div>",
+        ]
+
+    @staticmethod
+    def __response(content, content_type=None):
+        response = Response()
+        response._content = content  # pylint: disable=protected-access
+
+        if content_type:
+            response.headers["Content-Type"] = content_type
+
+        return response
@@ -37,6 +37,20 @@ class TestAlbumScraper(helpers.TestBase):
         self.__test_scrape("pitchfork_albums_output_without_checkpoint.json")
         self.__test_scrape("pitchfork_albums_output_up_to_date.json")
 
+    def test_scrape_streaming_without_checkpoint(self):
+        self._settings.STREAMING_SCRAPERS = True
+        self.__test_scrape("pitchfork_albums_output_without_checkpoint.json")
+
+    def test_scrape_streaming_with_checkpoint(self):
+        self._settings.STREAMING_SCRAPERS = True
+        self._checkpointer.save_checkpoint(
+            "Pitchfork Albums",
+            "https://www.pitchfork.com/reviews/albums/" \
+            "perfume-genius-set-my-heart-on-fire-immediately/"
+        )
+
+        self.__test_scrape("pitchfork_albums_output_with_checkpoint.json")
+
     def __test_scrape(self, output):
         test_data = self._load_test_data("pitchfork_albums_input.html")
 
@@ -77,6 +91,20 @@ class TestTrackScraper(helpers.TestBase):
         self.__test_scrape("pitchfork_tracks_output_without_checkpoint.json")
         self.__test_scrape("pitchfork_tracks_output_up_to_date.json")
 
+    def test_scrape_streaming_without_checkpoint(self):
+        self._settings.STREAMING_SCRAPERS = True
+        self.__test_scrape("pitchfork_tracks_output_without_checkpoint.json")
+
+    def test_scrape_streaming_with_checkpoint(self):
+        self._settings.STREAMING_SCRAPERS = True
+        self._checkpointer.save_checkpoint(
+            "Pitchfork Tracks",
+            "https://www.pitchfork.com/reviews/tracks/" \
+            "megan-thee-stallion-savage-remix-ft-beyonce/"
+        )
+
+        self.__test_scrape("pitchfork_tracks_output_with_checkpoint.json")
+
     def __test_scrape(self, output):
         test_data = self._load_test_data("pitchfork_tracks_input.html")
 
@@ -0,0 +1,135 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+import os
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tests import helpers
+
+
+class TestRegistry(helpers.TestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        from best_new_music_digest.scrapers import registry
+        self.__registry = registry
+        self.__registry.reset()
+
+    def tearDown(self):
+        super().tearDown()
+
+        self.__registry.reset()
+        os.environ.pop("SOME_SOURCE", None)
+        os.environ.pop("SOME_SOURCE_SCHEDULE", None)
+
+    def test_get_scraper_infos(self):
+        with self.__entry_points([]):
+            scraper_infos = self.__registry.get_scraper_infos()
+
+        assert [scraper_info.name for scraper_info in scraper_infos] == [
+            "Pitchfork Albums",
+            "Pitchfork Tracks",
+            "Sputnikmusic Albums",
+            "The Needle Drop Albums",
+            "The Needle Drop Tracks",
+        ]
+
+    def test_get_scraper_infos_entry_points(self):
+        some_source = self.__registry.ScraperInfo("Some Source", "some.module:Scraper")
+        other_source = self.__registry.ScraperInfo("Other Source", "some.module:Other")
+
+        with self.__entry_points([some_source, [other_source]]) as entry_points:
+            scraper_infos = self.__registry.get_scraper_infos()
+            self.__registry.get_scraper_infos()
+
+        assert scraper_infos[-2:] == [some_source, other_source]
+
+        # Entry points are only discovered once
+        entry_points.assert_called_once()
+
+    def test_get_scraper_infos_invalid_entry_point(self):
+        with self.__entry_points(["some-scraper"]):
+            with pytest.raises(Exception) as exception:
+                self.__registry.get_scraper_infos()
+
+        assert str(exception.value) == "Invalid scraper entry point: some-entry-point-0."
+
+    def test_get_scraper_infos_duplicate_name(self):
+        duplicate = self.__registry.ScraperInfo("Pitchfork Albums", "some.module:Scraper")
+
+        with self.__entry_points([duplicate]):
+            with pytest.raises(Exception) as exception:
+                self.__registry.get_scraper_infos()
+
+        assert str(exception.value) == "Scrapers declared more than once: ['Pitchfork Albums']."
+
+    def test_setting(self):
+        scraper_info = self.__registry.ScraperInfo("Some Source", "some.module:Scraper")
+        assert scraper_info.setting == "SOME_SOURCE"
+
+    def test_is_enabled(self):
+        scraper_info = self.__registry.ScraperInfo("Pitchfork Albums", "some:Scraper")
+        assert scraper_info.is_enabled()
+
+        self._settings.PITCHFORK_ALBUMS = False
+        assert not scraper_info.is_enabled()
+
+    def test_is_enabled_not_built_in(self):
+        scraper_info = self.__registry.ScraperInfo("Some Source", "some.module:Scraper")
+        assert scraper_info.is_enabled()
+
+        os.environ["SOME_SOURCE"] = "false"
+        assert not scraper_info.is_enabled()
+
+    def test_check_required_settings(self):
+        scraper_info = self.__registry.ScraperInfo("Some Source", "some.module:Scraper",
+                                                   required_settings=["YOUTUBE_API_KEY",
+                                                                      "SOME_API_KEY"])
+
+        with pytest.raises(Exception) as exception:
+            scraper_info.check_required_settings()
+
+        assert str(exception.value) == "Missing mandatory properties: ['SOME_API_KEY']."
+
+    def test_is_due(self):
+        scraper_info = self.__registry.ScraperInfo("Some Source", "some.module:Scraper",
+                                                   schedule="0 12 * * *")
+
+        assert scraper_info.is_due(None, datetime(2020, 1, 1, 11))
+        assert not scraper_info.is_due(datetime(2020, 1, 1, 10), datetime(2020, 1, 1, 11))
+        assert scraper_info.is_due(datetime(2020, 1, 1, 10), datetime(2020, 1, 1, 12))
+
+    def test_is_due_without_schedule(self):
+        scraper_info = self.__registry.ScraperInfo("Some Source", "some.module:Scraper")
+        assert scraper_info.is_due(datetime(2020, 1, 1, 10), datetime(2020, 1, 1, 10, 1))
+
+    def test_is_due_schedule_setting(self):
+        scraper_info = self.__registry.ScraperInfo("Some Source", "some.module:Scraper",
+                                                   schedule="0 12 * * *")
+        os.environ["SOME_SOURCE_SCHEDULE"] = "0 11 * * *"
+
+        assert scraper_info.is_due(datetime(2020, 1, 1, 10), datetime(2020, 1, 1, 11))
+
+    def test_load(self):
+        from best_new_music_digest.scrapers.pitchfork import AlbumScraper
+
+        scraper_info = self.__registry.ScraperInfo(
+            "Pitchfork Albums", "best_new_music_digest.scrapers.pitchfork:AlbumScraper")
+
+        assert scraper_info.load() is AlbumScraper
+
+    @staticmethod
+    def __entry_points(declared):
+        entry_points = []
+
+        for index, scraper_infos in enumerate(declared):
+            entry_point = MagicMock()
+            entry_point.name = f"some-entry-point-{index}"
+            entry_point.load.return_value = scraper_infos
+            entry_points.append(entry_point)
+
+        return patch("importlib.metadata.entry_points",
+                     return_value=MagicMock(select=MagicMock(return_value=entry_points)))
@@ -35,6 +35,19 @@ class TestAlbumScraper(helpers.TestBase):
         self.__test_scrape("sputnikmusic_albums_output_without_checkpoint.json")
         self.__test_scrape("sputnikmusic_albums_output_up_to_date.json")
 
+    def test_scrape_streaming_without_checkpoint(self):
+        self._settings.STREAMING_SCRAPERS = True
+        self.__test_scrape("sputnikmusic_albums_output_without_checkpoint.json")
+
+    def test_scrape_streaming_with_checkpoint(self):
+        self._settings.STREAMING_SCRAPERS = True
+        self._checkpointer.save_checkpoint(
+            "Sputnikmusic Albums",
+            "https://www.sputnikmusic.com/album/357694/Jeff-Rosenstock-NO-DREAM/"
+        )
+
+        self.__test_scrape("sputnikmusic_albums_output_with_checkpoint.json")
+
     def __test_scrape(self, output):
         test_data = self._load_test_data("sputnikmusic_albums_input.html")
 
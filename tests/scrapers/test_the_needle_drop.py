@@ -36,6 +36,30 @@ class TestAlbumScraper(helpers.TestBase):
         self.__test_scrape("the_needle_drop_albums_output_without_checkpoint.json")
         self.__test_scrape("the_needle_drop_albums_output_up_to_date.json")
 
+    def test_scrape_checkpoint_on_later_page(self):
+        self._checkpointer.save_checkpoint(
+            "The Needle Drop Albums",
+            "https://www.youtube.com/watch?v=some-old-video"
+        )
+
+        url = "https://www.googleapis.com/youtube/v3/playlistItems?" \
+              "part=snippet&playlistId=PLP4CSgl7K7oo93I49tQa0TLB8qY3u7xuO&maxResults=50"
+        later_page = {"items": [{"snippet": {
+            "title": "Some Artist - Some Album ALBUM REVIEW",
+            "resourceId": {"videoId": "some-old-video"},
+        }}]}
+
+        with requests_mock.Mocker() as req_mock:
+            req_mock.get(url, text=self._load_test_data("the_needle_drop_albums_input.json"))
+            req_mock.get(f"{url}&pageToken=CAUQAA", json=later_page)
+            items = self.__scraper.scrape()
+
+            assert req_mock.call_count == 2
+
+        assert items == self._load_json_test_data(
+            "the_needle_drop_albums_output_without_checkpoint.json"
+        )
+
     def __test_scrape(self, output):
         test_data = self._load_test_data("the_needle_drop_albums_input.json")
 
@@ -1,6 +1,10 @@
 # pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
 
-from unittest.mock import patch
+import json
+import os
+import tempfile
+import time
+from unittest.mock import ANY, MagicMock, patch
 
 import requests_mock
 
@@ -15,9 +19,9 @@ class TestApp(helpers.TestBase):
         from best_new_music_digest import app
         self.__app = app
 
-    @patch("best_new_music_digest.app.send_email")
-    @patch("best_new_music_digest.app.create_playlists")
-    @patch("best_new_music_digest.scrapers.factory.Checkpointer")
+    @patch("best_new_music_digest.email.send_email")
+    @patch("best_new_music_digest.playlist.create_playlists")
+    @patch("best_new_music_digest.checkpoint.Checkpointer")
     def test_run(self, checkpointer, create_playlists, send_email):
         checkpointer.return_value = self._checkpointer
 
@@ -57,7 +61,12 @@ class TestApp(helpers.TestBase):
             self._load_json_test_data("the_needle_drop_tracks_output_without_checkpoint.json"),
         ]
 
-        create_playlists.assert_called_with(digest)
+        create_playlists.assert_called_with(digest,
+                                            None,
+                                            track_ids=None,
+                                            search_cache=ANY,
+                                            deadline=ANY,
+                                            on_track_ids=ANY)
 
         send_email.assert_called_with(
             digest,
@@ -65,3 +74,455 @@ class TestApp(helpers.TestBase):
             "some-albums-playlist-url",
             "some-tracks-playlist-url",
         )
+
+    @patch("best_new_music_digest.email.send_email")
+    @patch("best_new_music_digest.playlist.create_playlists")
+    @patch("best_new_music_digest.dad_joke.get_dad_joke")
+    @patch("best_new_music_digest.scrapers.factory.get_scrapers")
+    def test_run_scraper_timeout(self, get_scrapers, get_dad_joke, create_playlists, send_email):
+        self._settings.SCRAPER_TIMEOUT = 0.1
+
+        def scrape_slowly(deadline):  # pylint: disable=unused-argument
+            time.sleep(0.5)
+            return {"title": "slow", "items": [{}], "errors": False}
+
+        slow_scraper = MagicMock()
+        slow_scraper.get_title.return_value = "slow"
+        slow_scraper.scrape.side_effect = scrape_slowly
+        slow_scraper.get_error_digest_item.return_value = {"title": "slow", "errors": True}
+
+        fast_scraper = MagicMock()
+        fast_scraper.scrape.return_value = {"title": "fast", "items": [], "errors": False}
+
+        get_scrapers.return_value = [slow_scraper, fast_scraper]
+        get_dad_joke.return_value = "some dad joke"
+        create_playlists.return_value = None, None
+
+        self.__app.run(self._checkpointer)
+
+        digest = [
+            {"title": "slow", "errors": True},
+            {"title": "fast", "items": [], "errors": False},
+        ]
+
+        send_email.assert_called_with(digest, "some dad joke", None, None)
+
+    @patch("best_new_music_digest.email.send_email")
+    @patch("best_new_music_digest.playlist.create_playlists")
+    @patch("best_new_music_digest.dad_joke.get_dad_joke")
+    @patch("best_new_music_digest.scrapers.factory.get_scrapers")
+    def test_run_scraper_timeout_keeps_checkpoint(self, get_scrapers, get_dad_joke,
+                                                  create_playlists, send_email):
+        from best_new_music_digest.scrapers.base import Scraper
+
+        self._settings.SCRAPER_TIMEOUT = 0.1
+
+        class SlowScraper(Scraper):
+
+            def __init__(self, checkpointer):
+                super().__init__(checkpointer, "slow", "slow-link", "albums")
+
+            def _get_items(self):
+                self._save_checkpoint("newest")
+                time.sleep(0.3)
+                return [{"artist": "some-artist", "title": "some-title", "link": "newest"}]
+
+        get_scrapers.return_value = [SlowScraper(self._checkpointer)]
+        get_dad_joke.return_value = "some dad joke"
+        create_playlists.return_value = None, None
+
+        self.__app.run(self._checkpointer)
+
+        # Let the timed out scraper finish
+        time.sleep(0.4)
+
+        assert send_email.call_args[0][0][0]["errors"]
+        assert self._checkpointer.get_checkpoint("slow") is None
+
+    @patch("best_new_music_digest.email.send_email")
+    @patch("best_new_music_digest.playlist.create_playlists")
+    @patch("best_new_music_digest.dad_joke.get_dad_joke")
+    @patch("best_new_music_digest.scrapers.factory.get_scrapers")
+    def test_run_deadline(self, get_scrapers, get_dad_joke, create_playlists, send_email):
+        self._settings.RUN_DEADLINE = 30.4
+
+        def scrape_slowly(deadline):  # pylint: disable=unused-argument
+            time.sleep(0.5)
+            return {"title": "slow", "items": [{}], "errors": False}
+
+        slow_scraper = MagicMock()
+        slow_scraper.get_title.return_value = "slow"
+        slow_scraper.scrape.side_effect = scrape_slowly
+        slow_scraper.get_error_digest_item.return_value = {"title": "slow", "errors": True}
+
+        get_scrapers.return_value = [slow_scraper]
+        get_dad_joke.return_value = "some dad joke"
+        create_playlists.return_value = None, None
+
+        start = time.monotonic()
+        self.__app.run(self._checkpointer)
+
+        # Scraping gets half of what's left once the email's time is held back
+        assert time.monotonic() - start < 0.5
+        slow_scraper.cancel.assert_called_once()
+
+        # Spotify gets the rest
+        assert 0 < create_playlists.call_args[1]["deadline"].remaining() <= 0.4
+
+        send_email.assert_called_with([{"title": "slow", "errors": True}], "some dad joke", None,
+                                      None)
+
+    @patch("best_new_music_digest.email.send_email")
+    @patch("best_new_music_digest.playlist.create_playlists")
+    @patch("best_new_music_digest.dad_joke.get_dad_joke")
+    @patch("best_new_music_digest.scrapers.factory.get_scrapers")
+    def test_run_commits_checkpoints_once_email_sent(self, get_scrapers, get_dad_joke,
+                                                     create_playlists, send_email):
+        def scrape(deadline):  # pylint: disable=unused-argument
+            self._checkpointer.save_checkpoint("some-title", "some-link")
+            return {"title": "some-title", "items": [{}], "errors": False}
+
+        scraper = MagicMock()
+        scraper.scrape.side_effect = scrape
+
+        get_scrapers.return_value = [scraper]
+        get_dad_joke.return_value = "some dad joke"
+        create_playlists.return_value = None, None
+
+        # The items would be lost if the checkpoint moved on without them being sent
+        send_email.return_value = False
+        self.__app.run(self._checkpointer)
+
+        assert self._checkpointer.get_checkpoint("some-title") is None
+
+        send_email.return_value = True
+        self.__app.run(self._checkpointer)
+
+        self._checkpointer.load_checkpoints()
+        assert self._checkpointer.get_checkpoint("some-title") == "some-link"
+
+    @patch("best_new_music_digest.email.send_email")
+    @patch("best_new_music_digest.playlist.create_playlists")
+    @patch("best_new_music_digest.dad_joke.get_dad_joke")
+    @patch("best_new_music_digest.scrapers.factory.get_scrapers")
+    def test_run_resumes_after_email_fails(self, get_scrapers, get_dad_joke, create_playlists,
+                                           send_email):
+        def scrape(deadline):  # pylint: disable=unused-argument
+            self._checkpointer.save_checkpoint("some-title", "some-link")
+            return {"title": "some-title", "items": [{"link": "some-link"}], "errors": False}
+
+        scraper = MagicMock()
+        scraper.scrape.side_effect = scrape
+
+        get_scrapers.return_value = [scraper]
+        get_dad_joke.return_value = "some dad joke"
+        create_playlists.return_value = "some-albums-url", "some-tracks-url"
+
+        send_email.return_value = False
+        self.__app.run(self._checkpointer)
+
+        run_id = self._checkpointer.get_latest_journal()["run_id"]
+
+        send_email.return_value = True
+
+        with patch("builtins.print") as print_:
+            self.__app.run(self._checkpointer)
+
+        print_.assert_any_call(f"Resuming run {run_id}")
+
+        # Nothing is scraped, fetched or created again
+        scraper.scrape.assert_called_once()
+        get_dad_joke.assert_called_once()
+        create_playlists.assert_called_once()
+
+        digest = [{"title": "some-title", "items": [{"link": "some-link"}], "errors": False}]
+        assert send_email.call_args_list[0] == send_email.call_args_list[1]
+        send_email.assert_called_with(digest, "some dad joke", "some-albums-url", "some-tracks-url")
+
+        self._checkpointer.load_checkpoints()
+        assert self._checkpointer.get_checkpoint("some-title") == "some-link"
+        assert self._checkpointer.get_latest_journal() is None
+
+    @patch("best_new_music_digest.email.send_email")
+    @patch("best_new_music_digest.playlist.create_playlists")
+    @patch("best_new_music_digest.dad_joke.get_dad_joke")
+    @patch("best_new_music_digest.scrapers.factory.get_scrapers")
+    def test_run_resumes_with_track_ids(self, get_scrapers, get_dad_joke, create_playlists,
+                                        send_email):
+        scraper = MagicMock()
+        scraper.scrape.return_value = {"title": "some-title", "items": [{}], "errors": False}
+
+        get_scrapers.return_value = [scraper]
+        get_dad_joke.return_value = "some dad joke"
+
+        def create_playlists_and_die(*_, on_track_ids, **_kwargs):
+            on_track_ids([["some-track-id"]])
+            raise KeyboardInterrupt()
+
+        create_playlists.side_effect = create_playlists_and_die
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.__app.run(self._checkpointer)
+
+        create_playlists.side_effect = None
+        create_playlists.return_value = "some-albums-url", None
+        self.__app.run(self._checkpointer)
+
+        scraper.scrape.assert_called_once()
+        assert create_playlists.call_args[1]["track_ids"] == [["some-track-id"]]
+        send_email.assert_called_once()
+
+    @patch("best_new_music_digest.email.send_email")
+    @patch("best_new_music_digest.playlist.create_playlists")
+    @patch("best_new_music_digest.dad_joke.get_dad_joke")
+    @patch("best_new_music_digest.scrapers.factory.get_scrapers")
+    def test_run_not_resumed_when_disabled(self, get_scrapers, get_dad_joke, create_playlists,
+                                           send_email):
+        self._settings.RUN_JOURNAL_MAX_AGE = 0
+
+        scraper = MagicMock()
+        scraper.scrape.return_value = {"title": "some-title", "items": [{}], "errors": False}
+
+        get_scrapers.return_value = [scraper]
+        get_dad_joke.return_value = "some dad joke"
+        create_playlists.return_value = None, None
+        send_email.return_value = False
+
+        self.__app.run(self._checkpointer)
+        self.__app.run(self._checkpointer)
+
+        assert scraper.scrape.call_count == 2
+        assert self._checkpointer.get_latest_journal() is None
+
+    @patch("best_new_music_digest.email.send_email")
+    @patch("best_new_music_digest.pipeline.run")
+    @patch("best_new_music_digest.scrapers.factory.get_scrapers")
+    def test_run_streaming_pipeline(self, get_scrapers, pipeline_run, send_email):
+        self._settings.STREAMING_PIPELINE = True
+
+        digest = [{"title": "some-title", "items": [], "errors": False}]
+
+        pipeline_run.return_value = digest, "some dad joke", "some-albums-url", "some-tracks-url"
+
+        self.__app.run(self._checkpointer)
+
+        pipeline_run.assert_called_with(get_scrapers(), None, ANY, ANY, on_track_ids=ANY)
+        send_email.assert_called_with(digest, "some dad joke", "some-albums-url", "some-tracks-url")
+
+    @patch("best_new_music_digest.email.send_email")
+    @patch("best_new_music_digest.playlist.create_playlists")
+    @patch("best_new_music_digest.pipeline.run")
+    @patch("best_new_music_digest.scrapers.factory.get_scrapers")
+    def test_run_streaming_pipeline_playlists_failed(self, _, pipeline_run, create_playlists,
+                                                     send_email):
+        self._settings.STREAMING_PIPELINE = True
+
+        digest = [{"title": "some-title", "items": [{}], "type": "tracks", "errors": False}]
+
+        def run_pipeline(*_, on_track_ids=None):
+            on_track_ids([["some-track-id"]])
+            return digest, "some dad joke", None, None
+
+        pipeline_run.side_effect = run_pipeline
+        create_playlists.return_value = None, "some-tracks-url"
+
+        self.__app.run(self._checkpointer)
+
+        # Only the playlists are tried again, with the track IDs the pipeline found
+        create_playlists.assert_called_once()
+        assert create_playlists.call_args[1]["track_ids"] == [["some-track-id"]]
+        send_email.assert_called_with(digest, "some dad joke", None, "some-tracks-url")
+
+    @patch("best_new_music_digest.email.send_email")
+    @patch("best_new_music_digest.playlist.create_playlists")
+    @patch("best_new_music_digest.pipeline.run")
+    @patch("best_new_music_digest.scrapers.factory.get_scrapers")
+    def test_run_streaming_pipeline_out_of_time(self, _, pipeline_run, create_playlists,
+                                                send_email):
+        self._settings.STREAMING_PIPELINE = True
+        # Less than the time held back for the email, so the pipeline's deadline has passed
+        self._settings.RUN_DEADLINE = 1
+
+        digest = [{"title": "some-title", "items": [{}], "type": "tracks", "errors": False}]
+
+        pipeline_run.return_value = digest, "some dad joke", None, None
+
+        self.__app.run(self._checkpointer)
+
+        # Spotify isn't searched again after the pipeline has run out of time
+        create_playlists.assert_not_called()
+        send_email.assert_called_with(digest, "some dad joke", None, None)
+
+    @patch("best_new_music_digest.email.send_email")
+    @patch("best_new_music_digest.playlist.create_playlists")
+    @patch("best_new_music_digest.dad_joke.get_dad_joke")
+    @patch("best_new_music_digest.scrapers.factory.get_scrapers")
+    def test_run_saves_report_and_metrics(self, get_scrapers, get_dad_joke, create_playlists,
+                                          send_email):
+        scraper = MagicMock()
+        scraper.scrape.return_value = {"title": "some-title", "items": [], "errors": False}
+
+        get_scrapers.return_value = [scraper]
+        get_dad_joke.return_value = "some dad joke"
+        create_playlists.return_value = None, None
+        send_email.side_effect = self._raise_exception
+
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as report_file:
+            pass
+
+        with tempfile.NamedTemporaryFile(suffix=".prom", delete=False) as metrics_file:
+            pass
+
+        self._settings.RUN_REPORT_FILE = report_file.name
+        self._settings.RUN_REPORT_MONGODB = True
+        self._settings.METRICS_TEXTFILE = metrics_file.name
+
+        checkpointer = MagicMock(wraps=self._checkpointer)
+
+        try:
+            with self.assertRaises(Exception):
+                self.__app.run(checkpointer)
+
+            with open(report_file.name, encoding="utf-8") as report_file:
+                run_report = json.load(report_file)
+
+            with open(metrics_file.name, encoding="utf-8") as metrics_file:
+                metrics = metrics_file.read()
+        finally:
+            os.remove(report_file.name)
+            os.remove(metrics_file.name)
+
+        assert 'bnmd_runs_total{result="failure"}' in metrics
+        assert 'bnmd_stage_duration_seconds_count{stage="scrape"}' in metrics
+
+        # The report is still saved when the run fails
+        assert list(run_report["stages"]) == ["checkpoint", "scrape"]
+        assert run_report["duration"] >= run_report["stages"]["scrape"]["duration"]
+
+        checkpointer.save_run_report.assert_called_once_with(run_report)
+
+    @patch("best_new_music_digest.email.send_email")
+    @patch("best_new_music_digest.playlist.create_playlists")
+    @patch("best_new_music_digest.playlist.get_spotify")
+    @patch("best_new_music_digest.dad_joke.get_dad_joke")
+    @patch("best_new_music_digest.scrapers.factory.get_scrapers")
+    def test_run_profiles(self, get_scrapers, get_dad_joke, get_spotify, create_playlists,
+                          send_email):
+        albums = self._load_json_test_data("pitchfork_albums_output_without_checkpoint.json")
+        tracks = self._load_json_test_data("pitchfork_tracks_output_without_checkpoint.json")
+
+        albums_scraper = MagicMock()
+        albums_scraper.scrape.return_value = albums
+        tracks_scraper = MagicMock()
+        tracks_scraper.scrape.return_value = tracks
+
+        get_scrapers.return_value = [albums_scraper, tracks_scraper]
+        get_dad_joke.return_value = "some dad joke"
+        get_spotify.side_effect = lambda username: f"{username}-spotify"
+        create_playlists.return_value = "some-albums-playlist-url", "some-tracks-playlist-url"
+
+        self._checkpointer.save_checkpoint(
+            "some-other-name/Pitchfork Tracks",
+            "https://www.pitchfork.com/reviews/tracks/medhane-im-deadass/"
+        )
+
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as profiles_file:
+            json.dump([
+                {
+                    "name": "some-name",
+                    "recipient_emails": ["some-email"],
+                    "sources": ["Pitchfork Albums"],
+                    "spotify_username": "some-username",
+                },
+                {
+                    "name": "some-other-name",
+                    "recipient_emails": ["some-other-email"],
+                    "sources": ["Pitchfork Albums", "Pitchfork Tracks"],
+                },
+            ], profiles_file)
+
+        self._settings.PROFILES_FILE = profiles_file.name
+
+        try:
+            self.__app.run(self._checkpointer)
+        finally:
+            os.remove(profiles_file.name)
+
+        # Every source is scraped once without checkpoints
+        assert get_scrapers.call_args[0][1] == {"Pitchfork Albums", "Pitchfork Tracks"}
+        assert not get_scrapers.call_args[0][0].get_checkpoint("Pitchfork Albums")
+
+        create_playlists.assert_called_once_with([albums],
+                                                 "some-username-spotify",
+                                                 track_ids=None,
+                                                 search_cache=ANY,
+                                                 deadline=ANY,
+                                                 on_track_ids=ANY)
+
+        up_to_date_tracks = self._load_json_test_data("pitchfork_tracks_output_up_to_date.json")
+
+        assert send_email.call_args_list[0][0] == (
+            [albums],
+            "some dad joke",
+            "some-albums-playlist-url",
+            "some-tracks-playlist-url",
+            ["some-email"],
+        )
+
+        assert send_email.call_args_list[1][0] == (
+            [albums, up_to_date_tracks],
+            "some dad joke",
+            None,
+            None,
+            ["some-other-email"],
+        )
+
+    @patch("best_new_music_digest.email.send_email")
+    @patch("best_new_music_digest.dad_joke.get_dad_joke")
+    @patch("best_new_music_digest.scrapers.factory.get_scrapers")
+    def test_run_profiles_resumed(self, get_scrapers, get_dad_joke, send_email):
+        albums = self._load_json_test_data("pitchfork_albums_output_without_checkpoint.json")
+
+        albums_scraper = MagicMock()
+        albums_scraper.scrape.return_value = albums
+
+        get_scrapers.return_value = [albums_scraper]
+        get_dad_joke.return_value = "some dad joke"
+        send_email.side_effect = [True, False, True]
+
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as profiles_file:
+            json.dump([
+                {
+                    "name": "some-name",
+                    "recipient_emails": ["some-email"],
+                    "sources": ["Pitchfork Albums"],
+                },
+                {
+                    "name": "some-other-name",
+                    "recipient_emails": ["some-other-email"],
+                    "sources": ["Pitchfork Albums"],
+                },
+            ], profiles_file)
+
+        self._settings.PROFILES_FILE = profiles_file.name
+
+        try:
+            self.__app.run(self._checkpointer)
+            self.__app.run(self._checkpointer)
+        finally:
+            os.remove(profiles_file.name)
+
+        albums_scraper.scrape.assert_called_once()
+
+        # The profile that was sent to isn't sent to again
+        assert [call[0][4] for call in send_email.call_args_list] == [
+            ["some-email"],
+            ["some-other-email"],
+            ["some-other-email"],
+        ]
+        assert send_email.call_args_list[2][0][0] == [albums]
+
+        self._checkpointer.load_checkpoints()
+        assert self._checkpointer.get_checkpoint("some-name/Pitchfork Albums")
+        assert self._checkpointer.get_checkpoint("some-other-name/Pitchfork Albums")
+        assert self._checkpointer.get_latest_journal() is None
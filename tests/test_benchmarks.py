@@ -0,0 +1,104 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+import mongomock
+
+from tests import helpers
+
+
+class TestBenchmarks(helpers.TestBase):
+
+    def test_benchmarks(self):
+        from benchmarks import matching, parsers, playlists, runner, storage
+
+        benchmarks = [
+            *parsers.get_benchmarks(),
+            *matching.get_benchmarks(sizes=(10,)),
+            *playlists.get_benchmarks(sizes=(10,)),
+            *storage.get_benchmarks(),
+        ]
+
+        results = runner.run_benchmarks(benchmarks, repeat=2, min_time=0)
+
+        assert list(results["benchmarks"]) == [
+            "parse/pitchfork/AlbumScraper",
+            "parse/pitchfork/TrackScraper",
+            "parse/sputnikmusic/AlbumScraper",
+            "parse/the_needle_drop/AlbumScraper",
+            "parse/the_needle_drop/TrackScraper",
+            "similar_enough/10",
+            "create_playlists/10",
+            "storage/memory/load_checkpoints",
+            "storage/memory/is_seen",
+            "storage/memory/commit",
+            "storage/sqlite/load_checkpoints",
+            "storage/sqlite/is_seen",
+            "storage/sqlite/commit",
+        ]
+
+        for result in results["benchmarks"].values():
+            assert 0 < result["min"] <= result["median"]
+            assert result["repeat"] == 2
+
+    def test_benchmarks_parse_all_items(self):
+        from benchmarks import parsers
+
+        for name, benchmark in parsers.get_benchmarks():
+            assert benchmark(), name
+
+    def test_benchmarks_create_playlists(self):
+        from benchmarks import playlists
+
+        _, benchmark = playlists.get_benchmarks(sizes=(100,))[0]
+
+        assert benchmark() == ("benchmark-playlist-url", "benchmark-playlist-url")
+
+    def test_benchmarks_storage(self):
+        from benchmarks import storage
+
+        with patch("pymongo.MongoClient", return_value=mongomock.MongoClient()):
+            benchmarks = dict(storage.get_benchmarks("mongodb://some-mongodb-host"))
+
+        for backend in ("memory", "sqlite", "mongodb"):
+            assert len(benchmarks[f"storage/{backend}/load_checkpoints"]()) == 50
+            assert benchmarks[f"storage/{backend}/is_seen"]() == (True, False)
+
+            benchmarks[f"storage/{backend}/commit"]()
+
+    def test_compare(self):
+        from benchmarks import runner
+
+        baseline = {"benchmarks": {"fast": {"median": 1}, "slow": {"median": 1}}}
+        results = {"benchmarks": {"fast": {"median": 1.1}, "slow": {"median": 1.3}, "new": {}}}
+
+        assert runner.compare(results, baseline, 0.2) == ["slow"]
+
+    def test_main(self):
+        from benchmarks.__main__ import main
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "results.json")
+            args = ["--filter", "parse/pitchfork", "--repeat", "1", "--min-time", "0"]
+
+            assert main([*args, "--output", output]) == 0
+
+            with open(output, encoding="utf-8") as output_file:
+                results = json.load(output_file)
+
+            assert list(results["benchmarks"]) == [
+                "parse/pitchfork/AlbumScraper",
+                "parse/pitchfork/TrackScraper",
+            ]
+
+            # Make the baseline impossibly fast so that everything has regressed
+            for result in results["benchmarks"].values():
+                result["median"] /= 1000
+
+            with open(output, "w", encoding="utf-8") as output_file:
+                json.dump(results, output_file)
+
+            assert main([*args, "--baseline", output]) == 1
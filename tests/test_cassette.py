@@ -0,0 +1,191 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+import json
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+from tests import helpers
+
+
+class TestCassette(helpers.TestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        from best_new_music_digest import cassette, http
+        self.__cassette = cassette
+        self.__http = http
+
+        self.__directory = tempfile.mkdtemp()
+        self._settings.HTTP_CASSETTE_DIR = self.__directory
+
+    def tearDown(self):
+        super().tearDown()
+
+        self.__cassette.reset()
+        shutil.rmtree(self.__directory)
+
+    def test_record_and_replay(self):
+        self.__use_cassette("record")
+
+        with patch.object(HTTPAdapter, "send", side_effect=self.__respond):
+            session = self.__http.create_session()
+            session.get("https://some-host/some-path?part=snippet&key=some-secret-key")
+            session.post("https://some-other-host/", data=b"\x00\xff")
+
+        assert sorted(os.listdir(self.__directory)) == [
+            "exchange-00001-get-some-host.json",
+            "exchange-00002-post-some-other-host.json",
+        ]
+
+        with open(os.path.join(self.__directory, "exchange-00001-get-some-host.json"),
+                  encoding="utf-8") as exchange_file:
+            exchange = json.load(exchange_file)
+
+        # Credentials aren't recorded
+        assert exchange["request"]["url"] == "https://some-host/some-path?part=snippet"
+        assert "some-secret-key" not in json.dumps(exchange)
+
+        self.__use_cassette("replay", latency=50)
+
+        session = self.__http.create_session(max_retries=3)
+
+        start = time.monotonic()
+        response = session.get("https://some-host/some-path?part=snippet&key=some-other-key")
+        assert time.monotonic() - start >= 0.05
+
+        assert response.status_code == 200
+        assert response.text == "some-body for GET https://some-host/some-path"
+        assert response.headers["Content-Type"] == "text/plain; charset=utf-8"
+        assert "Set-Cookie" not in response.headers
+
+        response = session.post("https://some-other-host/", data=b"\x00\xff")
+        assert response.content == b"\x00\xff"
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            session.get("https://some-host/some-other-path")
+
+    def test_record_redacts_tokens(self):
+        self.__use_cassette("record")
+
+        def respond(request, *_, **__):
+            response = requests.Response()
+            response.status_code = 200
+            response.url = request.url
+            response._content = json.dumps({  # pylint: disable=protected-access
+                "access_token": "some-access-token",
+                "refresh_token": "some-refresh-token",
+                "expires_in": 3600,
+            }).encode("utf-8")
+            return response
+
+        with patch.object(HTTPAdapter, "send", side_effect=respond):
+            session = self.__http.create_session()
+            token = session.post("https://accounts.spotify.com/api/token").json()
+
+        # The live response is left alone
+        assert token["access_token"] == "some-access-token"
+
+        with open(os.path.join(self.__directory, "exchange-00001-post-accounts.spotify.com.json"),
+                  encoding="utf-8") as exchange_file:
+            recorded = exchange_file.read()
+
+        assert "some-access-token" not in recorded
+        assert "some-refresh-token" not in recorded
+
+        self.__use_cassette("replay")
+
+        session = self.__http.create_session()
+
+        assert session.post("https://accounts.spotify.com/api/token").json() == {
+            "access_token": "redacted",
+            "refresh_token": "redacted",
+            "expires_in": 3600,
+        }
+
+    def test_replay_repeated_requests_in_order(self):
+        self.__use_cassette("record")
+
+        with patch.object(HTTPAdapter, "send", side_effect=self.__respond):
+            session = self.__http.create_session()
+            session.post("https://some-host/", data="first")
+            session.post("https://some-host/", data="second")
+
+        self.__use_cassette("replay")
+
+        session = self.__http.create_session()
+
+        # Matched on body first, then in recorded order, with the last response repeated
+        assert session.post("https://some-host/", data="second").text == "second"
+        assert session.post("https://some-host/", data="other").text == "first"
+        assert session.post("https://some-host/", data="other").text == "first"
+
+    def test_sendgrid(self):
+        self.__use_cassette("record")
+
+        message = MagicMock()
+        message.get.return_value = {"some": "message"}
+
+        client = MagicMock()
+        client.send.return_value.status_code = 202
+        client.send.return_value.headers = {"X-Message-Id": "some-id"}
+        client.send.return_value.body = b""
+
+        http_cassette = self.__cassette.get_cassette()
+        assert http_cassette.send_sendgrid(client, message) is client.send.return_value
+
+        self.__use_cassette("replay")
+
+        response = self.__cassette.get_cassette().send_sendgrid(client, message)
+
+        client.send.assert_called_once()
+        assert response.status_code == 202
+        assert response.headers == {"X-Message-Id": "some-id"}
+        assert response.body == b""
+
+    def test_replay_without_recordings(self):
+        with pytest.raises(Exception) as exception:
+            self.__use_cassette("replay")
+
+        assert str(exception.value) == f"No recorded HTTP exchanges in {self.__directory}."
+
+    def test_invalid_mode(self):
+        with pytest.raises(Exception) as exception:
+            self.__cassette.Cassette(self.__directory, "some-mode")
+
+        assert str(exception.value) == "Invalid HTTP cassette mode: some-mode."
+
+    def test_no_cassette(self):
+        assert self.__cassette.get_cassette() is None
+
+    def __use_cassette(self, mode, latency=0):
+        self._settings.HTTP_CASSETTE_MODE = mode
+        self._settings.HTTP_CASSETTE_LATENCY = latency
+        self.__cassette.reset()
+        self.__cassette.get_cassette()
+
+    @staticmethod
+    def __respond(request, *_, **__):
+        response = requests.Response()
+        response.status_code = 200
+        response.url = request.url
+        response.request = request
+        response.headers["Content-Type"] = "text/plain; charset=utf-8"
+        response.headers["Set-Cookie"] = "some-cookie"
+
+        if isinstance(request.body, str):
+            content = request.body.encode("utf-8")
+        else:
+            content = request.body or f"some-body for {request.method} " \
+                                      f"{request.url.split('?')[0]}".encode("utf-8")
+
+        response._content = content  # pylint: disable=protected-access
+
+        return response
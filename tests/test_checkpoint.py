@@ -1,4 +1,9 @@
-# pylint: disable=missing-class-docstring, missing-function-docstring, missing-module-docstring
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+import time
+from unittest.mock import patch
+
+import mongomock
 
 from tests import helpers
 
@@ -11,3 +16,242 @@ class TestCheckpointer(helpers.TestBase):
     def test_get_checkpoint_old(self):
         self._checkpointer.save_checkpoint("checkpoint-2", "some-link")
         assert self._checkpointer.get_checkpoint("checkpoint-2") == "some-link"
+
+    def test_get_validators_new(self):
+        assert self._checkpointer.get_validators("some-url") is None
+
+    def test_get_validators_old(self):
+        validators = {"etag": "some-etag", "last_modified": None, "content_sha256": "some-hash"}
+        self._checkpointer.save_validators("some-url", validators)
+        assert self._checkpointer.get_validators("some-url") == validators
+
+    def test_get_health_new(self):
+        assert self._checkpointer.get_health("some-name") is None
+
+    def test_get_health_old(self):
+        self._checkpointer.save_health("some-name", {"consecutive_failures": 1})
+        self._checkpointer.save_health("some-name", {"consecutive_failures": 2})
+        assert self._checkpointer.get_health("some-name") == {"consecutive_failures": 2}
+
+    def test_get_seen_new(self):
+        assert self._checkpointer.get_seen("some-name") == []
+
+    def test_save_seen(self):
+        self._checkpointer.save_seen("some-name", {"a - b": "some-link", "c - d": None})
+        self._checkpointer.save_seen("some-name", {"a - b": "some-new-link"})
+        self._checkpointer.save_seen("some-other-name", {"e - f": "some-other-link"})
+        self._checkpointer.save_seen("some-name", {})
+
+        seen = sorted(self._checkpointer.get_seen("some-name"), key=lambda item: item["key"])
+        assert seen == [{"key": "a - b", "link": "some-new-link"}, {"key": "c - d", "link": None}]
+
+    def test_is_seen(self):
+        self._checkpointer.save_seen("some-name", {"a - b": "some-link"})
+
+        assert self._checkpointer.is_seen("some-name", "a - b")
+        assert self._checkpointer.is_seen("some-name", "x - y", "some-link")
+        assert not self._checkpointer.is_seen("some-name", "x - y")
+        assert not self._checkpointer.is_seen("some-name", "x - y", "some-other-link")
+        assert not self._checkpointer.is_seen("some-other-name", "a - b", "some-link")
+
+    def test_seen_indexed_lazily(self):
+        from best_new_music_digest.checkpoint import Checkpointer
+
+        client = mongomock.MongoClient()
+
+        with patch("pymongo.MongoClient", return_value=client):
+            checkpointer = Checkpointer()
+
+        seen = client["best-new-music-digest"].seen
+        assert "name_1_key_1" not in seen.index_information()
+
+        checkpointer.get_seen("some-name")
+        assert seen.index_information()["name_1_key_1"]["unique"]
+
+    def test_commit(self):
+        checkpointer, client = self.__create_checkpointer()
+        database = client["best-new-music-digest"]
+
+        checkpointer.save_checkpoint("some-name", "some-link")
+        checkpointer.save_validators("some-url", {"etag": "some-etag"})
+        checkpointer.save_seen("some-name", {"a - b": "some-link"})
+
+        # Nothing is saved until it's committed
+        assert database.checkpoints.count_documents({}) == 0
+        assert database.validators.count_documents({}) == 0
+        assert database.seen.count_documents({}) == 0
+
+        checkpointer.commit()
+
+        assert database.checkpoints.find_one({}, {"_id": False}) == {
+            "name": "some-name",
+            "link": "some-link",
+        }
+        assert database.validators.find_one({}, {"_id": False}) == {
+            "url": "some-url",
+            "etag": "some-etag",
+        }
+        assert checkpointer.get_seen("some-name") == [{"key": "a - b", "link": "some-link"}]
+
+        checkpointer.save_checkpoint("some-name", "some-new-link")
+        checkpointer.commit()
+
+        assert database.checkpoints.count_documents({}) == 1
+        assert checkpointer.get_checkpoint("some-name") == "some-new-link"
+
+    def test_commit_nothing_staged(self):
+        checkpointer, client = self.__create_checkpointer()
+        collection_names = client["best-new-music-digest"].list_collection_names()
+
+        checkpointer.commit()
+
+        assert client["best-new-music-digest"].list_collection_names() == collection_names
+
+    def test_discard(self):
+        checkpointer, client = self.__create_checkpointer()
+
+        checkpointer.save_checkpoint("some-name", "some-link")
+        checkpointer.save_validators("some-url", {"etag": "some-etag"})
+        checkpointer.save_seen("some-name", {"a - b": "some-link"})
+        checkpointer.discard()
+        checkpointer.commit()
+
+        assert checkpointer.get_checkpoint("some-name") is None
+        assert checkpointer.get_validators("some-url") is None
+        assert not checkpointer.is_seen("some-name", "a - b", "some-link")
+        assert client["best-new-music-digest"].checkpoints.count_documents({}) == 0
+
+    def test_stage(self):
+        checkpointer, client = self.__create_checkpointer()
+
+        self._checkpointer.save_checkpoint("some-name", "some-link")
+        self._checkpointer.save_validators("some-url", {"etag": "some-etag"})
+        self._checkpointer.save_seen("some-name", {"a - b": "some-link"})
+
+        staged = self._checkpointer.get_staged()
+
+        assert staged == {
+            "checkpoints": {"some-name": "some-link"},
+            "validators": {"some-url": {"etag": "some-etag"}},
+            "seen": {"some-name": {"a - b": "some-link"}},
+        }
+
+        checkpointer.stage(staged)
+
+        assert client["best-new-music-digest"].checkpoints.count_documents({}) == 0
+
+        checkpointer.commit()
+
+        assert checkpointer.get_staged() == {"checkpoints": {}, "validators": {}, "seen": {}}
+        assert client["best-new-music-digest"].checkpoints.count_documents({}) == 1
+        assert checkpointer.get_validators("some-url") == {"etag": "some-etag"}
+        assert checkpointer.is_seen("some-name", "a - b")
+
+    def test_journals(self):
+        assert self._checkpointer.get_latest_journal() is None
+
+        journal = {"run_id": "some-run-id", "started": 1.5, "stages": {"scrape": {"digest": []}}}
+        self._checkpointer.save_journal(journal)
+
+        assert self._checkpointer.get_latest_journal() == journal
+
+        self._checkpointer.delete_journal("some-run-id")
+
+        assert self._checkpointer.get_latest_journal() is None
+
+    def test_search_results(self):
+        assert self._checkpointer.get_search_result("some-key") is None
+
+        self._checkpointer.save_search_result("some-key", "some-track-id", time.time() + 60)
+
+        assert self._checkpointer.get_search_result("some-key")["result"] == "some-track-id"
+
+    def test_load_checkpoints(self):
+        checkpointer, client = self.__create_checkpointer()
+        checkpoints = client["best-new-music-digest"].checkpoints
+        checkpoints.insert_many([
+            {"name": "some-name", "link": "some-link"},
+            {"name": "some-other-name", "link": "some-other-link"},
+        ])
+
+        with patch.object(checkpoints, "find", wraps=checkpoints.find) as find, \
+                patch.object(checkpoints, "find_one") as find_one:
+            assert checkpointer.get_checkpoint("some-name") == "some-link"
+            assert checkpointer.get_checkpoint("some-other-name") == "some-other-link"
+            assert checkpointer.get_checkpoint("some-new-name") is None
+
+        # Every checkpoint is loaded with one query
+        find.assert_called_once()
+        find_one.assert_not_called()
+
+        # Until they're loaded again
+        checkpoints.delete_many({"name": "some-name"})
+        assert checkpointer.get_checkpoint("some-name") == "some-link"
+
+        checkpointer.load_checkpoints()
+        assert checkpointer.get_checkpoint("some-name") is None
+
+    def test_checkpoints_indexed_lazily(self):
+        checkpointer, client = self.__create_checkpointer()
+        checkpoints = client["best-new-music-digest"].checkpoints
+
+        assert "name_1" not in checkpoints.index_information()
+
+        checkpointer.load_checkpoints()
+        assert checkpoints.index_information()["name_1"]["unique"]
+
+    def test_save_run_report(self):
+        from best_new_music_digest.checkpoint import Checkpointer
+
+        client = mongomock.MongoClient()
+
+        with patch("pymongo.MongoClient", return_value=client):
+            checkpointer = Checkpointer()
+
+        run_report = {"duration": 1.5}
+        checkpointer.save_run_report(run_report)
+
+        saved = client["best-new-music-digest"].run_reports.find_one({}, {"_id": False})
+        assert saved == run_report
+        assert "_id" not in run_report
+
+    def test_close(self):
+        self._checkpointer.close()
+
+    @staticmethod
+    def __create_checkpointer():
+        from best_new_music_digest.checkpoint import Checkpointer
+
+        client = mongomock.MongoClient()
+
+        with patch("pymongo.MongoClient", return_value=client):
+            return Checkpointer(), client
+
+
+class TestNullCheckpointer(helpers.TestBase):
+
+    def test_get_checkpoint(self):
+        from best_new_music_digest.checkpoint import NullCheckpointer
+
+        checkpointer = NullCheckpointer()
+        checkpointer.save_checkpoint("checkpoint-1", "some-link")
+        checkpointer.save_run_report({"duration": 1.5})
+        checkpointer.save_validators("some-url", {"etag": "some-etag"})
+        assert not checkpointer.get_validators("some-url")
+        assert not checkpointer.get_checkpoint("checkpoint-1")
+        checkpointer.save_health("checkpoint-1", {"consecutive_failures": 1})
+        assert checkpointer.get_health("checkpoint-1") is None
+        checkpointer.save_seen("checkpoint-1", {"a - b": "some-link"})
+        assert checkpointer.get_seen("checkpoint-1") == []
+        assert not checkpointer.is_seen("checkpoint-1", "a - b", "some-link")
+        checkpointer.load_checkpoints()
+        checkpointer.commit()
+        checkpointer.discard()
+        checkpointer.stage(checkpointer.get_staged())
+        assert checkpointer.get_staged() == {"checkpoints": {}, "validators": {}, "seen": {}}
+        checkpointer.save_journal({"run_id": "some-run-id", "started": 1.5, "stages": {}})
+        assert checkpointer.get_latest_journal() is None
+        checkpointer.delete_journal("some-run-id")
+        checkpointer.save_search_result("some-key", "some-track-id", 1.5)
+        assert checkpointer.get_search_result("some-key") is None
+        checkpointer.close()
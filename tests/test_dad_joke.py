@@ -1,7 +1,10 @@
 # pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
 
+from unittest.mock import MagicMock
+
 import requests_mock
 
+from best_new_music_digest.deadline import Deadline
 from tests import helpers
 
 
@@ -24,6 +27,33 @@ class TestDadJoke(helpers.TestBase):
 
         assert joke == "some-joke"
 
+    def test_get_dad_joke_with_session(self):
+        session = MagicMock()
+        session.get.return_value.json.return_value = {"joke": "some-joke"}
+
+        assert self.__dad_joke.get_dad_joke(session) == "some-joke"
+
+        session.get.assert_called_once_with("https://icanhazdadjoke.com/",
+                                            headers={"Accept": "application/json"})
+
+    def test_get_dad_joke_deadline(self):
+        session = MagicMock()
+        session.get.return_value.json.return_value = {"joke": "some-joke"}
+
+        assert self.__dad_joke.get_dad_joke(session, Deadline(10)) == "some-joke"
+
+        connect_timeout, read_timeout = session.get.call_args[1]["timeout"]
+        assert connect_timeout <= 5
+        assert 9 < read_timeout <= 10
+
+    def test_get_dad_joke_deadline_passed(self):
+        session = MagicMock()
+
+        joke = self.__dad_joke.get_dad_joke(session, Deadline(0))
+
+        assert joke == "It would seem that I've run out of dad jokes. I hope you're happy now 😞."
+        session.get.assert_not_called()
+
     def test_get_dad_joke_error(self):
         with requests_mock.Mocker() as req_mock:
             req_mock.get("https://icanhazdadjoke.com/",
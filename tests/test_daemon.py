@@ -0,0 +1,92 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+import os
+import signal
+from unittest.mock import patch
+
+from tests import helpers
+
+
+@patch("best_new_music_digest.daemon.http.close_session")
+@patch("best_new_music_digest.daemon.get_spotify")
+@patch("best_new_music_digest.daemon.Checkpointer")
+@patch("best_new_music_digest.daemon.app.run")
+class TestDaemon(helpers.TestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        from best_new_music_digest.daemon import Daemon
+        self.__daemon = Daemon("* * * * *")
+
+    @patch("best_new_music_digest.daemon.CronSchedule.next_after")
+    def test_start_reuses_connections(self, next_after, run, checkpointer, get_spotify,
+                                      close_session):
+        next_after.side_effect = lambda after: after
+
+        def run_twice(*_):
+            if run.call_count == 2:
+                self.__daemon.stop()
+
+        run.side_effect = run_twice
+
+        self.__daemon.start()
+
+        assert run.call_count == 2
+        checkpointer.assert_called_once()
+        get_spotify.assert_called_once()
+        first_run, second_run = run.call_args_list
+        assert first_run.args == (checkpointer.return_value, get_spotify.return_value, None)
+
+        # Later runs are told when the previous one was so that scrapers can keep to their schedules
+        assert second_run.args[:2] == (checkpointer.return_value, get_spotify.return_value)
+        assert second_run.args[2] is not None
+        checkpointer.return_value.close.assert_called_once()
+        close_session.assert_called_once()
+
+    @patch("best_new_music_digest.daemon.CronSchedule.next_after")
+    def test_start_survives_failed_runs(self, next_after, run, *_):
+        next_after.side_effect = lambda after: after
+
+        def fail_then_stop(*_):
+            if run.call_count == 2:
+                self.__daemon.stop()
+            raise Exception()
+
+        run.side_effect = fail_then_stop
+
+        self.__daemon.start()
+
+        assert run.call_count == 2
+
+    @patch("best_new_music_digest.daemon.metrics.serve")
+    def test_start_serves_metrics(self, serve, *_):
+        self._settings.METRICS_PORT = 9100
+
+        self.__daemon.stop()
+        self.__daemon.start()
+
+        serve.assert_called_once_with(9100)
+        serve.return_value.shutdown.assert_called_once()
+
+    def test_start_spotify_disabled(self, run, _, get_spotify, __):
+        self._settings.CREATE_SPOTIFY_PLAYLISTS = False
+
+        self.__daemon.stop()
+        self.__daemon.start()
+
+        get_spotify.assert_not_called()
+        run.assert_not_called()
+
+    @patch("best_new_music_digest.daemon.CronSchedule.next_after")
+    def test_sigterm_stops_daemon(self, next_after, run, *_):
+        next_after.side_effect = lambda after: after
+
+        run.side_effect = lambda *_: os.kill(os.getpid(), signal.SIGTERM)
+
+        previous_handler = signal.getsignal(signal.SIGTERM)
+
+        self.__daemon.start()
+
+        run.assert_called_once()
+        assert signal.getsignal(signal.SIGTERM) == previous_handler
@@ -0,0 +1,65 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+from tests import helpers
+
+
+class TestDeadline(helpers.TestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        from best_new_music_digest.deadline import Deadline
+        self.__deadline = Deadline
+
+        self.__now = 100
+
+    def test_no_deadline(self):
+        deadline = self.__deadline(clock=self.__clock)
+
+        assert deadline.remaining() is None
+        assert not deadline.expired()
+        assert deadline.timeout() is None
+        assert deadline.timeout((5, 30)) == (5, 30)
+        assert deadline.share(0.5, 30).remaining() is None
+
+    def test_remaining(self):
+        deadline = self.__deadline(60, self.__clock)
+
+        assert deadline.remaining() == 60
+
+        self.__now += 45
+
+        assert deadline.remaining() == 15
+        assert not deadline.expired()
+
+    def test_expired(self):
+        deadline = self.__deadline(60, self.__clock)
+
+        self.__now += 90
+
+        assert deadline.remaining() == 0
+        assert deadline.expired()
+
+    def test_timeout(self):
+        deadline = self.__deadline(20, self.__clock)
+
+        assert deadline.timeout() == 20
+        assert deadline.timeout(10) == 10
+        assert deadline.timeout(30) == 20
+        assert deadline.timeout((5, 30)) == (5, 20)
+
+    def test_share(self):
+        deadline = self.__deadline(100, self.__clock)
+
+        self.__now += 10
+
+        assert deadline.share(0.5, 30).remaining() == 30
+        assert deadline.share(1, 30).remaining() == 60
+
+    def test_share_reserve_used_up(self):
+        deadline = self.__deadline(20, self.__clock)
+
+        assert deadline.share(1, 30).expired()
+
+    def __clock(self):
+        return self.__now
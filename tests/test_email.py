@@ -16,7 +16,7 @@ class TestEmail(helpers.TestBase):
         from best_new_music_digest import email
         self.__email = email
 
-    @patch("best_new_music_digest.email.SendGridAPIClient.send")
+    @patch("sendgrid.SendGridAPIClient.send")
     def test_send_email_no_digest_no_errors(self, send):
         digest = [
             {
@@ -31,7 +31,7 @@ class TestEmail(helpers.TestBase):
 
         self.__test_send(send, digest, expect_called=False)
 
-    @patch("best_new_music_digest.email.SendGridAPIClient.send")
+    @patch("sendgrid.SendGridAPIClient.send")
     def test_send_email_no_digest_no_errors_always_send(self, send):
         self._settings.ALWAYS_EMAIL = True
 
@@ -48,7 +48,7 @@ class TestEmail(helpers.TestBase):
 
         self.__test_send(send, digest)
 
-    @patch("best_new_music_digest.email.SendGridAPIClient.send")
+    @patch("sendgrid.SendGridAPIClient.send")
     def test_send_email_no_digest_with_errors(self, send):
         digest = [
             {
@@ -63,7 +63,7 @@ class TestEmail(helpers.TestBase):
 
         self.__test_send(send, digest)
 
-    @patch("best_new_music_digest.email.SendGridAPIClient.send")
+    @patch("sendgrid.SendGridAPIClient.send")
     def test_send_email_digest(self, send):
         digest = [
             self._load_json_test_data("the_needle_drop_albums_output_with_checkpoint.json"),
@@ -72,7 +72,7 @@ class TestEmail(helpers.TestBase):
 
         self.__test_send(send, digest)
 
-    @patch("best_new_music_digest.email.SendGridAPIClient.send")
+    @patch("sendgrid.SendGridAPIClient.send")
     def test_send_email_error(self, send):
         send.side_effect = self._raise_exception
 
@@ -81,7 +81,24 @@ class TestEmail(helpers.TestBase):
             self._load_json_test_data("the_needle_drop_tracks_output_with_checkpoint.json"),
         ]
 
-        self.__email.send_email(digest)
+        assert not self.__email.send_email(digest)
+
+    @patch("sendgrid.SendGridAPIClient.send")
+    def test_send_email_to_recipients(self, send):
+        digest = [
+            self._load_json_test_data("the_needle_drop_albums_output_with_checkpoint.json"),
+        ]
+
+        self.__email.send_email(digest,
+                                recipient_emails=["someone@example.com",
+                                                  "someone-else@example.com"])
+
+        message = send.call_args[0][0]
+
+        assert [to["email"] for to in message.personalizations[0].tos] == [
+            "someone@example.com",
+            "someone-else@example.com",
+        ]
 
     def __test_send(self,
                     send,
@@ -90,7 +107,7 @@ class TestEmail(helpers.TestBase):
                     albums_playlist_url="some-albums-playlist-url",
                     tracks_playlist_url="some-tracks-playlist-url",
                     expect_called=True):
-        self.__email.send_email(digest, dad_joke, albums_playlist_url, tracks_playlist_url)
+        assert self.__email.send_email(digest, dad_joke, albums_playlist_url, tracks_playlist_url)
 
         if not expect_called:
             send.assert_not_called()
@@ -0,0 +1,111 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+from tests import helpers
+
+
+class TestSourceHealth(helpers.TestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        from best_new_music_digest.health import SourceHealth
+        self.__source_health = SourceHealth
+
+    def test_new(self):
+        health = self.__source_health()
+
+        assert health.get_consecutive_failures() == 0
+        assert health.get_last_error() is None
+        assert not health.is_open(3)
+        assert not health.skip(3)
+
+    def test_opens_after_threshold(self):
+        health = self.__source_health()
+
+        for _ in range(2):
+            health.record_failure("some-error", 1, 3)
+
+        assert not health.is_open(3)
+
+        health.record_failure("some-other-error", 1, 3)
+
+        assert health.is_open(3)
+        assert health.get_consecutive_failures() == 3
+        assert health.get_last_error() == "some-other-error"
+
+    def test_skips_between_probes_double(self):
+        health = self.__failing_health(3)
+        skips = []
+
+        for _ in range(4):
+            skipped = 0
+
+            while health.skip(3):
+                skipped += 1
+
+            skips.append(skipped)
+
+            # The probe fails
+            health.record_failure("some-error", 1, 3)
+
+        assert skips == [1, 2, 4, 8]
+
+    def test_skips_capped(self):
+        health = self.__failing_health(30)
+        skipped = 0
+
+        while health.skip(3):
+            skipped += 1
+
+        assert skipped == self.__source_health.MAX_SKIPPED_RUNS
+
+    def test_success_closes(self):
+        health = self.__failing_health(3)
+
+        health.record_success(1)
+
+        assert not health.is_open(3)
+        assert not health.skip(3)
+        assert health.get_consecutive_failures() == 0
+        assert health.get_last_error() == "some-error"
+
+    def test_threshold_disabled(self):
+        health = self.__failing_health(10)
+
+        assert not health.is_open(0)
+        assert not health.skip(0)
+
+    def test_latency_percentiles(self):
+        health = self.__source_health()
+        assert health.get_latency_percentile(50) is None
+
+        for duration in range(1, 31):
+            health.record_success(duration)
+
+        # Only the last 20 are kept
+        assert health.get_latency_percentile(0) == 11
+        assert health.get_latency_percentile(50) == 20
+        assert health.get_latency_percentile(95) == 29
+        assert health.get_latency_percentile(100) == 30
+
+    def test_to_dict(self):
+        health = self.__failing_health(3)
+        state = health.to_dict()
+
+        assert state == {
+            "consecutive_failures": 3,
+            "last_error": "some-error",
+            "skips_left": 1,
+            "durations": [1, 1, 1],
+            "latency_p50": 1,
+            "latency_p95": 1,
+        }
+        assert self.__source_health(state).to_dict() == state
+
+    def __failing_health(self, failures):
+        health = self.__source_health()
+
+        for _ in range(failures):
+            health.record_failure("some-error", 1, 3)
+
+        return health
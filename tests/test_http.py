@@ -0,0 +1,142 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+import requests_mock
+from requests.adapters import HTTPAdapter
+
+from tests import helpers
+
+
+class TestHttp(helpers.TestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        from best_new_music_digest import http
+        self.__http = http
+
+    def tearDown(self):
+        super().tearDown()
+
+        self.__http.close_session()
+
+    def test_get_session_is_shared(self):
+        assert self.__http.get_session() is self.__http.get_session()
+
+    def test_close_session(self):
+        session = self.__http.get_session()
+
+        self.__http.close_session()
+        self.__http.close_session()
+
+        assert self.__http.get_session() is not session
+
+    def test_create_session(self):
+        self._settings.HTTP_CONNECT_TIMEOUT = 2
+        self._settings.HTTP_READ_TIMEOUT = 10
+        self._settings.HTTP_RETRIES = 4
+
+        session = self.__http.create_session()
+        adapter = session.get_adapter("https://some-host/")
+
+        assert adapter is session.get_adapter("http://some-other-host/")
+        assert adapter.max_retries.total == 4
+        assert adapter.max_retries.status_forcelist == (500, 502, 503, 504)
+        assert adapter.max_retries.backoff_factor
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = "https://some-host/"
+        response._content = b""  # pylint: disable=protected-access
+
+        with patch.object(HTTPAdapter, "send", return_value=response) as send:
+            session.get("https://some-host/")
+            assert send.call_args[1]["timeout"] == (2, 10)
+
+            session.get("https://some-host/", timeout=1)
+            assert send.call_args[1]["timeout"] == 1
+
+    def test_create_session_with_retries(self):
+        session = self.__http.create_session(
+            max_retries=self.__http.get_retry(status_forcelist=(429,)),
+        )
+
+        assert session.get_adapter("https://some-host/").max_retries.status_forcelist == (429,)
+
+    def test_requests_are_recorded_in_report(self):
+        from best_new_music_digest import report
+
+        run_report = report.start_report()
+
+        with requests_mock.Mocker() as req_mock:
+            req_mock.get("https://some-host/some-path", text="some-body")
+            req_mock.get("https://some-other-host/", content=b"", headers={"Content-Length": "8"})
+
+            self.__http.get_session().get("https://some-host/some-path")
+            self.__http.get_session().get("https://some-host/some-path")
+            self.__http.create_session(max_retries=2).get("https://some-other-host/", stream=True)
+
+        assert run_report.to_dict()["http"] == {
+            "requests": 3,
+            "bytes": 26,
+            "hosts": [
+                {"host": "some-host", "requests": 2, "bytes": 18},
+                {"host": "some-other-host", "requests": 1, "bytes": 8},
+            ],
+        }
+
+    def test_requests_are_rate_limited(self):
+        from best_new_music_digest import metrics, ratelimit
+
+        ratelimit.reset()
+        limiter = MagicMock()
+
+        session = self.__http.create_session()
+        response = requests.Response()
+        response.status_code = 429
+        response.url = "https://api.spotify.com/v1/search"
+        response.headers["Retry-After"] = "3"
+        response._content = b""  # pylint: disable=protected-access
+
+        with patch.object(ratelimit, "get_limiter", return_value=limiter) as get_limiter:
+            with patch.object(metrics, "inc") as inc:
+                with patch.object(HTTPAdapter, "send", return_value=response):
+                    session.get("https://api.spotify.com/v1/search")
+
+        get_limiter.assert_called_once_with("api.spotify.com")
+        limiter.acquire.assert_called_once()
+        assert limiter.release.call_args[0][1:] == (True, 3)
+        inc.assert_called_once_with("bnmd_http_throttled_total", host="api.spotify.com")
+
+    def test_requests_not_rate_limited(self):
+        self._settings.RATE_LIMITS = {"*": 0}
+
+        from best_new_music_digest import ratelimit
+
+        ratelimit.reset()
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = "https://some-host/"
+        response._content = b"some-body"  # pylint: disable=protected-access
+
+        with patch.object(HTTPAdapter, "send", return_value=response):
+            assert self.__http.create_session().get("https://some-host/").text == "some-body"
+
+        assert ratelimit.get_limiter("some-host") is None
+        ratelimit.reset()
+
+    def test_rate_limit_released_on_error(self):
+        from best_new_music_digest import ratelimit
+
+        limiter = MagicMock()
+
+        with patch.object(ratelimit, "get_limiter", return_value=limiter):
+            with patch.object(HTTPAdapter, "send", side_effect=requests.ConnectionError()):
+                with pytest.raises(requests.ConnectionError):
+                    self.__http.create_session().get("https://some-host/")
+
+        limiter.release.assert_called_once_with()
@@ -0,0 +1,94 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+import time
+from unittest.mock import MagicMock
+
+from tests import helpers
+
+
+class TestJournal(helpers.TestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        from best_new_music_digest import journal
+        self.__journal = journal
+
+    def test_new(self):
+        journal = self.__journal.open_journal(self._checkpointer, 60)
+
+        assert journal.get_run_id()
+        assert not journal.is_resumed()
+        assert not journal.completed("scrape")
+        assert journal.get("scrape") is None
+
+    def test_complete(self):
+        journal = self.__journal.open_journal(self._checkpointer, 60)
+
+        digest = [{"title": "some-title", "items": []}]
+        journal.complete("scrape", digest)
+        digest.append({})
+
+        assert journal.completed("scrape")
+        assert journal.get("scrape") == [{"title": "some-title", "items": []}]
+        assert self._checkpointer.get_latest_journal() == journal.to_dict()
+
+    def test_resume(self):
+        journal = self.__journal.open_journal(self._checkpointer, 60)
+        journal.complete("scrape", [])
+        journal.complete("dad_joke", "some dad joke")
+
+        resumed = self.__journal.open_journal(self._checkpointer, 60)
+
+        assert resumed.is_resumed()
+        assert resumed.get_run_id() == journal.get_run_id()
+        assert resumed.get("scrape") == []
+        assert resumed.get("dad_joke") == "some dad joke"
+        assert not resumed.completed("email")
+
+    def test_finish(self):
+        journal = self.__journal.open_journal(self._checkpointer, 60)
+        journal.complete("scrape", [])
+        journal.finish()
+
+        assert self._checkpointer.get_latest_journal() is None
+        assert not self.__journal.open_journal(self._checkpointer, 60).is_resumed()
+
+    def test_too_old(self):
+        self._checkpointer.save_journal({
+            "run_id": "some-run-id",
+            "started": time.time() - 120,
+            "stages": {"scrape": []},
+        })
+
+        journal = self.__journal.open_journal(self._checkpointer, 60)
+
+        assert not journal.is_resumed()
+        assert journal.get_run_id() != "some-run-id"
+        assert self._checkpointer.get_latest_journal() is None
+
+    def test_disabled(self):
+        self._checkpointer.save_journal({
+            "run_id": "some-run-id",
+            "started": time.time(),
+            "stages": {"scrape": []},
+        })
+
+        journal = self.__journal.open_journal(self._checkpointer, 0)
+        journal.complete("dad_joke", "some dad joke")
+
+        assert not journal.is_resumed()
+        assert self._checkpointer.get_latest_journal()["run_id"] == "some-run-id"
+
+    def test_storage_errors(self):
+        checkpointer = MagicMock()
+        checkpointer.get_latest_journal.side_effect = self._raise_exception
+        checkpointer.save_journal.side_effect = self._raise_exception
+        checkpointer.delete_journal.side_effect = self._raise_exception
+
+        # The run goes on without being able to be resumed
+        journal = self.__journal.open_journal(checkpointer, 60)
+        journal.complete("scrape", [])
+        journal.finish()
+
+        assert journal.get("scrape") == []
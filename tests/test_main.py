@@ -0,0 +1,28 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+from unittest.mock import patch
+
+from tests import helpers
+
+
+class TestMain(helpers.TestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        from best_new_music_digest import __main__
+        self.__main = __main__
+
+    @patch("best_new_music_digest.__main__.app.run")
+    def test_main(self, run):
+        self.__main.main([])
+
+        run.assert_called_once()
+
+    @patch("best_new_music_digest.daemon.Daemon")
+    @patch("best_new_music_digest.__main__.app.run")
+    def test_main_daemon(self, run, daemon):
+        self.__main.main(["--daemon"])
+
+        run.assert_not_called()
+        daemon().start.assert_called_once()
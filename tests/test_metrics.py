@@ -0,0 +1,103 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+import os
+import tempfile
+
+import requests
+
+from tests import helpers
+
+
+class TestMetrics(helpers.TestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        from best_new_music_digest import metrics
+        self.__metrics = metrics
+        self.__metrics.reset()
+
+    def test_render_counters_and_gauges(self):
+        self.__metrics.inc("bnmd_source_items_total", 3, source="Pitchfork Albums")
+        self.__metrics.inc("bnmd_source_items_total", 2, source="Pitchfork Albums")
+        self.__metrics.inc("bnmd_source_errors_total", source='Some "Quoted" Source')
+        self.__metrics.set_gauge("bnmd_last_run_timestamp_seconds", 1577836800)
+
+        assert self.__metrics.render() == (
+            "# HELP bnmd_last_run_timestamp_seconds When the last run finished.\n"
+            "# TYPE bnmd_last_run_timestamp_seconds gauge\n"
+            "bnmd_last_run_timestamp_seconds 1577836800\n"
+            "# HELP bnmd_source_items_total New items found by each source.\n"
+            "# TYPE bnmd_source_items_total counter\n"
+            'bnmd_source_items_total{source="Pitchfork Albums"} 5\n'
+            "# HELP bnmd_source_errors_total Scrapes of each source that failed.\n"
+            "# TYPE bnmd_source_errors_total counter\n"
+            'bnmd_source_errors_total{source="Some \\"Quoted\\" Source"} 1\n'
+        )
+
+    def test_render_histograms(self):
+        self.__metrics.observe("bnmd_stage_duration_seconds", 0.2, stage="email")
+        self.__metrics.observe("bnmd_stage_duration_seconds", 400, stage="email")
+
+        lines = self.__metrics.render().splitlines()
+
+        assert "# TYPE bnmd_stage_duration_seconds histogram" in lines
+        assert 'bnmd_stage_duration_seconds_bucket{stage="email",le="0.1"} 0' in lines
+        assert 'bnmd_stage_duration_seconds_bucket{stage="email",le="0.25"} 1' in lines
+        assert 'bnmd_stage_duration_seconds_bucket{stage="email",le="300"} 1' in lines
+        assert 'bnmd_stage_duration_seconds_bucket{stage="email",le="+Inf"} 2' in lines
+        assert 'bnmd_stage_duration_seconds_sum{stage="email"} 400.2' in lines
+        assert 'bnmd_stage_duration_seconds_count{stage="email"} 2' in lines
+
+    def test_unknown_metric(self):
+        with self.assertRaises(Exception) as context:
+            self.__metrics.inc("some_metric")
+
+        assert str(context.exception) == "Unknown metric: some_metric."
+
+    def test_observe_run(self):
+        self.__metrics.observe_run({
+            "duration": 10,
+            "spans": [{"name": "scrape", "duration": 2}],
+            "http": {"hosts": [{"host": "some-host", "requests": 2, "bytes": 100}]},
+            "quota": {"some-api": 3},
+        }, False)
+
+        rendered = self.__metrics.render()
+
+        assert 'bnmd_runs_total{result="failure"} 1' in rendered
+        assert "bnmd_run_duration_seconds_count 1" in rendered
+        assert 'bnmd_stage_duration_seconds_count{stage="scrape"} 1' in rendered
+        assert 'bnmd_http_requests_total{host="some-host"} 2' in rendered
+        assert 'bnmd_http_response_bytes_total{host="some-host"} 100' in rendered
+        assert 'bnmd_api_quota_units_total{api="some-api"} 3' in rendered
+
+    def test_write_textfile(self):
+        self.__metrics.inc("bnmd_runs_total", result="success")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bnmd.prom")
+            self.__metrics.write_textfile(path)
+
+            assert os.listdir(directory) == ["bnmd.prom"]
+
+            with open(path, encoding="utf-8") as metrics_file:
+                assert metrics_file.read() == self.__metrics.render()
+
+    def test_serve(self):
+        self.__metrics.inc("bnmd_runs_total", result="success")
+
+        server = self.__metrics.serve(0)
+        url = f"http://localhost:{server.server_address[1]}"
+
+        try:
+            response = requests.get(f"{url}/metrics")
+            not_found_response = requests.get(f"{url}/some-path")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert response.text == self.__metrics.render()
+        assert not_found_response.status_code == 404
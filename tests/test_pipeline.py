@@ -0,0 +1,162 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+import time
+from unittest.mock import MagicMock, patch
+
+from best_new_music_digest.deadline import Deadline
+from tests import helpers
+
+
+@patch("best_new_music_digest.pipeline.get_dad_joke")
+@patch("best_new_music_digest.pipeline.create_playlists")
+@patch("best_new_music_digest.pipeline.get_track_ids")
+@patch("best_new_music_digest.pipeline.get_spotify")
+class TestPipeline(helpers.TestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        from best_new_music_digest import pipeline
+        self.__pipeline = pipeline
+
+        self.__slow_digest_item = {"title": "slow", "items": [{"title": "a"}], "type": "albums"}
+        self.__fast_digest_item = {"title": "fast", "items": [{"title": "b"}], "type": "tracks"}
+        self.__empty_digest_item = {"title": "empty", "items": [], "type": "albums"}
+
+        self.__scrapers = [
+            self.__mock_scraper(self.__slow_digest_item, delay=0.2),
+            self.__mock_scraper(self.__fast_digest_item),
+            self.__mock_scraper(self.__empty_digest_item),
+        ]
+
+    def test_run(self, get_spotify, get_track_ids, create_playlists, get_dad_joke):
+        get_track_ids.side_effect = lambda digest_item, *_: [digest_item["title"]]
+        create_playlists.return_value = "some-albums-playlist-url", "some-tracks-playlist-url"
+        get_dad_joke.return_value = "some dad joke"
+
+        response = self.__pipeline.run(self.__scrapers)
+
+        digest = [self.__slow_digest_item, self.__fast_digest_item, self.__empty_digest_item]
+
+        assert response == (
+            digest,
+            "some dad joke",
+            "some-albums-playlist-url",
+            "some-tracks-playlist-url",
+        )
+
+        get_spotify.assert_called_once()
+
+        # The fast scraper's items are searched for first
+        assert [c[0][0] for c in get_track_ids.call_args_list] == [
+            self.__fast_digest_item,
+            self.__slow_digest_item,
+        ]
+
+        create_playlists.assert_called_with(digest, get_spotify(), [["slow"], ["fast"], []])
+
+    def test_run_search_cache(self, _, get_track_ids, create_playlists, get_dad_joke):
+        get_track_ids.return_value = []
+        create_playlists.return_value = None, None
+        get_dad_joke.return_value = "some dad joke"
+
+        search_cache = {}
+        self.__pipeline.run(self.__scrapers, search_cache=search_cache)
+
+        # Every digest item's searches share the same cache
+        assert [c[0][2] for c in get_track_ids.call_args_list] == [search_cache, search_cache]
+        assert all(c[0][2] is search_cache for c in get_track_ids.call_args_list)
+
+    def test_run_on_track_ids(self, _, get_track_ids, create_playlists, get_dad_joke):
+        get_track_ids.side_effect = lambda digest_item, *_: [digest_item["title"]]
+        create_playlists.return_value = None, None
+        get_dad_joke.return_value = "some dad joke"
+
+        on_track_ids = MagicMock()
+        self.__pipeline.run(self.__scrapers, on_track_ids=on_track_ids)
+
+        # Called even when the playlists fail to be created so that they can be tried again
+        on_track_ids.assert_called_once_with([["slow"], ["fast"], []])
+
+    def test_run_scraper_timeout(self, _, get_track_ids, create_playlists, get_dad_joke):
+        self._settings.SCRAPER_TIMEOUT = 0.05
+
+        get_track_ids.return_value = []
+        create_playlists.return_value = None, None
+        get_dad_joke.return_value = "some dad joke"
+
+        digest, _, _, _ = self.__pipeline.run(self.__scrapers)
+
+        assert digest == [
+            {"title": "slow", "items": [], "errors": True},
+            self.__fast_digest_item,
+            self.__empty_digest_item,
+        ]
+
+        self.__scrapers[0].cancel.assert_called_once()
+
+    def test_run_scraper_timeout_too_late_to_cancel(self, _, get_track_ids, create_playlists,
+                                                    get_dad_joke):
+        self._settings.SCRAPER_TIMEOUT = 0.05
+        self.__scrapers[0].cancel.return_value = False
+
+        get_track_ids.return_value = []
+        create_playlists.return_value = None, None
+        get_dad_joke.return_value = "some dad joke"
+
+        digest, _, _, _ = self.__pipeline.run(self.__scrapers)
+
+        assert digest[0] == self.__slow_digest_item
+
+    def test_run_deadline(self, get_spotify, get_track_ids, create_playlists, get_dad_joke):
+        get_track_ids.return_value = []
+        create_playlists.return_value = None, None
+        get_dad_joke.return_value = "some dad joke"
+
+        deadline = Deadline(0.1)
+        digest, _, _, _ = self.__pipeline.run(self.__scrapers, deadline=deadline)
+
+        # The slow scraper takes longer than the scrapers' share of the deadline
+        assert digest[0] == {"title": "slow", "items": [], "errors": True}
+
+        get_track_ids.assert_called_once_with(self.__fast_digest_item, get_spotify(), {},
+                                              deadline)
+        get_dad_joke.assert_called_once_with(None, deadline)
+
+    def test_run_spotify_error(self, get_spotify, get_track_ids, create_playlists, get_dad_joke):
+        get_spotify.side_effect = self._raise_exception
+        get_dad_joke.return_value = "some dad joke"
+
+        on_track_ids = MagicMock()
+        response = self.__pipeline.run(self.__scrapers, on_track_ids=on_track_ids)
+
+        assert response[2:] == (None, None)
+
+        get_track_ids.assert_not_called()
+        create_playlists.assert_not_called()
+        on_track_ids.assert_not_called()
+
+    def test_run_playlists_disabled(self, get_spotify, get_track_ids, create_playlists, _):
+        self._settings.CREATE_SPOTIFY_PLAYLISTS = False
+
+        create_playlists.return_value = None, None
+
+        self.__pipeline.run(self.__scrapers)
+
+        get_spotify.assert_not_called()
+        get_track_ids.assert_not_called()
+        create_playlists.assert_called_once()
+
+    @staticmethod
+    def __mock_scraper(digest_item, delay=0):
+        def scrape(deadline=None):  # pylint: disable=unused-argument
+            time.sleep(delay)
+            return digest_item
+
+        scraper = MagicMock()
+        scraper.get_title.return_value = digest_item["title"]
+        scraper.scrape.side_effect = scrape
+        scraper.get_error_digest_item.return_value = {"title": digest_item["title"],
+                                                      "items": [],
+                                                      "errors": True}
+        return scraper
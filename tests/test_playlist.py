@@ -1,9 +1,12 @@
 # pylint: disable=import-outside-toplevel, invalid-name, missing-class-docstring, missing-function-docstring, missing-module-docstring, redefined-builtin, too-many-return-statements
 
-from unittest.mock import patch
+import threading
+import time
+from unittest.mock import MagicMock, patch
 
 from freezegun import freeze_time
 
+from best_new_music_digest.deadline import Deadline
 from tests import helpers
 
 
@@ -20,8 +23,8 @@ class TestPlaylist(helpers.TestBase):
         self.__playlist_id = "some-playlist-id"
         self.__playlist_url = "some-playlist-url"
 
-    @patch("best_new_music_digest.playlist.SpotifyOAuth")
-    @patch("best_new_music_digest.playlist.spotipy.Spotify")
+    @patch("spotipy.oauth2.SpotifyOAuth")
+    @patch("spotipy.Spotify")
     def test_create_playlists_disabled(self, spotify, _):
         spotify = spotify()
 
@@ -35,8 +38,8 @@ class TestPlaylist(helpers.TestBase):
 
         spotify.user_playlist_create.assert_not_called()
 
-    @patch("best_new_music_digest.playlist.SpotifyOAuth")
-    @patch("best_new_music_digest.playlist.spotipy.Spotify")
+    @patch("spotipy.oauth2.SpotifyOAuth")
+    @patch("spotipy.Spotify")
     def test_create_playlists_no_digest_items(self, spotify, _):
         spotify = spotify()
 
@@ -46,8 +49,8 @@ class TestPlaylist(helpers.TestBase):
 
         spotify.user_playlist_create.assert_not_called()
 
-    @patch("best_new_music_digest.playlist.SpotifyOAuth")
-    @patch("best_new_music_digest.playlist.spotipy.Spotify")
+    @patch("spotipy.oauth2.SpotifyOAuth")
+    @patch("spotipy.Spotify")
     def test_create_playlists_with_albums(self, spotify, _):
         spotify = spotify()
 
@@ -110,12 +113,15 @@ class TestPlaylist(helpers.TestBase):
             track_ids,
         )
 
-    @patch("best_new_music_digest.playlist.SpotifyOAuth")
-    @patch("best_new_music_digest.playlist.spotipy.Spotify")
+    @patch("spotipy.oauth2.SpotifyOAuth")
+    @patch("spotipy.Spotify")
     def test_create_playlists_with_tracks(self, spotify, _):
+        from best_new_music_digest import metrics
+
         spotify = spotify()
 
         self.__with_spotify_responses(spotify)
+        metrics.reset()
 
         response = self.__playlist.create_playlists([
             self._load_json_test_data("pitchfork_tracks_output_without_checkpoint.json"),
@@ -142,8 +148,142 @@ class TestPlaylist(helpers.TestBase):
             track_ids,
         )
 
-    @patch("best_new_music_digest.playlist.SpotifyOAuth")
-    @patch("best_new_music_digest.playlist.spotipy.Spotify")
+        rendered = metrics.render()
+        assert 'bnmd_playlist_tracks_added_total{playlist="trks"} 3' in rendered
+        assert 'bnmd_spotify_lookups_total{result="found",type="track"} 3' in rendered
+        assert 'bnmd_spotify_searches_total{step="artist_track",type="track"}' in rendered
+
+    @patch("spotipy.oauth2.SpotifyOAuth")
+    @patch("spotipy.Spotify")
+    def test_create_playlists_on_track_ids(self, spotify, _):
+        spotify = spotify()
+
+        self.__with_spotify_responses(spotify)
+
+        digest = [
+            self._load_json_test_data("pitchfork_tracks_output_without_checkpoint.json"),
+            {"title": "some-title", "items": [], "errors": False, "type": "albums"},
+        ]
+        found = []
+
+        self.__playlist.create_playlists(digest, on_track_ids=found.append)
+
+        assert found == [[["7loXmEHvxWvdvwKzLFAMmc"], []]]
+
+        # Track IDs that are passed in aren't searched for, so there's nothing new to pass on
+        spotify.search.reset_mock()
+        response = self.__playlist.create_playlists(digest,
+                                                    track_ids=found[0],
+                                                    on_track_ids=found.append)
+
+        assert response == (None, self.__playlist_url)
+        assert len(found) == 1
+        spotify.search.assert_not_called()
+
+    @patch("spotipy.Spotify")
+    def test_get_track_ids_concurrently(self, spotify):
+        self._settings.SPOTIFY_MAX_WORKERS = 4
+
+        most_running = self.__with_slow_searches(spotify())
+
+        digest_item = {
+            "title": "some-title",
+            "type": "tracks",
+            "items": [
+                {"artist": "a", "title": "slow"},
+                {"artist": "b", "title": "fast"},
+                {"artist": "a", "title": "slow"},
+            ],
+        }
+
+        track_ids = self.__playlist.get_track_ids(digest_item, spotify())
+
+        # In the order of the items whichever search finishes first, and searched for once each
+        assert track_ids == ["artist:a track:slow", "artist:b track:fast", "artist:a track:slow"]
+        assert spotify().search.call_count == 2
+        assert most_running() == 2
+
+    @patch("spotipy.Spotify")
+    def test_get_album_track_ids_one_at_a_time(self, spotify):
+        self._settings.SPOTIFY_MAX_WORKERS = 1
+
+        most_running = self.__with_slow_searches(spotify())
+        spotify().album_tracks.side_effect = lambda album_id: {"items": [{"id": f"{album_id}/1"}]}
+
+        digest_item = {
+            "title": "some-title",
+            "type": "albums",
+            "items": [{"artist": "a", "title": "slow"}, {"artist": "b", "title": "fast"}],
+        }
+
+        assert self.__playlist.get_track_ids(digest_item, spotify()) == [
+            "artist:a album:slow/1",
+            "artist:b album:fast/1",
+        ]
+        assert most_running() == 1
+
+    @patch("spotipy.Spotify")
+    def test_get_track_ids_search_cache(self, spotify):
+        from best_new_music_digest.search_cache import SearchCache
+
+        spotify = spotify()
+        self.__with_spotify_responses(spotify)
+
+        digest_item = self._load_json_test_data("pitchfork_tracks_output_without_checkpoint.json")
+        search_cache = SearchCache(self._checkpointer, 60, 60)
+
+        track_ids = self.__playlist.get_track_ids(digest_item, spotify, search_cache)
+        searches = spotify.search.call_count
+
+        # The same tracks from another source, or in a later run, aren't searched for again
+        other_digest_item = {
+            **digest_item,
+            "items": [{**item, "artist": item["artist"].upper()} for item in digest_item["items"]],
+        }
+
+        assert self.__playlist.get_track_ids(other_digest_item, spotify, search_cache) == track_ids
+        assert self.__playlist.get_track_ids(digest_item,
+                                             spotify,
+                                             SearchCache(self._checkpointer, 60, 60)) == track_ids
+        assert spotify.search.call_count == searches
+
+    @patch("spotipy.Spotify")
+    def test_get_track_ids_search_cache_evicted(self, spotify):
+        from best_new_music_digest.search_cache import SearchCache
+
+        self._settings.SPOTIFY_MAX_WORKERS = 4
+
+        self.__with_slow_searches(spotify())
+
+        digest_item = {
+            "title": "some-title",
+            "type": "tracks",
+            "items": [
+                {"artist": "a", "title": "slow"},
+                {"artist": "b", "title": "fast"},
+                {"artist": "c", "title": "fast"},
+            ],
+        }
+
+        # Results pushed out of the cache by other searches are still used
+        assert self.__playlist.get_track_ids(digest_item, spotify(), SearchCache(size=1)) == [
+            "artist:a track:slow",
+            "artist:b track:fast",
+            "artist:c track:fast",
+        ]
+
+        search_cache = MagicMock()
+        search_cache.__contains__.return_value = True
+        search_cache.__getitem__.side_effect = KeyError
+
+        assert self.__playlist.get_track_ids(digest_item, spotify(), search_cache) == [
+            "artist:a track:slow",
+            "artist:b track:fast",
+            "artist:c track:fast",
+        ]
+
+    @patch("spotipy.oauth2.SpotifyOAuth")
+    @patch("spotipy.Spotify")
     def test_create_playlists_error(self, spotify, _):
         spotify = spotify()
 
@@ -156,6 +296,52 @@ class TestPlaylist(helpers.TestBase):
 
         assert response == (None, None)
 
+    @patch("spotipy.Spotify")
+    def test_get_track_ids_nothing_to_search(self, spotify):
+        spotify = spotify()
+
+        assert self.__playlist.get_track_ids({"items": [], "type": "albums"}, spotify) == []
+        assert self.__playlist.get_track_ids({"items": [{}], "type": "other"}, spotify) == []
+
+        spotify.search.assert_not_called()
+
+    @patch("spotipy.Spotify")
+    def test_get_track_ids_deadline_passed(self, spotify):
+        spotify = spotify()
+        self.__with_spotify_responses(spotify)
+
+        digest_item = self._load_json_test_data("pitchfork_tracks_output_without_checkpoint.json")
+        first_item = digest_item["items"][0]
+        search_cache = {("tracks", first_item["artist"], first_item["title"]): "some-track-id"}
+
+        # Only items that have already been searched for are used
+        assert self.__playlist.get_track_ids(digest_item, spotify, search_cache,
+                                             Deadline(0)) == ["some-track-id"]
+
+        spotify.search.assert_not_called()
+
+    @staticmethod
+    def __with_slow_searches(spotify):
+        lock = threading.Lock()
+        running = {"now": 0, "most": 0}
+
+        def search(q, type, limit):  # pylint: disable=unused-argument
+            with lock:
+                running["now"] += 1
+                running["most"] = max(running["most"], running["now"])
+
+            # The first item's search finishes last
+            time.sleep(0.1 if "slow" in q else 0.01)
+
+            with lock:
+                running["now"] -= 1
+
+            return {f"{type}s": {"items": [{"id": q}]}}
+
+        spotify.search.side_effect = search
+
+        return lambda: running["most"]
+
     def __with_spotify_responses(self, spotify):
         def get_me_response():
             return {"id": self.__user_id}
@@ -0,0 +1,101 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+import json
+import os
+import tempfile
+
+import pytest
+
+from tests import helpers
+
+
+class TestProfiles(helpers.TestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        from best_new_music_digest import profiles
+        self.__profiles = profiles
+
+        self.__digest = [
+            self._load_json_test_data("pitchfork_albums_output_without_checkpoint.json"),
+            self._load_json_test_data("the_needle_drop_tracks_output_without_checkpoint.json"),
+        ]
+
+    def test_load_profiles(self):
+        profiles = self.__load_profiles([
+            {
+                "name": "some-name",
+                "recipient_emails": ["some-email"],
+                "sources": ["Pitchfork Albums"],
+                "spotify_username": "some-spotify-username",
+                "checkpoint_namespace": "some-namespace",
+            },
+            {
+                "name": "some-other-name",
+                "recipient_emails": ["some-other-email"],
+                "sources": ["The Needle Drop Tracks"],
+            },
+        ])
+
+        assert len(profiles) == 2
+
+        assert profiles[0].name == "some-name"
+        assert profiles[0].recipient_emails == ["some-email"]
+        assert profiles[0].sources == ["Pitchfork Albums"]
+        assert profiles[0].spotify_username == "some-spotify-username"
+        assert profiles[0].checkpoint_namespace == "some-namespace"
+
+        assert not profiles[1].spotify_username
+        assert profiles[1].checkpoint_namespace == "some-other-name"
+
+    def test_load_profiles_missing_properties(self):
+        with pytest.raises(Exception) as exception:
+            self.__load_profiles([{"name": "some-name"}])
+        assert str(exception.value) == "Profile missing mandatory properties: " \
+                                       "['recipient_emails', 'sources']."
+
+    def test_load_profiles_empty(self):
+        with pytest.raises(Exception) as exception:
+            self.__load_profiles([])
+        assert str(exception.value).startswith("No profiles found in ")
+
+    def test_get_digest_filters_sources(self):
+        profile = self.__profiles.Profile("some-name", [], ["Pitchfork Albums"])
+
+        assert profile.get_digest(self.__digest, self._checkpointer) == [self.__digest[0]]
+
+    def test_get_digest_uses_profile_checkpoints(self):
+        profile = self.__profiles.Profile("some-name",
+                                          [],
+                                          ["Pitchfork Albums"],
+                                          checkpoint_namespace="some-namespace")
+
+        self._checkpointer.save_checkpoint(
+            "some-namespace/Pitchfork Albums",
+            "https://www.pitchfork.com/reviews/albums/" \
+            "perfume-genius-set-my-heart-on-fire-immediately/"
+        )
+
+        profile_digest = profile.get_digest(self.__digest, self._checkpointer)
+
+        assert profile_digest == [
+            self._load_json_test_data("pitchfork_albums_output_with_checkpoint.json"),
+        ]
+
+        assert self._checkpointer.get_checkpoint("some-namespace/Pitchfork Albums") == \
+            "https://www.pitchfork.com/reviews/albums/run-the-jewels-rtj4/"
+
+        # Checkpoints are moved on so nothing is new the next time around
+        assert profile.get_digest(self.__digest, self._checkpointer) == [
+            self._load_json_test_data("pitchfork_albums_output_up_to_date.json"),
+        ]
+
+    def __load_profiles(self, profiles_json):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as profiles_file:
+            json.dump(profiles_json, profiles_file)
+
+        try:
+            return self.__profiles.load_profiles(profiles_file.name)
+        finally:
+            os.remove(profiles_file.name)
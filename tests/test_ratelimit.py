@@ -0,0 +1,187 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+import threading
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+from requests import Response
+
+from tests import helpers
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimit(helpers.TestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        from best_new_music_digest import ratelimit
+        self.__ratelimit = ratelimit
+        self.__ratelimit.reset()
+        self.__clock = FakeClock()
+
+    def tearDown(self):
+        super().tearDown()
+
+        self.__ratelimit.reset()
+
+    def test_token_bucket(self):
+        bucket = self.__ratelimit.TokenBucket(2, clock=self.__clock, sleep=self.__clock.sleep)
+
+        for _ in range(4):
+            bucket.acquire()
+
+        # The first two make up the burst, then they're let through every half a second
+        assert self.__clock.sleeps == [0.5, 0.5]
+
+    def test_token_bucket_pause(self):
+        bucket = self.__ratelimit.TokenBucket(2, clock=self.__clock, sleep=self.__clock.sleep)
+
+        bucket.pause(10)
+        bucket.acquire()
+
+        assert self.__clock.now >= 10
+
+    def test_host_limiter_increases_concurrency(self):
+        limiter = self.__limiter(8)
+        assert limiter.get_limit() == 4
+
+        for _ in range(4):
+            limiter.acquire()
+            limiter.release(0.1)
+
+        assert limiter.get_limit() == 5
+
+        for _ in range(100):
+            limiter.acquire()
+            limiter.release(0.1)
+
+        assert limiter.get_limit() == 8
+
+    def test_host_limiter_throttled(self):
+        limiter = self.__limiter(8)
+
+        limiter.acquire()
+        limiter.release(0.1, throttled=True, retry_after=5)
+
+        assert limiter.get_limit() == 2
+
+        limiter.acquire()
+        assert self.__clock.now >= 5
+
+        limiter.release(0.1, throttled=True)
+        limiter.acquire()
+        limiter.release(0.1, throttled=True)
+
+        assert limiter.get_limit() == 1
+
+    def test_host_limiter_retry_after_capped(self):
+        limiter = self.__limiter(8)
+
+        limiter.release(throttled=True, retry_after=3600)
+        limiter.acquire()
+
+        assert self.__clock.now == 60
+
+    def test_host_limiter_slow_responses(self):
+        limiter = self.__limiter(8)
+
+        for latency in [0.1, 0.1, 1]:
+            limiter.acquire()
+            limiter.release(latency)
+
+        assert limiter.get_limit() == 3
+
+        # It keeps backing off while responses stay slow
+        limiter.acquire()
+        limiter.release(1)
+
+        assert limiter.get_limit() == 2
+
+    def test_host_limiter_waits_for_slot(self):
+        limiter = self.__ratelimit.HostLimiter(100, 2)
+        limiter.acquire()
+
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        thread.start()
+
+        assert not acquired.wait(0.1)
+
+        limiter.release(0.1)
+        thread.join(1)
+
+        assert acquired.is_set()
+
+    def test_get_limiter(self):
+        spotify_limiter = self.__ratelimit.get_limiter("api.spotify.com")
+
+        assert spotify_limiter is self.__ratelimit.get_limiter("accounts.spotify.com")
+        assert spotify_limiter is not self.__ratelimit.get_limiter("www.googleapis.com")
+        assert self.__ratelimit.get_limiter("some-host") is not None
+
+    def test_get_limiter_disabled(self):
+        self._settings.RATE_LIMITS = {"pitchfork.com": 0}
+
+        assert self.__ratelimit.get_limiter("pitchfork.com") is None
+
+    def test_get_limits(self):
+        self._settings.RATE_LIMITS = {"spotify.com": 20, "some-host": 1}
+
+        limits = self.__ratelimit.get_limits()
+
+        assert limits["spotify.com"] == (20, 8)
+        assert limits["some-host"] == (1, 4)
+        assert limits["pitchfork.com"] == (2, 2)
+
+    def test_get_group(self):
+        assert self.__ratelimit.get_group("API.Spotify.com") == "spotify.com"
+        assert self.__ratelimit.get_group("notspotify.com") == "notspotify.com"
+        assert self.__ratelimit.get_group(None) == ""
+
+    def test_get_retry_after(self):
+        assert self.__ratelimit.get_retry_after(self.__response(429, "5")) == 5
+        assert self.__ratelimit.get_retry_after(self.__response(429)) is None
+        assert self.__ratelimit.get_retry_after(self.__response(429, "soon")) is None
+
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+        retry_after = self.__ratelimit.get_retry_after(
+            self.__response(429, format_datetime(retry_at, usegmt=True)))
+        assert 25 < retry_after <= 30
+
+    def test_is_throttled(self):
+        assert self.__ratelimit.is_throttled(self.__response(429))
+        assert not self.__ratelimit.is_throttled(self.__response(200))
+
+        retried = self.__response(200)
+        retried.raw = MagicMock()
+        retried.raw.retries.history = [MagicMock(status=429)]
+        assert self.__ratelimit.is_throttled(retried)
+
+    def __limiter(self, max_concurrency):
+        return self.__ratelimit.HostLimiter(1000, max_concurrency, clock=self.__clock,
+                                            sleep=self.__clock.sleep)
+
+    @staticmethod
+    def __response(status_code, retry_after=None):
+        response = Response()
+        response.status_code = status_code
+
+        if retry_after:
+            response.headers["Retry-After"] = retry_after
+
+        return response
@@ -0,0 +1,112 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+import json
+import os
+import tempfile
+
+from tests import helpers
+
+
+class TestReport(helpers.TestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        from best_new_music_digest import report
+        self.__report = report
+
+    def test_spans(self):
+        run_report = self.__report.start_report()
+
+        with self.__report.span("some-stage", some_attribute="some-value"):
+            with self.__report.span("some-other-stage"):
+                pass
+
+        with self.assertRaises(Exception):
+            with self.__report.span("some-stage"):
+                self._raise_exception()
+
+        run_report.finish()
+        report_dict = run_report.to_dict()
+
+        assert [s["name"] for s in report_dict["spans"]] == [
+            "some-stage",
+            "some-other-stage",
+            "some-stage",
+        ]
+        assert report_dict["spans"][0]["some_attribute"] == "some-value"
+        assert report_dict["stages"]["some-stage"]["count"] == 2
+        assert report_dict["stages"]["some-other-stage"]["count"] == 1
+        assert report_dict["duration"] >= report_dict["stages"]["some-stage"]["duration"]
+        assert report_dict["http"] == {"requests": 0, "bytes": 0, "hosts": []}
+        assert report_dict["quota"] == {}
+
+    def test_timed(self):
+        run_report = self.__report.start_report()
+
+        @self.__report.timed("some-stage")
+        def some_function(value):
+            return value
+
+        assert some_function("some-value") == "some-value"
+        assert run_report.to_dict()["stages"]["some-stage"]["count"] == 1
+
+    def test_record_http(self):
+        run_report = self.__report.start_report()
+
+        self.__report.record_http("www.some-host.com", 10)
+        self.__report.record_http("www.some-host.com", 5)
+        self.__report.record_http("api.some-other-host.com", 1)
+
+        assert run_report.to_dict()["http"] == {
+            "requests": 3,
+            "bytes": 16,
+            "hosts": [
+                {"host": "api.some-other-host.com", "requests": 1, "bytes": 1},
+                {"host": "www.some-host.com", "requests": 2, "bytes": 15},
+            ],
+        }
+
+    def test_to_dict_can_be_saved_to_mongodb(self):
+        import bson
+
+        run_report = self.__report.start_report()
+
+        with self.__report.span("some-stage", query="artist:some.artist"):
+            self.__report.record_http("www.some-host.com", 10)
+            self.__report.record_quota("youtube", 1)
+
+        # As pymongo checks documents before inserting them
+        bson.BSON.encode(run_report.to_dict(), check_keys=True)
+
+    def test_record_quota(self):
+        run_report = self.__report.start_report()
+
+        self.__report.record_quota("some-api", 1)
+        self.__report.record_quota("some-api", 2)
+
+        assert run_report.to_dict()["quota"] == {"some-api": 3}
+
+    def test_get_report(self):
+        run_report = self.__report.start_report()
+
+        assert self.__report.get_report() is run_report
+
+    def test_save(self):
+        run_report = self.__report.start_report()
+
+        with self.__report.span("some-stage"):
+            pass
+
+        run_report.finish()
+
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as report_file:
+            pass
+
+        try:
+            run_report.save(report_file.name)
+
+            with open(report_file.name, encoding="utf-8") as report_file:
+                assert json.load(report_file) == run_report.to_dict()
+        finally:
+            os.remove(report_file.name)
@@ -0,0 +1,77 @@
+# pylint: disable=missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+from datetime import datetime
+
+import pytest
+
+from best_new_music_digest.scheduler import CronSchedule
+from tests import helpers
+
+
+class TestCronSchedule(helpers.TestBase):
+
+    def test_next_after_every_minute(self):
+        self.__test_next_after("* * * * *",
+                               datetime(2020, 1, 1, 12, 30, 45),
+                               datetime(2020, 1, 1, 12, 31))
+
+    def test_next_after_weekly(self):
+        # 01/01/2020 was a Wednesday
+        self.__test_next_after("0 19 * * 1",
+                               datetime(2020, 1, 1, 12, 30),
+                               datetime(2020, 1, 6, 19, 0))
+
+    def test_next_after_weekly_same_day(self):
+        self.__test_next_after("0 19 * * 1",
+                               datetime(2020, 1, 6, 18, 59, 59),
+                               datetime(2020, 1, 6, 19, 0))
+
+    def test_next_after_steps(self):
+        self.__test_next_after("*/15 9-17/2 * * *",
+                               datetime(2020, 1, 1, 10, 50),
+                               datetime(2020, 1, 1, 11, 0))
+
+    def test_next_after_step_from_value(self):
+        self.__test_next_after("20/30 * * * *",
+                               datetime(2020, 1, 1, 10, 21),
+                               datetime(2020, 1, 1, 10, 50))
+
+    def test_next_after_lists(self):
+        self.__test_next_after("0,30 8 * * *",
+                               datetime(2020, 1, 1, 8, 0),
+                               datetime(2020, 1, 1, 8, 30))
+
+    def test_next_after_month_rollover(self):
+        self.__test_next_after("0 0 1 1 *",
+                               datetime(2020, 6, 15),
+                               datetime(2021, 1, 1))
+
+    def test_next_after_leap_day(self):
+        self.__test_next_after("0 0 29 2 *",
+                               datetime(2021, 1, 1),
+                               datetime(2024, 2, 29))
+
+    def test_next_after_day_of_month_or_week(self):
+        # Matches the 15th of the month or any Sunday
+        self.__test_next_after("0 0 15 * 0",
+                               datetime(2020, 1, 1),
+                               datetime(2020, 1, 5))
+        self.__test_next_after("0 0 15 * 0",
+                               datetime(2020, 1, 13),
+                               datetime(2020, 1, 15))
+
+    def test_never_matches(self):
+        with pytest.raises(Exception) as exception:
+            CronSchedule("0 0 31 2 *").next_after(datetime(2020, 1, 1))
+        assert str(exception.value) == "Cron expression never matches."
+
+    def test_invalid_expressions(self):
+        for expression in ("* * * *", "60 * * * *", "* 24 * * *", "5-1 * * * *", "*/0 * * * *",
+                           "a * * * *", "* * 0 * *", "* * * 13 *", "* * * * 7"):
+            with pytest.raises(Exception) as exception:
+                CronSchedule(expression)
+            assert str(exception.value) == f"Invalid cron expression: {expression}."
+
+    @staticmethod
+    def __test_next_after(expression, after, expected):
+        assert CronSchedule(expression).next_after(after) == expected
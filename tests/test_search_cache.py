@@ -0,0 +1,136 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+import time
+from unittest.mock import MagicMock
+
+from tests import helpers
+
+
+class TestSearchCache(helpers.TestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        from best_new_music_digest.search_cache import SearchCache
+        self.__search_cache = SearchCache
+
+        self.__now = time.time()
+
+    def test_memory_only(self):
+        search_cache = self.__search_cache()
+
+        assert ("albums", "some-artist", "some-title") not in search_cache
+
+        search_cache["albums", "some-artist", "some-title"] = ["some-track-id"]
+        search_cache["tracks", "some-artist", "some-title"] = None
+
+        assert search_cache["albums", "some-artist", "some-title"] == ["some-track-id"]
+        assert ("tracks", "some-artist", "some-title") in search_cache
+        assert search_cache["tracks", "some-artist", "some-title"] is None
+
+        with self.assertRaises(KeyError):
+            _ = search_cache["tracks", "some-other-artist", "some-title"]
+
+    def test_normalised(self):
+        search_cache = self.__search_cache()
+
+        search_cache["albums", "Some  Artist", "Some Title "] = ["some-track-id"]
+
+        assert ("albums", "some artist", "SOME TITLE") in search_cache
+        assert ("tracks", "some artist", "some title") not in search_cache
+        assert len(search_cache) == 1
+
+    def test_lru(self):
+        search_cache = self.__search_cache(size=2)
+
+        search_cache["albums", "a", "1"] = ["1"]
+        search_cache["albums", "b", "2"] = ["2"]
+        assert ("albums", "a", "1") in search_cache
+        search_cache["albums", "c", "3"] = ["3"]
+
+        # The least recently used result goes
+        assert ("albums", "a", "1") in search_cache
+        assert ("albums", "b", "2") not in search_cache
+        assert ("albums", "c", "3") in search_cache
+
+    def test_persisted(self):
+        search_cache = self.__create_search_cache()
+        search_cache["albums", "Some Artist", "Some Title"] = ["some-track-id"]
+
+        later_search_cache = self.__create_search_cache()
+
+        assert ("albums", "some artist", "some title") in later_search_cache
+        assert later_search_cache["albums", "some artist", "some title"] == ["some-track-id"]
+
+    def test_expired(self):
+        search_cache = self.__create_search_cache()
+        search_cache["albums", "some-artist", "some-title"] = ["some-track-id"]
+        search_cache["tracks", "some-artist", "some-title"] = None
+
+        self.__now += 15
+
+        later_search_cache = self.__create_search_cache()
+
+        # Items that weren't found are searched for again sooner
+        assert ("albums", "some-artist", "some-title") in later_search_cache
+        assert ("tracks", "some-artist", "some-title") not in later_search_cache
+
+        self.__now += 20
+
+        later_search_cache = self.__create_search_cache()
+
+        assert ("albums", "some-artist", "some-title") not in later_search_cache
+
+        with self.assertRaises(KeyError):
+            _ = later_search_cache["albums", "some-artist", "some-title"]
+
+    def test_not_persisted_without_ttl(self):
+        checkpointer = MagicMock()
+
+        search_cache = self.__search_cache(checkpointer, 0, 10)
+        search_cache["albums", "some-artist", "some-title"] = None
+
+        assert ("albums", "some-artist", "some-title") in search_cache
+        assert ("albums", "some-other-artist", "some-title") not in search_cache
+        checkpointer.save_search_result.assert_not_called()
+        checkpointer.get_search_result.assert_not_called()
+
+    def test_not_found_not_persisted_without_ttl(self):
+        search_cache = self.__search_cache(self._checkpointer, 30, 0, clock=self.__clock)
+        search_cache["albums", "some-artist", "some-title"] = None
+
+        assert self._checkpointer.get_search_result('["albums", "some-artist", "some-title"]') \
+            is None
+
+    def test_storage_errors(self):
+        checkpointer = MagicMock()
+        checkpointer.get_search_result.side_effect = self._raise_exception
+        checkpointer.save_search_result.side_effect = self._raise_exception
+
+        search_cache = self.__search_cache(checkpointer, 30, 10)
+
+        assert ("albums", "some-artist", "some-title") not in search_cache
+
+        search_cache["albums", "some-artist", "some-title"] = ["some-track-id"]
+
+        assert search_cache["albums", "some-artist", "some-title"] == ["some-track-id"]
+
+    def test_metrics(self):
+        from best_new_music_digest import metrics
+
+        metrics.reset()
+
+        search_cache = self.__search_cache()
+        assert ("albums", "some-artist", "some-title") not in search_cache
+        search_cache["albums", "some-artist", "some-title"] = None
+        assert ("albums", "some-artist", "some-title") in search_cache
+
+        rendered = metrics.render()
+        assert 'bnmd_spotify_cache_total{result="hit"} 1' in rendered
+        assert 'bnmd_spotify_cache_total{result="miss"} 1' in rendered
+
+    def __create_search_cache(self):
+        return self.__search_cache(self._checkpointer, 30, 10, clock=self.__clock)
+
+    def __clock(self):
+        return self.__now
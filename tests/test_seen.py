@@ -0,0 +1,103 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+from unittest.mock import MagicMock, patch
+
+from tests import helpers
+
+
+class TestBloomFilter(helpers.TestBase):
+
+    def test_contains(self):
+        from best_new_music_digest.seen import BloomFilter
+
+        bloom_filter = BloomFilter(1000)
+
+        for i in range(1000):
+            bloom_filter.add(f"key-{i}")
+
+        assert all(f"key-{i}" in bloom_filter for i in range(1000))
+
+        false_positives = sum(f"other-key-{i}" in bloom_filter for i in range(10000))
+        assert false_positives < 300
+
+    def test_empty(self):
+        from best_new_music_digest.seen import BloomFilter
+
+        assert "some-key" not in BloomFilter(0)
+
+
+class TestSeenItems(helpers.TestBase):
+
+    def test_is_seen(self):
+        from best_new_music_digest.seen import SeenItems
+
+        self._checkpointer.save_seen("some-name", {"some artist - some title": "some-link"})
+        seen_items = SeenItems(self._checkpointer, "some-name")
+
+        assert seen_items.is_seen(self.__item("Some Artist", "Some Title", "some-other-link"))
+        assert seen_items.is_seen(self.__item("Other Artist", "Other Title", "some-link"))
+        assert not seen_items.is_seen(self.__item("Other Artist", "Other Title", "other-link"))
+
+    def test_is_seen_without_unique_links(self):
+        from best_new_music_digest.seen import SeenItems
+
+        self._checkpointer.save_seen("some-name", {"some artist - some title": "some-link"})
+        seen_items = SeenItems(self._checkpointer, "some-name", unique_links=False)
+
+        assert not seen_items.is_seen(self.__item("Other Artist", "Other Title", "some-link"))
+
+    def test_is_seen_not_in_filter(self):
+        from best_new_music_digest.seen import SeenItems
+
+        checkpointer = MagicMock()
+        checkpointer.get_seen.return_value = [{"key": "a - b", "link": "some-link"}]
+        seen_items = SeenItems(checkpointer, "some-name")
+
+        assert not seen_items.is_seen(self.__item("c", "d", "other-link"))
+        checkpointer.is_seen.assert_not_called()
+
+    def test_is_seen_false_positive(self):
+        from best_new_music_digest import seen
+
+        checkpointer = MagicMock()
+        checkpointer.get_seen.return_value = []
+        checkpointer.is_seen.return_value = False
+        seen_items = seen.SeenItems(checkpointer, "some-name")
+
+        # Every key is probably in the filter, so it's down to the database
+        with patch.object(seen.BloomFilter, "__contains__", return_value=True):
+            assert not seen_items.is_seen(self.__item("a", "b", "some-link"))
+
+        checkpointer.is_seen.assert_called_once_with("some-name", "a - b", "some-link")
+
+    def test_add(self):
+        from best_new_music_digest.seen import SeenItems
+
+        seen_items = SeenItems(self._checkpointer, "some-name")
+        seen_items.add(self.__item("a", "b", "some-link"))
+
+        assert seen_items.is_seen(self.__item("A", "B", "other-link"))
+        assert seen_items.is_seen(self.__item("c", "d", "some-link"))
+
+        # Nothing is saved until save is called
+        assert self._checkpointer.get_seen("some-name") == []
+
+    def test_save(self):
+        from best_new_music_digest.seen import SeenItems
+
+        seen_items = SeenItems(self._checkpointer, "some-name")
+        seen_items.add(self.__item("a", "b", "some-link"))
+        seen_items.save()
+
+        assert self._checkpointer.get_seen("some-name") == [{"key": "a - b", "link": "some-link"}]
+        assert SeenItems(self._checkpointer, "some-name").is_seen(self.__item("a", "b", "x"))
+
+    def test_get_key(self):
+        from best_new_music_digest.seen import get_key
+
+        assert get_key(self.__item(" Björk ", "Homogenic!", "")) == "bjork - homogenic"
+        assert get_key(self.__item("AC/DC", "Back  in Black", "")) == "ac dc - back in black"
+
+    @staticmethod
+    def __item(artist, title, link):
+        return {"artist": artist, "title": title, "link": link}
@@ -2,6 +2,7 @@
 
 import os
 from importlib import reload
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -16,6 +17,36 @@ class TestSettings(helpers.TestBase):
     def test_always_email_set(self):
         self.__test_boolean_property("ALWAYS_EMAIL")
 
+    def test_backfill_max_pages_not_set(self):
+        self.__test_missing_property("BACKFILL_MAX_PAGES", expected_value=5)
+
+    def test_backfill_max_pages_set(self):
+        self.__test_property("BACKFILL_MAX_PAGES", "10", 10)
+
+    def test_backfill_max_pages_invalid(self):
+        self.__test_invalid_property("BACKFILL_MAX_PAGES",
+                                     "some-pages",
+                                     "Invalid integer property: BACKFILL_MAX_PAGES=some-pages.")
+
+    def test_circuit_breaker_threshold_not_set(self):
+        self.__test_missing_property("CIRCUIT_BREAKER_THRESHOLD", expected_value=3)
+
+    def test_circuit_breaker_threshold_set(self):
+        self.__test_property("CIRCUIT_BREAKER_THRESHOLD", "5", 5)
+
+    def test_circuit_breaker_threshold_invalid(self):
+        self.__test_invalid_property(
+            "CIRCUIT_BREAKER_THRESHOLD",
+            "some-threshold",
+            "Invalid integer property: CIRCUIT_BREAKER_THRESHOLD=some-threshold.",
+        )
+
+    def test_conditional_requests_not_set(self):
+        self.__test_missing_property("CONDITIONAL_REQUESTS", expected_value=True)
+
+    def test_conditional_requests_set(self):
+        self.__test_boolean_property("CONDITIONAL_REQUESTS")
+
     def test_create_spotify_playlists_not_set(self):
         self.__test_missing_property("CREATE_SPOTIFY_PLAYLISTS", expected_value=True)
 
@@ -28,8 +59,120 @@ class TestSettings(helpers.TestBase):
     def test_dad_joke_set(self):
         self.__test_boolean_property("DAD_JOKE")
 
+    def test_daemon_schedule_not_set(self):
+        self.__test_missing_property("DAEMON_SCHEDULE", expected_value="0 19 * * 1")
+
+    def test_daemon_schedule_set(self):
+        self.__test_string_property("DAEMON_SCHEDULE")
+
+    def test_html_parser_not_set(self):
+        self.__test_missing_property("HTML_PARSER", expected_value="auto")
+
+    def test_html_parser_set(self):
+        self.__test_property("HTML_PARSER", "html.parser", "html.parser")
+
+    def test_html_parser_lxml(self):
+        with patch("importlib.util.find_spec", return_value=MagicMock()):
+            self.__test_property("HTML_PARSER", "lxml", "lxml")
+
+    def test_html_parser_lxml_not_installed(self):
+        with patch("importlib.util.find_spec", return_value=None):
+            self.__test_invalid_property("HTML_PARSER",
+                                         "lxml",
+                                         "HTML parser lxml isn't installed.")
+
+    def test_html_parser_invalid(self):
+        self.__test_invalid_property("HTML_PARSER",
+                                     "some-parser",
+                                     "Invalid HTML parser: some-parser.")
+
+    def test_http_cassette_dir_not_set(self):
+        self.__test_missing_property("HTTP_CASSETTE_DIR", expected_value=None)
+
+    def test_http_cassette_dir_not_set_with_mode(self):
+        os.environ["HTTP_CASSETTE_MODE"] = "replay"
+        self.__test_missing_property("HTTP_CASSETTE_DIR", expect_exception=True)
+
+    def test_http_cassette_dir_set(self):
+        self.__test_string_property("HTTP_CASSETTE_DIR")
+
+    def test_http_cassette_latency_not_set(self):
+        self.__test_missing_property("HTTP_CASSETTE_LATENCY", expected_value=0)
+
+    def test_http_cassette_latency_set(self):
+        self.__test_property("HTTP_CASSETTE_LATENCY", "100", 100)
+
+    def test_http_cassette_latency_invalid(self):
+        self.__test_invalid_property("HTTP_CASSETTE_LATENCY",
+                                     "slow",
+                                     "Invalid integer property: HTTP_CASSETTE_LATENCY=slow.")
+
+    def test_http_cassette_mode_not_set(self):
+        self.__test_missing_property("HTTP_CASSETTE_MODE", expected_value=None)
+
+    def test_http_cassette_mode_set(self):
+        os.environ["HTTP_CASSETTE_DIR"] = "some-directory"
+        self.__test_property("HTTP_CASSETTE_MODE", "record", "record")
+
+    def test_http_cassette_mode_invalid(self):
+        os.environ["HTTP_CASSETTE_DIR"] = "some-directory"
+        self.__test_invalid_property("HTTP_CASSETTE_MODE",
+                                     "some-mode",
+                                     "Invalid HTTP cassette mode: some-mode.")
+
+    def test_http_connect_timeout_not_set(self):
+        self.__test_missing_property("HTTP_CONNECT_TIMEOUT", expected_value=5)
+
+    def test_http_connect_timeout_set(self):
+        self.__test_property("HTTP_CONNECT_TIMEOUT", "10", 10)
+
+    def test_http_connect_timeout_invalid(self):
+        self.__test_invalid_property("HTTP_CONNECT_TIMEOUT",
+                                     "slow",
+                                     "Invalid integer property: HTTP_CONNECT_TIMEOUT=slow.")
+
+    def test_http_read_timeout_not_set(self):
+        self.__test_missing_property("HTTP_READ_TIMEOUT", expected_value=30)
+
+    def test_http_read_timeout_set(self):
+        self.__test_property("HTTP_READ_TIMEOUT", "60", 60)
+
+    def test_http_read_timeout_invalid(self):
+        self.__test_invalid_property("HTTP_READ_TIMEOUT",
+                                     "slow",
+                                     "Invalid integer property: HTTP_READ_TIMEOUT=slow.")
+
+    def test_http_retries_not_set(self):
+        self.__test_missing_property("HTTP_RETRIES", expected_value=3)
+
+    def test_http_retries_set(self):
+        self.__test_property("HTTP_RETRIES", "5", 5)
+
+    def test_http_retries_invalid(self):
+        self.__test_invalid_property("HTTP_RETRIES",
+                                     "lots",
+                                     "Invalid integer property: HTTP_RETRIES=lots.")
+
+    def test_metrics_port_not_set(self):
+        self.__test_missing_property("METRICS_PORT", expected_value=0)
+
+    def test_metrics_port_set(self):
+        self.__test_property("METRICS_PORT", "9100", 9100)
+
+    def test_metrics_port_invalid(self):
+        self.__test_invalid_property("METRICS_PORT",
+                                     "some-port",
+                                     "Invalid integer property: METRICS_PORT=some-port.")
+
+    def test_metrics_textfile_not_set(self):
+        self.__test_missing_property("METRICS_TEXTFILE", expected_value=None)
+
+    def test_metrics_textfile_set(self):
+        self.__test_string_property("METRICS_TEXTFILE")
+
     def test_mongodb_uri_not_set(self):
-        self.__test_missing_property("MONGODB_URI", expect_exception=True)
+        os.environ["STORAGE_URI"] = "sqlite:///some-file.db"
+        self.__test_missing_property("MONGODB_URI", expected_value=None)
 
     def test_mongodb_uri_set(self):
         self.__test_string_property("MONGODB_URI")
@@ -46,12 +189,91 @@ class TestSettings(helpers.TestBase):
     def test_pitchfork_tracks_set(self):
         self.__test_boolean_property("PITCHFORK_TRACKS")
 
+    def test_profiles_file_not_set(self):
+        self.__test_missing_property("PROFILES_FILE", expected_value=None)
+
+    def test_profiles_file_set(self):
+        self.__test_string_property("PROFILES_FILE")
+
+    def test_rate_limits_not_set(self):
+        self.__test_missing_property("RATE_LIMITS", expected_value={})
+
+    def test_rate_limits_set(self):
+        self.__test_property("RATE_LIMITS",
+                             "api.spotify.com=20, Pitchfork.com=0.5,",
+                             {"api.spotify.com": 20, "pitchfork.com": 0.5})
+
+    def test_rate_limits_invalid(self):
+        self.__test_invalid_property("RATE_LIMITS",
+                                     "pitchfork.com=fast",
+                                     "Invalid rate limit property: RATE_LIMITS=pitchfork.com=fast.")
+
     def test_recipient_email_not_set(self):
         self.__test_missing_property("RECIPIENT_EMAIL", expect_exception=True)
 
+    def test_recipient_email_not_set_with_profiles(self):
+        os.environ["PROFILES_FILE"] = "some-profiles-file"
+        self.__test_missing_property("RECIPIENT_EMAIL", expected_value="None")
+
     def test_recipient_email_set(self):
         self.__test_string_property("RECIPIENT_EMAIL")
 
+    def test_run_deadline_not_set(self):
+        self.__test_missing_property("RUN_DEADLINE", expected_value=0)
+
+    def test_run_deadline_set(self):
+        self.__test_property("RUN_DEADLINE", "900", 900)
+
+    def test_run_deadline_invalid(self):
+        self.__test_invalid_property("RUN_DEADLINE",
+                                     "soon",
+                                     "Invalid integer property: RUN_DEADLINE=soon.")
+
+    def test_run_journal_max_age_not_set(self):
+        self.__test_missing_property("RUN_JOURNAL_MAX_AGE", expected_value=86400)
+
+    def test_run_journal_max_age_set(self):
+        self.__test_property("RUN_JOURNAL_MAX_AGE", "3600", 3600)
+
+    def test_run_journal_max_age_invalid(self):
+        self.__test_invalid_property("RUN_JOURNAL_MAX_AGE",
+                                     "a day",
+                                     "Invalid integer property: RUN_JOURNAL_MAX_AGE=a day.")
+
+    def test_run_report_file_not_set(self):
+        self.__test_missing_property("RUN_REPORT_FILE", expected_value=None)
+
+    def test_run_report_file_set(self):
+        self.__test_string_property("RUN_REPORT_FILE")
+
+    def test_run_report_mongodb_not_set(self):
+        self.__test_missing_property("RUN_REPORT_MONGODB", expected_value=False)
+
+    def test_run_report_mongodb_set(self):
+        self.__test_boolean_property("RUN_REPORT_MONGODB")
+
+    def test_scraper_max_workers_not_set(self):
+        self.__test_missing_property("SCRAPER_MAX_WORKERS", expected_value=5)
+
+    def test_scraper_max_workers_set(self):
+        self.__test_property("SCRAPER_MAX_WORKERS", "2", 2)
+
+    def test_scraper_max_workers_invalid(self):
+        self.__test_invalid_property("SCRAPER_MAX_WORKERS",
+                                     "lots",
+                                     "Invalid integer property: SCRAPER_MAX_WORKERS=lots.")
+
+    def test_scraper_timeout_not_set(self):
+        self.__test_missing_property("SCRAPER_TIMEOUT", expected_value=60)
+
+    def test_scraper_timeout_set(self):
+        self.__test_property("SCRAPER_TIMEOUT", "30", 30)
+
+    def test_scraper_timeout_invalid(self):
+        self.__test_invalid_property("SCRAPER_TIMEOUT",
+                                     "forever",
+                                     "Invalid integer property: SCRAPER_TIMEOUT=forever.")
+
     def test_sender_email_not_set(self):
         self.__test_missing_property("SENDER_EMAIL", expect_exception=True)
 
@@ -76,6 +298,28 @@ class TestSettings(helpers.TestBase):
     def test_sputnikmusic_albums_set(self):
         self.__test_boolean_property("SPUTNIKMUSIC_ALBUMS")
 
+    def test_spotify_cache_size_not_set(self):
+        self.__test_missing_property("SPOTIFY_CACHE_SIZE", expected_value=1000)
+
+    def test_spotify_cache_size_set(self):
+        self.__test_property("SPOTIFY_CACHE_SIZE", "50", 50)
+
+    def test_spotify_cache_size_invalid(self):
+        self.__test_invalid_property("SPOTIFY_CACHE_SIZE",
+                                     "0",
+                                     "Invalid Spotify cache size: 0.")
+
+    def test_spotify_cache_ttl_not_set(self):
+        self.__test_missing_property("SPOTIFY_CACHE_TTL", expected_value=2592000)
+
+    def test_spotify_cache_ttl_set(self):
+        self.__test_property("SPOTIFY_CACHE_TTL", "0", 0)
+
+    def test_spotify_cache_ttl_invalid(self):
+        self.__test_invalid_property("SPOTIFY_CACHE_TTL",
+                                     "forever",
+                                     "Invalid integer property: SPOTIFY_CACHE_TTL=forever.")
+
     def test_spotify_client_id_not_set_when_required(self):
         os.environ["CREATE_SPOTIFY_PLAYLISTS"] = "true"
         self.__test_missing_property("SPOTIFY_CLIENT_ID", expect_exception=True)
@@ -98,6 +342,18 @@ class TestSettings(helpers.TestBase):
     def test_spotify_client_secret_set(self):
         self.__test_string_property("SPOTIFY_CLIENT_SECRET")
 
+    def test_spotify_max_workers_not_set(self):
+        self.__test_missing_property("SPOTIFY_MAX_WORKERS", expected_value=4)
+
+    def test_spotify_max_workers_set(self):
+        self.__test_property("SPOTIFY_MAX_WORKERS", "8", 8)
+
+    def test_spotify_not_found_ttl_not_set(self):
+        self.__test_missing_property("SPOTIFY_NOT_FOUND_TTL", expected_value=86400)
+
+    def test_spotify_not_found_ttl_set(self):
+        self.__test_property("SPOTIFY_NOT_FOUND_TTL", "3600", 3600)
+
     def test_spotify_username_not_set_when_required(self):
         os.environ["CREATE_SPOTIFY_PLAYLISTS"] = "true"
         self.__test_missing_property("SPOTIFY_USERNAME", expect_exception=True)
@@ -109,6 +365,28 @@ class TestSettings(helpers.TestBase):
     def test_spotify_username_set(self):
         self.__test_string_property("SPOTIFY_USERNAME")
 
+    def test_storage_uri_not_set(self):
+        self.__test_missing_property("STORAGE_URI", expected_value="mongodb://some-mongodb-host")
+
+    def test_storage_uri_and_mongodb_uri_not_set(self):
+        del os.environ["MONGODB_URI"]
+        self.__test_missing_property("STORAGE_URI", expect_exception=True)
+
+    def test_storage_uri_set(self):
+        self.__test_string_property("STORAGE_URI")
+
+    def test_streaming_pipeline_not_set(self):
+        self.__test_missing_property("STREAMING_PIPELINE", expected_value=False)
+
+    def test_streaming_pipeline_set(self):
+        self.__test_boolean_property("STREAMING_PIPELINE")
+
+    def test_streaming_scrapers_not_set(self):
+        self.__test_missing_property("STREAMING_SCRAPERS", expected_value=False)
+
+    def test_streaming_scrapers_set(self):
+        self.__test_boolean_property("STREAMING_SCRAPERS")
+
     def test_the_needle_drop_albums_not_set(self):
         self.__test_missing_property("THE_NEEDLE_DROP_ALBUMS", expected_value=True)
 
@@ -150,7 +428,7 @@ class TestSettings(helpers.TestBase):
         del os.environ["SENDGRID_TEMPLATE_ID"]
         with pytest.raises(Exception) as exception:
             reload(self._settings)
-        assert str(exception.value) == "Missing mandatory properties: ['MONGODB_URI', " \
+        assert str(exception.value) == "Missing mandatory properties: ['STORAGE_URI', " \
                                        "'RECIPIENT_EMAIL', 'SENDER_EMAIL', 'SENDGRID_API_KEY', " \
                                        "'SENDGRID_TEMPLATE_ID']."
 
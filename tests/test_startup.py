@@ -0,0 +1,93 @@
+# pylint: disable=missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+import os
+import subprocess
+import sys
+
+from tests import helpers
+
+HEAVY_MODULES = ["bs4", "dotenv", "pymongo", "requests", "sendgrid", "spotipy"]
+
+
+class TestStartup(helpers.TestBase):
+
+    def test_import_is_lightweight(self):
+        # No settings in the environment, so this would fail if settings were loaded on import
+        imports = self.__import_times("import best_new_music_digest.__main__", env={})
+
+        assert "best_new_music_digest.__main__" in imports
+        assert "best_new_music_digest.settings" not in imports
+        assert not [m for m in imports if m.split(".")[0] in HEAVY_MODULES]
+
+        print(f"Importing best_new_music_digest.__main__ took "
+              f"{imports['best_new_music_digest.__main__'] / 1000:.1f}ms")
+
+    def test_disabled_stages_are_not_imported(self):
+        os.environ["CREATE_SPOTIFY_PLAYLISTS"] = "false"
+        os.environ["SPUTNIKMUSIC_ALBUMS"] = "false"
+        os.environ["THE_NEEDLE_DROP_ALBUMS"] = "false"
+        os.environ["THE_NEEDLE_DROP_TRACKS"] = "false"
+
+        modules = self.__run(
+            "from best_new_music_digest import playlist\n"
+            "from best_new_music_digest.checkpoint import NullCheckpointer\n"
+            "from best_new_music_digest.scrapers import factory\n"
+            "factory.get_scrapers(NullCheckpointer())\n"
+            "playlist.create_playlists([])\n"
+            "import sys\n"
+            "print('\\n'.join(sys.modules))\n",
+            env=dict(os.environ),
+        ).stdout.splitlines()
+
+        assert "best_new_music_digest.scrapers.pitchfork" in modules
+        assert "best_new_music_digest.scrapers.sputnikmusic" not in modules
+        assert "best_new_music_digest.scrapers.the_needle_drop" not in modules
+        assert not [m for m in modules if m.split(".")[0] in ("pymongo", "sendgrid", "spotipy")]
+
+    def test_html_parser_not_imported_for_youtube_scrapers(self):
+        os.environ["CREATE_SPOTIFY_PLAYLISTS"] = "false"
+        os.environ["PITCHFORK_ALBUMS"] = "false"
+        os.environ["PITCHFORK_TRACKS"] = "false"
+        os.environ["SPUTNIKMUSIC_ALBUMS"] = "false"
+
+        modules = self.__run(
+            "from best_new_music_digest.checkpoint import NullCheckpointer\n"
+            "from best_new_music_digest.scrapers import factory\n"
+            "factory.get_scrapers(NullCheckpointer())\n"
+            "import sys\n"
+            "print('\\n'.join(sys.modules))\n",
+            env=dict(os.environ),
+        ).stdout.splitlines()
+
+        assert "best_new_music_digest.scrapers.the_needle_drop" in modules
+        assert "best_new_music_digest.scrapers.parsing" not in modules
+        assert "bs4" not in modules
+
+    @staticmethod
+    def __run(code, env):
+        env["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        return subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                              env=env,
+                              capture_output=True,
+                              text=True,
+                              check=True)
+
+    def __import_times(self, code, env):
+        """
+        Runs the code in a fresh interpreter with -X importtime and returns the cumulative time in
+        microseconds taken to import each module.
+        """
+
+        imports = {}
+
+        for line in self.__run(code, env).stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+
+            _, cumulative, module = line.split("|")
+
+            if cumulative.strip().isdigit():
+                imports[module.strip()] = int(cumulative)
+
+        return imports
@@ -0,0 +1,292 @@
+# pylint: disable=import-outside-toplevel, invalid-name, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import mongomock
+import pytest
+
+from tests import helpers
+
+
+class StoreTests:
+    """
+    Tests that every store has to pass.
+    """
+
+    def _create_store(self):
+        raise NotImplementedError()
+
+    def setUp(self):
+        super().setUp()  # pylint: disable=no-member
+
+        self._store = self._create_store()
+
+    def test_checkpoints(self):
+        assert self._store.get_checkpoints() == {}
+
+        self._store.save_checkpoints({"some-name": "some-link", "some-other-name": "some-link"})
+        self._store.save_checkpoints({"some-name": "some-new-link"})
+        self._store.save_checkpoints({})
+
+        assert self._store.get_checkpoints() == {
+            "some-name": "some-new-link",
+            "some-other-name": "some-link",
+        }
+
+    def test_health(self):
+        assert self._store.get_health("some-name") is None
+
+        self._store.save_health("some-name", {"consecutive_failures": 1, "durations": [1.5]})
+        self._store.save_health("some-name", {"consecutive_failures": 2, "durations": [1.5, 2]})
+
+        assert self._store.get_health("some-name") == {
+            "consecutive_failures": 2,
+            "durations": [1.5, 2],
+        }
+
+    def test_validators(self):
+        validators = {"etag": "some-etag", "last_modified": None, "content_sha256": "some-hash"}
+
+        assert self._store.get_validators("some-url") is None
+
+        self._store.save_validators({"some-url": validators})
+
+        assert self._store.get_validators("some-url") == validators
+
+    def test_seen(self):
+        assert self._store.get_seen("some-name") == []
+
+        self._store.save_seen({
+            "some-name": {"a - b": "some-link", "c - d": None},
+            "some-other-name": {"e - f": "some-other-link"},
+        })
+        self._store.save_seen({"some-name": {"a - b": "some-new-link"}})
+        self._store.save_seen({})
+
+        seen = sorted(self._store.get_seen("some-name"), key=lambda item: item["key"])
+        assert seen == [{"key": "a - b", "link": "some-new-link"}, {"key": "c - d", "link": None}]
+
+        assert self._store.is_seen("some-name", "a - b")
+        assert self._store.is_seen("some-name", "x - y", "some-new-link")
+        assert not self._store.is_seen("some-name", "x - y")
+        assert not self._store.is_seen("some-name", "x - y", "some-link")
+        assert not self._store.is_seen("some-other-name", "a - b", "some-new-link")
+
+    def test_run_reports(self):
+        self._store.save_run_report({"duration": 1.5, "stages": {"scrape": {"count": 1}}})
+        self._store.save_run_report({"duration": 2.5})
+
+        assert self._store.get_run_reports() == [
+            {"duration": 1.5, "stages": {"scrape": {"count": 1}}},
+            {"duration": 2.5},
+        ]
+
+    def test_journals(self):
+        assert self._store.get_latest_journal() is None
+
+        self._store.save_journal({"run_id": "run-1", "started": 1.5, "stages": {}})
+        self._store.save_journal({
+            "run_id": "run-2",
+            "started": 2.5,
+            "stages": {"scrape": {"staged": {"validators": {"https://some.url/": {}}}}},
+        })
+        self._store.save_journal({"run_id": "run-1", "started": 1.5, "stages": {"email": True}})
+
+        assert self._store.get_latest_journal() == {
+            "run_id": "run-2",
+            "started": 2.5,
+            "stages": {"scrape": {"staged": {"validators": {"https://some.url/": {}}}}},
+        }
+
+        self._store.delete_journal("run-2")
+        self._store.delete_journal("some-other-run")
+
+        assert self._store.get_latest_journal() == {
+            "run_id": "run-1",
+            "started": 1.5,
+            "stages": {"email": True},
+        }
+
+    def test_search_results(self):
+        # MongoDB deletes results once they've expired, so these ones have to be in the future
+        expires = time.time() + 60
+
+        assert self._store.get_search_result("some-key") is None
+
+        self._store.save_search_result("some-key", ["some-track-id"], expires)
+        self._store.save_search_result("some-other-key", None, expires)
+        self._store.save_search_result("some-key", ["some-new-track-id"], expires + 1)
+
+        assert self._store.get_search_result("some-key") == {
+            "result": ["some-new-track-id"],
+            "expires": expires + 1,
+        }
+        assert self._store.get_search_result("some-other-key") == {
+            "result": None,
+            "expires": expires,
+        }
+
+    def test_threads(self):
+        def save(index):
+            self._store.save_health(f"name-{index}", {"consecutive_failures": index})
+            self._store.save_seen({f"name-{index}": {"a - b": f"link-{index}"}})
+            return self._store.is_seen(f"name-{index}", "a - b")
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            assert all(executor.map(save, range(20)))
+
+        assert self._store.get_health("name-19") == {"consecutive_failures": 19}
+
+    def test_close(self):
+        self._store.close()
+
+class TestMemoryStore(StoreTests, helpers.TestBase):
+
+    def _create_store(self):
+        from best_new_music_digest.storage import MemoryStore
+
+        return MemoryStore()
+
+    def test_copies(self):
+        health = {"durations": [1]}
+        self._store.save_health("some-name", health)
+        health["durations"].append(2)
+
+        self._store.get_health("some-name")["durations"].append(3)
+
+        assert self._store.get_health("some-name") == {"durations": [1]}
+
+class TestSQLiteStore(StoreTests, helpers.TestBase):
+
+    def _create_store(self):
+        from best_new_music_digest.storage import SQLiteStore
+
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.__path = os.path.join(directory.name, "some-file.db")
+
+        store = SQLiteStore(self.__path)
+        self.addCleanup(store.close)
+
+        return store
+
+    def test_connects_lazily(self):
+        assert not os.path.exists(self.__path)
+
+        self._store.get_checkpoints()
+
+        assert os.path.exists(self.__path)
+
+    def test_wal_mode(self):
+        self._store.save_checkpoints({"some-name": "some-link"})
+
+        with sqlite3.connect(self.__path) as connection:
+            assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+    def test_persisted(self):
+        from best_new_music_digest.storage import SQLiteStore
+
+        self._store.save_checkpoints({"some-name": "some-link"})
+        self._store.close()
+
+        store = SQLiteStore(self.__path)
+
+        try:
+            assert store.get_checkpoints() == {"some-name": "some-link"}
+        finally:
+            store.close()
+
+class TestMongoStore(StoreTests, helpers.TestBase):
+
+    def _create_store(self):
+        from best_new_music_digest.storage import MongoStore
+
+        self.__client = mongomock.MongoClient()
+
+        with patch("pymongo.MongoClient", return_value=self.__client) as self.__mongo_client:
+            return MongoStore("mongodb://some-mongodb-host")
+
+    def test_client_options(self):
+        options = self.__mongo_client.call_args[1]
+
+        assert not options["connect"]
+        assert options["maxPoolSize"] == 10
+        assert options["minPoolSize"] == 0
+
+    def test_indexed_lazily(self):
+        database = self.__client["best-new-music-digest"]
+
+        assert "name_1" not in database.checkpoints.index_information()
+        assert "name_1_key_1" not in database.seen.index_information()
+        assert "key_1" not in database.search_results.index_information()
+
+        self._store.get_checkpoints()
+        self._store.get_seen("some-name")
+        self._store.get_search_result("some-key")
+
+        assert database.checkpoints.index_information()["name_1"]["unique"]
+        assert database.seen.index_information()["name_1_key_1"]["unique"]
+        assert database.search_results.index_information()["key_1"]["unique"]
+        assert database.search_results.index_information()["expires_at_1"][
+            "expireAfterSeconds"] == 0
+
+class TestOpenStore(helpers.TestBase):
+
+    def test_memory(self):
+        from best_new_music_digest.storage import MemoryStore, open_store
+
+        assert isinstance(open_store("memory://"), MemoryStore)
+
+    def test_sqlite(self):
+        from best_new_music_digest.storage import SQLiteStore, open_store
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "some-file.db")
+            store = open_store(f"sqlite:///{path}")
+
+            try:
+                assert isinstance(store, SQLiteStore)
+                store.save_checkpoints({"some-name": "some-link"})
+                assert os.path.exists(path)
+            finally:
+                store.close()
+
+    def test_sqlite_in_memory(self):
+        from best_new_music_digest.storage import open_store
+
+        store = open_store("sqlite://")
+        store.save_checkpoints({"some-name": "some-link"})
+
+        assert store.get_checkpoints() == {"some-name": "some-link"}
+
+    def test_mongodb(self):
+        from best_new_music_digest.storage import MongoStore, open_store
+
+        with patch("pymongo.MongoClient") as mongo_client:
+            assert isinstance(open_store("mongodb+srv://some-mongodb-host"), MongoStore)
+
+        assert mongo_client.call_args[0] == ("mongodb+srv://some-mongodb-host",)
+
+    def test_unsupported(self):
+        from best_new_music_digest.storage import open_store
+
+        with pytest.raises(Exception) as exception:
+            open_store("redis://some-redis-host")
+
+        assert str(exception.value) == "Unsupported storage URI scheme: redis."
+
+    def test_checkpointer(self):
+        from best_new_music_digest.checkpoint import Checkpointer
+        from best_new_music_digest.storage import MemoryStore
+
+        self._settings.STORAGE_URI = "memory://"
+
+        with patch.object(MemoryStore, "get_checkpoints", return_value={}) as get_checkpoints:
+            assert Checkpointer().get_checkpoint("some-name") is None
+
+        get_checkpoints.assert_called_once()
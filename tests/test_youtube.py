@@ -0,0 +1,85 @@
+# pylint: disable=import-outside-toplevel, missing-class-docstring, missing-function-docstring, missing-module-docstring
+
+import json
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from tests import helpers
+
+
+class TestYouTube(helpers.TestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        from best_new_music_digest import report, youtube
+        self.__report = report
+        self.__youtube = youtube
+        self.__urls = []
+
+    def test_iter_playlist_items(self):
+        client = self.__client({"items": [{"id": 1}, {"id": 2}], "nextPageToken": "some-token"},
+                               {"items": [{"id": 3}]})
+
+        assert list(client.iter_playlist_items("some-playlist", "id", max_pages=5)) == [
+            {"id": 1},
+            {"id": 2},
+            {"id": 3},
+        ]
+
+        first_page, second_page = [parse_qs(urlparse(url).query) for url in self.__urls]
+
+        assert first_page == {
+            "part": ["snippet"],
+            "playlistId": ["some-playlist"],
+            "maxResults": ["50"],
+            "fields": ["nextPageToken,items(id)"],
+            "key": ["some-api-key"],
+        }
+        assert second_page["pageToken"] == ["some-token"]
+
+    def test_iter_playlist_items_is_lazy(self):
+        client = self.__client({"items": [{"id": 1}], "nextPageToken": "some-token"},
+                               {"items": [{"id": 2}]})
+
+        assert next(client.iter_playlist_items("some-playlist", "id", max_pages=5)) == {"id": 1}
+        assert len(self.__urls) == 1
+
+    def test_iter_playlist_items_max_pages(self):
+        client = self.__client({"items": [{"id": 1}], "nextPageToken": "some-token"},
+                               {"items": [{"id": 2}]})
+
+        assert list(client.iter_playlist_items("some-playlist", "id")) == [{"id": 1}]
+
+    def test_iter_playlist_items_not_modified(self):
+        client = self.__youtube.YouTube("some-api-key", lambda url: None)
+
+        assert not list(client.iter_playlist_items("some-playlist", "id"))
+
+    def test_iter_playlist_items_error(self):
+        client = self.__client({"error": {"message": "quotaExceeded"}})
+
+        with self.assertRaises(Exception) as context:
+            list(client.iter_playlist_items("some-playlist", "id"))
+
+        assert str(context.exception) == "YouTube API error: quotaExceeded."
+
+    def test_iter_playlist_items_records_quota(self):
+        run_report = self.__report.start_report()
+        client = self.__client({"items": [], "nextPageToken": "some-token"}, {"items": []})
+
+        list(client.iter_playlist_items("some-playlist", "id", max_pages=5))
+
+        assert run_report.to_dict()["quota"] == {"youtube": 2}
+
+    def __client(self, *pages):
+        pages = list(pages)
+
+        def fetch(url):
+            self.__urls.append(url)
+            response = requests.Response()
+            response._content = json.dumps(pages.pop(0)).encode()  # pylint: disable=protected-access
+            return response
+
+        return self.__youtube.YouTube("some-api-key", fetch)